@@ -4,6 +4,8 @@ from discord.ext import commands
 from discord import app_commands
 from dotenv import load_dotenv
 
+from database.asyncDb import db
+from utils.dispatcher import Dispatcher
 from utils.i18n import PatherineTranslator
 from utils.utils import log, loadCommandModules, getGitInfo, formatGitFooter
 
@@ -63,6 +65,14 @@ class MyBot(commands.Bot):
 		else:
 			log("Commands already synced, skipping sync.")
 
+	async def close(self):
+		# Producers first: flushed writes queue announcements and role grants, which need the outbox and the client
+		await db.drain()
+		await outbox.close()
+		await super().close()
+		await db.close()
+		log("Database connections closed.")
+
 
 def makeEmbed(title: str, description: str) -> discord.Embed:
 	embed = discord.Embed(
@@ -73,3 +83,4 @@ def makeEmbed(title: str, description: str) -> discord.Embed:
 	return embed
 
 bot = MyBot()
+outbox = Dispatcher(bot)
@@ -9,7 +9,10 @@ from zoneinfo import ZoneInfo, available_timezones
 from commands import addGroup, makeEmbed, OWNER_ID
 from commands.populateDb import authorize, batchUpdateStreaks, fetchMessages, fetchReactions, generateSummary
 from utils.i18n import i18n, locale_str
-from utils.utils import connectDb, languageAutocomplete, log,timezoneAutocomplete, safeEmbed
+from database.asyncDb import db
+from database.channels import channels
+from database.identities import identities
+from utils.utils import languageAutocomplete, log,timezoneAutocomplete, safeEmbed
 
 @addGroup.command(
 	name="admin",
@@ -25,19 +28,12 @@ async def addAdminCommand(interaction: discord.Interaction, user: discord.User):
 		await interaction.response.send_message(f"❌ {i18n.t(l, 'commands.add.admin.reject')}", ephemeral=True)
 		return
 
-	conn, cursor = connectDb()
-	try:
-		cursor.execute("SELECT 1 FROM admins WHERE discord_user_id = ?", (targetId,))
-		exists = cursor.fetchone()
-
-		if exists:
-			await interaction.response.send_message(f"{user.mention} {i18n.t(l, 'commands.add.admin.alreadyAdmin')} ⚠️", ephemeral=True)
-		else:
-			cursor.execute("INSERT INTO admins (discord_user_id) VALUES (?)", (targetId,))
-			conn.commit()
-			await interaction.response.send_message(f"✅ {user.mention} {i18n.t(l, 'commands.add.admin.success')}", ephemeral=True)
-	finally:
-		conn.close()
+	if identities.isAdmin(targetId):
+		await interaction.response.send_message(f"{user.mention} {i18n.t(l, 'commands.add.admin.alreadyAdmin')} ⚠️", ephemeral=True)
+	else:
+		await db.write("INSERT OR IGNORE INTO admins (discord_user_id) VALUES (?)", (targetId,))
+		identities.addAdmin(targetId)
+		await interaction.response.send_message(f"✅ {user.mention} {i18n.t(l, 'commands.add.admin.success')}", ephemeral=True)
 
 @addGroup.command(
 	name="channel",
@@ -64,11 +60,7 @@ async def addChannelCommand(
 		return
 
 	l = i18n.getLocale(interaction)	
-	conn, cursor = connectDb()
-
-	cursor.execute("SELECT id FROM channels WHERE discord_channel_id = ?", (str(channel.id),))
-	if cursor.fetchone():
-		conn.close()
+	if channels.get(channel.id):
 		await interaction.response.send_message(f"❌ {channel.mention} {i18n.t(l, 'commands.add.channel.errors.alreadyExists')} /update_channel", ephemeral=True)
 		return
 
@@ -76,40 +68,35 @@ async def addChannelCommand(
 
 	if lang not in ["en", "fr"]:
 		await interaction.followup.send(f"❌ {i18n.t(l, 'commands.add.channel.errors.lang1')} '{lang}', {i18n.t(l, 'commands.add.channel.errors.lang2')} en, fr", ephemeral=True)
-		conn.close()
 		return
-	
+
 	if tz_name not in available_timezones():
 		await interaction.followup.send(f"❌ {i18n.t(l, 'commands.add.channel.errors.tz')} '{tz_name}'", ephemeral=True)
-		conn.close()
 		return
-	
-	cursor.execute(
+
+	internalId = await db.write(
 		"INSERT INTO channels(discord_channel_id, discord_role_id, timezone, lang) VALUES (?, ?, ?, ?)",
 		(str(channel.id), str(role.id) if role else None, tz_name, lang)
 	)
-	conn.commit()
-	internalId = cursor.lastrowid
+	channels.put(internalId, channel.id, tz_name, role.id if role else None, lang)
 
 	embedMsg = await interaction.followup.send(embed=makeEmbed(f"{i18n.t(l, 'commands.add.channel.embed1.title')}...", f" {i18n.t(l, 'commands.add.channel.embed1.desc')} ⏳"))
 	addStart = datetime.now(timezone.utc)
 
 	try:
-		stored, msgMap = await fetchMessages(channel, internalId, cursor, conn, ZoneInfo(tz_name), embedMsg, addStart)
+		stored, msgMap = await fetchMessages(channel, internalId, ZoneInfo(tz_name), embedMsg, addStart)
 	except Exception as e:
 		log(f"Error fetching messages for channel {channel.id}: {e}")
 		await safeEmbed(interaction, embed=makeEmbed(f"❌ {i18n.t(l, 'commands.add.channel.embed1.error')}", str(e)), message=embedMsg)
-		cursor.execute("DELETE FROM channels WHERE id = ?", (internalId,))
-		conn.commit()
-		conn.close()
+		await db.write("DELETE FROM channels WHERE id = ?", (internalId,))
+		channels.remove(channel.id)
 		return
 
-	(chCurr, chMax), (glCurr, glMax) = batchUpdateStreaks(cursor, conn, internalId, msgMap)
+	(chCurr, chMax), (glCurr, glMax) = await db.transaction(batchUpdateStreaks, internalId, msgMap)
 
 	await safeEmbed(interaction, embed=makeEmbed(f"{i18n.t(l, 'commands.add.channel.embed2.title')}...", f" {i18n.t(l, 'commands.add.channel.embed2.desc')} 💜"), message=embedMsg)
 
-	reacted = await fetchReactions(channel, cursor, conn, msgMap)
-	summary = await generateSummary(cursor, internalId, stored, reacted, l, (chCurr, chMax), (glCurr, glMax))
+	reacted = await fetchReactions(channel, msgMap)
+	summary = await db.read(generateSummary, internalId, stored, reacted, l, (chCurr, chMax), (glCurr, glMax))
 
 	await safeEmbed(interaction, embed=makeEmbed(f"✅ {i18n.t(l, 'commands.add.channel.Done')}", summary), message=embedMsg)
-	conn.close()
@@ -1,6 +1,6 @@
 import io
 import time
-from datetime import date, datetime, timedelta
+from datetime import datetime, timedelta
 from typing import List, Tuple
 
 import discord
@@ -10,9 +10,12 @@ from matplotlib.ticker import MaxNLocator
 from discord import app_commands
 
 from commands import graphGroup, makeEmbed
-from commands.leaderboard import getUsername
 from utils.i18n import i18n, locale_str
-from utils.utils import connectDb, log
+from database.asyncDb import db
+from database.rollup import getDailySeries
+from utils.cache import BoundedCache
+from utils.usernames import resolveUsernames
+from utils.utils import log
 
 MAX_POINTS_DEFAULT = 75
 MIN_POINTS = 10
@@ -103,53 +106,38 @@ async def graphUsersCommand(interaction: discord.Interaction, total: bool = Fals
 		return
 
 	start = time.perf_counter()
-	conn, cursor = connectDb()
-	try:
-		if total:
-			# For cumulative users: take first_seen date per user, count new users per day, then cumulative
-			cursor.execute("""
-				SELECT MIN(DATE(timestamp, 'localtime')) AS first_seen, user_id
-				FROM messages
-				WHERE category = 'success'
-				GROUP BY user_id
-				ORDER BY first_seen
-			""")
-			rows = cursor.fetchall()
-			if not rows:
-				await interaction.followup.send(i18n.t(l, "commands.graph.errors.noData"))
-				return
-
-			per_day = {}
-			for day_str, _ in rows:
-				per_day[day_str] = per_day.get(day_str, 0) + 1
-
-			sorted_days = sorted(per_day.keys())
-			dates = [datetime.strptime(d, "%Y-%m-%d").date() for d in sorted_days]
-			counts = []
-			acc = 0
-			for d in sorted_days:
-				acc += per_day[d]
-				counts.append(acc)
-		else:
-			# Daily distinct users
-			cursor.execute("""
-				SELECT DATE(timestamp, 'localtime') AS day, COUNT(DISTINCT user_id) AS user_count
-				FROM messages
-				WHERE category = 'success'
-				GROUP BY day
-				ORDER BY day
-			""")
-			rows = cursor.fetchall()
-			if not rows:
-				await interaction.followup.send(i18n.t(l, "commands.graph.errors.noData"))
-				return
-			dates = [datetime.strptime(d, "%Y-%m-%d").date() for d, _ in rows]
-			counts = [v for _, v in rows]
-	finally:
-		try:
-			conn.close()
-		except Exception:
-			pass
+	if total:
+		# For cumulative users: take first_seen date per user, count new users per day, then cumulative
+		rows = await db.fetchall("""
+			SELECT MIN(success_day) AS first_seen, user_id
+			FROM messages
+			WHERE category = 'success'
+			GROUP BY user_id
+			ORDER BY first_seen
+		""")
+		if not rows:
+			await interaction.followup.send(i18n.t(l, "commands.graph.errors.noData"))
+			return
+
+		per_day = {}
+		for day_str, _ in rows:
+			per_day[day_str] = per_day.get(day_str, 0) + 1
+
+		sorted_days = sorted(per_day.keys())
+		dates = [datetime.strptime(d, "%Y-%m-%d").date() for d in sorted_days]
+		counts = []
+		acc = 0
+		for d in sorted_days:
+			acc += per_day[d]
+			counts.append(acc)
+	else:
+		# Daily distinct users
+		rows = await db.read(getDailySeries, "distinct_users")
+		if not rows:
+			await interaction.followup.send(i18n.t(l, "commands.graph.errors.noData"))
+			return
+		dates = [datetime.strptime(d, "%Y-%m-%d").date() for d, _ in rows]
+		counts = [v for _, v in rows]
 
 	# Downsample while preserving endpoints
 	dates, counts = downsampleWithAverage(dates, counts, points)
@@ -189,47 +177,26 @@ async def graphMessagesCommand(interaction: discord.Interaction, total: bool = F
 		return
 
 	start = time.perf_counter()
-	conn, cursor = connectDb()
-	try:
-		if total:
-			# Daily message counts, then cumulative
-			cursor.execute("""
-				SELECT DATE(timestamp, 'localtime') AS day, COUNT(*) AS message_count
-				FROM messages
-				WHERE category = 'success'
-				GROUP BY day
-				ORDER BY day
-			""")
-			rows = cursor.fetchall()
-			if not rows:
-				await interaction.followup.send(i18n.t(l, "commands.graph.errors.noData"))
-				return
-			dates = [datetime.strptime(d, "%Y-%m-%d").date() for d, _ in rows]
-			counts = []
-			acc = 0
-			for _, c in rows:
-				acc += c
-				counts.append(acc)
-		else:
-			# Daily message counts
-			cursor.execute("""
-				SELECT DATE(timestamp, 'localtime') AS day, COUNT(*) AS message_count
-				FROM messages
-				WHERE category = 'success'
-				GROUP BY day
-				ORDER BY day
-			""")
-			rows = cursor.fetchall()
-			if not rows:
-				await interaction.followup.send(i18n.t(l, "commands.graph.errors.noData"))
-				return
-			dates = [datetime.strptime(d, "%Y-%m-%d").date() for d, _ in rows]
-			counts = [v for _, v in rows]
-	finally:
-		try:
-			conn.close()
-		except Exception:
-			pass
+	if total:
+		# Daily message counts, then cumulative
+		rows = await db.read(getDailySeries, "success_count")
+		if not rows:
+			await interaction.followup.send(i18n.t(l, "commands.graph.errors.noData"))
+			return
+		dates = [datetime.strptime(d, "%Y-%m-%d").date() for d, _ in rows]
+		counts = []
+		acc = 0
+		for _, c in rows:
+			acc += c
+			counts.append(acc)
+	else:
+		# Daily message counts
+		rows = await db.read(getDailySeries, "success_count")
+		if not rows:
+			await interaction.followup.send(i18n.t(l, "commands.graph.errors.noData"))
+			return
+		dates = [datetime.strptime(d, "%Y-%m-%d").date() for d, _ in rows]
+		counts = [v for _, v in rows]
 
 	# Downsample while preserving endpoints
 	dates, counts = downsampleWithAverage(dates, counts, points)
@@ -254,10 +221,8 @@ async def graphMessagesCommand(interaction: discord.Interaction, total: bool = F
 #    Streaks Graph Command
 #-----------------------------
 
-g_streakHistoryCache = {
-	"day": None,
-	"data": None
-}
+# Top streak timelines, recomputed at most once a day
+streakHistoryCache = BoundedCache(maxSize=1, daily=True)
 
 def computeBestStreakTimeline(days: List[datetime.date]
 							 ) -> Tuple[List[datetime.date], List[int]]:
@@ -288,10 +253,9 @@ def computeBestStreakTimeline(days: List[datetime.date]
 
 
 def getTopStreaksHistory(cursor) -> List[dict]:
-	today = date.today()
-
-	if g_streakHistoryCache["day"] == today:
-		return g_streakHistoryCache["data"]
+	cached = streakHistoryCache.get("top")
+	if cached is not None:
+		return cached
 
 	cursor.execute("""
 		SELECT us.user_id, u.discord_user_id, us.max_streak
@@ -306,7 +270,7 @@ def getTopStreaksHistory(cursor) -> List[dict]:
 
 	for _, discordUserId, _ in users:
 		cursor.execute("""
-			SELECT DISTINCT DATE(m.timestamp, 'localtime') AS day
+			SELECT DISTINCT m.success_day AS day
 			FROM messages m
 			JOIN users u ON u.id = m.user_id
 			WHERE m.category = 'success'
@@ -325,8 +289,7 @@ def getTopStreaksHistory(cursor) -> List[dict]:
 				"values": values
 			})
 
-	g_streakHistoryCache["day"] = today
-	g_streakHistoryCache["data"] = result
+	streakHistoryCache.set("top", result)
 	return result
 
 
@@ -397,21 +360,14 @@ async def graphStreaksCommand(interaction: discord.Interaction):
 	l = i18n.getLocale(interaction)
 
 	start = time.perf_counter()
-	conn, cursor = connectDb()
-	try:
-		usersData = getTopStreaksHistory(cursor)
-		if not usersData:
-			await interaction.followup.send(i18n.t(l, "commands.graph.streaks.errors.noData"))
-			return
-	finally:
-		try:
-			conn.close()
-		except Exception:
-			pass
+	usersData = await db.read(getTopStreaksHistory)
+	if not usersData:
+		await interaction.followup.send(i18n.t(l, "commands.graph.streaks.errors.noData"))
+		return
 
+	names = await resolveUsernames([userData["discord_user_id"] for userData in usersData], interaction)
 	for userData in usersData:
-		discordUserId = int(userData["discord_user_id"])
-		username = await getUsername(discordUserId, interaction)
+		username = names[int(userData["discord_user_id"])]
 		maxStreak = userData.get("values", [])[-1] if userData.get("values") else 0
 		userData["username"] = f"{username} - {maxStreak}"
 
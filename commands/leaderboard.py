@@ -1,90 +1,326 @@
+import asyncio
+import re
+from dataclasses import dataclass
+from typing import Callable
+
 import discord
 from discord import app_commands, Interaction
-from discord.ui import View, button, Button
+from discord.ui import Button, DynamicItem, View
 from math import ceil
 from datetime import datetime
 
 from utils.i18n import i18n, locale_str
-from utils.utils import connectDb, escapeMarkdown
-from commands import FOOTER_TEXT, leaderboardGroup
-
-class Leaderboard(View):
-	def __init__(self, interaction: Interaction, title: str, data: list[tuple[str, int]], itemsPerPage: int = 10, timeout: float = 120.0, sortReverse: bool = True):
-		super().__init__(timeout=timeout)
-
-		self.interaction = interaction
-		self.title = title
-		self.itemsPerPage = itemsPerPage
-
-		self.l = i18n.getLocale(interaction)
-
-		self.prevButton.label = f"⬅️ {i18n.t(self.l, 'commands.lb.embed.prev')}"
-		self.nextButton.label = f"{i18n.t(self.l, 'commands.lb.embed.next')} ➡️"
-
-		self.entries = sorted(data, key=lambda x: x[1], reverse=sortReverse)
-		self.pageCount = max(1, ceil(len(self.entries) / itemsPerPage))
-		self.currentPage = 0
-
-		self.prevButton.disabled = True
-		if self.pageCount <= 1:
-			self.nextButton.disabled = True
-
-
-	def makeEmbed(self) -> discord.Embed:
-		start = self.currentPage * self.itemsPerPage
-		end = start + self.itemsPerPage
-		slice_ = self.entries[start:end]
-		description = ""
-		for idx, (name, value) in enumerate(slice_, start=start + 1):
-			description += f"`#{idx:<2}` {escapeMarkdown(name)} — **{value}**\n"
-		description += f"\n\n{FOOTER_TEXT}"
-		embed = discord.Embed(title=self.title, description=description or f"*{i18n.t(self.l, 'commands.lb.embed.noData')}*", color=discord.Color.purple())
-		embed.set_footer(text=f"{i18n.t(self.l, 'commands.lb.embed.page')} {self.currentPage+1}/{self.pageCount}")
-		return embed
-
-	@button(style=discord.ButtonStyle.gray, custom_id="leaderboard_prev")
-	async def prevButton(self, interaction: Interaction, button: Button):
-		if self.currentPage > 0:
-			self.currentPage -= 1
-			self.nextButton.disabled = False
-		self.prevButton.disabled = (self.currentPage == 0)
-		await interaction.response.edit_message(embed=self.makeEmbed(), view=self)
-
-	@button(style=discord.ButtonStyle.gray, custom_id="leaderboard_next")
-	async def nextButton(self, interaction: Interaction, button: Button):
-		if self.currentPage < self.pageCount - 1:
-			self.currentPage += 1
-			self.prevButton.disabled = False
-		self.nextButton.disabled = (self.currentPage == self.pageCount - 1)
-		await interaction.response.edit_message(embed=self.makeEmbed(), view=self)
-
-	async def start(self):
-		await self.interaction.followup.send(embed=self.makeEmbed(), view=self)
-
-async def getUsername(userId: str, interaction: Interaction) -> str:
-	member = None
-
-	if interaction.guild:
+from database.asyncDb import db
+from database.channels import channels
+from database.leaderboards import LeaderboardQuery, boardVersion, readAtVersion, snapshotQuery
+from database.rollup import GLOBAL_CHANNEL
+from utils.cache import BoundedCache
+from utils.usernames import resolveUsernames
+from utils.utils import escapeMarkdown
+from commands import FOOTER_TEXT, bot, leaderboardGroup
+
+PAGE_SIZE = 10
+SNAPSHOT_TTL = 300.0
+MAX_SNAPSHOTS = 32
+MAX_SNAPSHOT_PAGES = 50
+STALE_RETRIES = 3
+
+
+# --- Row formatting: (row, names) -> (label, value) ---
+def defaultRow(row: tuple, names: dict) -> tuple[str, object]:
+	return (names[int(row[0])] if names else str(row[0])), row[1]
+
+def averageDelayRow(row: tuple, names: dict) -> tuple[str, object]:
+	discordId, value, count = row
+	return f"{names[int(discordId)]} ({count})", round(value, 3)
+
+# extra holds the other streak: the current one when ranking best streaks, and the reverse
+def bestStreakRow(row: tuple, names: dict) -> tuple[str, object]:
+	discordId, value, currentStreak = row
+	name = names[int(discordId)]
+	return (f" 🔥 {name}" if currentStreak >= value else name), value
+
+def currentStreakRow(row: tuple, names: dict) -> tuple[str, object]:
+	discordId, value, bestStreak = row
+	paren = f" ({bestStreak})" if bestStreak > value else ""
+	return f"{names[int(discordId)]}{paren}", value
+
+def dayRow(row: tuple, names: dict) -> tuple[str, object]:
+	day, count = row
+	return datetime.fromisoformat(day).strftime("%d %b, %Y"), count
+
+def daysQuery(channelId: int) -> LeaderboardQuery:
+	return LeaderboardQuery("""
+		SELECT day AS rank_key, distinct_users AS rank_value
+		FROM daily_rollup
+		WHERE channel_id = ? AND distinct_users > 0
+	""", (channelId,))
+
+
+@dataclass(frozen=True, slots=True)
+class BoardDefinition:
+	query: Callable[[int], LeaderboardQuery]	# channels.id, or GLOBAL_CHANNEL -> query
+	formatRow: Callable[[tuple, dict], tuple[str, object]] = defaultRow
+	namedKeys: bool = True	# rank_key is a Discord user id to resolve to a name
+
+
+BOARDS = {
+	"messages": BoardDefinition(lambda channelId: snapshotQuery("messages", channelId)),
+	"reactions": BoardDefinition(lambda channelId: snapshotQuery("reactions", channelId)),
+	"delays_best": BoardDefinition(lambda channelId: snapshotQuery("delays_best", channelId, descending=False)),
+	"delays_worst": BoardDefinition(lambda channelId: snapshotQuery("delays_worst", channelId)),
+	"delays_avg": BoardDefinition(lambda channelId: snapshotQuery("delays_avg", channelId, descending=False), averageDelayRow),
+	"streaks_best": BoardDefinition(lambda channelId: snapshotQuery("streaks_best", channelId), bestStreakRow),
+	"streaks_current": BoardDefinition(lambda channelId: snapshotQuery("streaks_current", channelId), currentStreakRow),
+	"days": BoardDefinition(daysQuery, dayRow, namedKeys=False),
+}
+
+
+class StaleSnapshot(Exception):
+	"""The board changed since its snapshot was taken: reopen it at the current version."""
+
+
+class BoardSnapshot:
+	"""
+	One board (name and channel) at one version of its rows, shared by everyone paging through it.
+	The row count and each page are loaded once, on first request, then reused as they are, so
+	concurrent viewers of a board cost one copy of the pages they look at. Each load reads the
+	board's version in the same transaction as its rows, and one that finds the board changed
+	raises StaleSnapshot rather than mix newer rows in: a snapshot's pages never skip or repeat a row.
+	Messages only carry (board, channel, version, page) in their button ids; nothing is kept per view.
+	"""
+
+	def __init__(self, board: str, channelId: int, version: int):
+		definition = BOARDS[board]
+		self.board = board
+		self.channelId = channelId
+		self.version = version
+		self.query = definition.query(channelId)
+		self.formatRow = definition.formatRow
+		self.namedKeys = definition.namedKeys
+		self.total: int | None = None
+		self.pages = BoundedCache(MAX_SNAPSHOT_PAGES)	# page index -> task resolving to (rows, entries)
+
+	async def read(self, fn, *args):
+		"""Run fn(cursor, *args) against the snapshot's version of the board."""
+		version, result = await db.read(readAtVersion, self.board, self.channelId, fn, *args)
+		if version != self.version:
+			snapshots.pop((self.board, self.channelId, self.version))
+			raise StaleSnapshot()
+		return result
+
+	def pageCount(self) -> int:
+		return max(1, ceil(self.total / PAGE_SIZE))
+
+	async def open(self, index: int | None, interaction: Interaction, focusKey: int | None = None) -> tuple[int, tuple, tuple] | None:
+		"""
+		(index, rows, entries) of a page, clamped to the board, or with index None of the page ranking
+		focusKey (None if it isn't ranked). The row count, the rank and the rows a render needs come
+		from one read, so they always describe the same version.
+		"""
+		if index is not None and self.total is not None:
+			index = min(max(index, 0), self.pageCount() - 1)
+			return (index, *await self.page(index, interaction))
+		total, index, rows = await self.read(self.locate, index, focusKey, self.previousRow(index))
+		self.total = total
+		if index is None:
+			return None
+		task = self.pages.get(index)
+		if task is None:
+			task = asyncio.create_task(self.formatRows(rows, interaction))
+			self.pages.set(index, task)
 		try:
-			member = interaction.guild.get_member(int(userId))
-		except (ValueError, TypeError):
-			pass
-
-	if member:
-		return member.display_name
-
-	user = interaction.client.get_user(int(userId))
-	if user:
-		return user.name
-
+			return (index, *await task)
+		except Exception:
+			self.pages.pop(index)
+			raise
+
+	def locate(self, cursor, index: int | None, focusKey: int | None, after: tuple | None) -> tuple[int, int | None, list[tuple]]:
+		total = self.query.count(cursor)
+		if index is None:
+			rank = self.query.rankOf(cursor, focusKey)
+			if rank is None:
+				return total, None, []
+			index, after = (rank - 1) // PAGE_SIZE, None
+		clamped = min(max(index, 0), max(1, ceil(total / PAGE_SIZE)) - 1)
+		if clamped != index:
+			index, after = clamped, None
+		return total, index, self.loadRows(cursor, index, after)
+
+	def loadPage(self, index: int, interaction: Interaction) -> asyncio.Task:
+		task = self.pages.get(index)
+		if task is None:
+			task = asyncio.create_task(self.fetchPage(index, interaction))
+			task.add_done_callback(lambda t: t.cancelled() or t.exception())	# prefetches may fail unawaited
+			self.pages.set(index, task)
+		return task
+
+	async def page(self, index: int, interaction: Interaction) -> tuple[tuple, tuple]:
+		try:
+			return await self.loadPage(index, interaction)
+		except Exception:
+			self.pages.pop(index)	# retried on the next press
+			raise
+
+	def previousRow(self, index: int | None) -> tuple | None:
+		"""Keyset cursor ending the page before index, when that page is already loaded."""
+		if not index:
+			return None
+		previous = self.pages.get(index - 1)
+		if previous is None or not previous.done() or previous.cancelled() or previous.exception() is not None:
+			return None
+		previousRows, _ = previous.result()
+		return previousRows[-1][:2] if previousRows else None
+
+	async def fetchPage(self, index: int, interaction: Interaction) -> tuple[tuple, tuple]:
+		rows = await self.read(self.loadRows, index, self.previousRow(index))
+		return await self.formatRows(rows, interaction)
+
+	async def formatRows(self, rows: list[tuple], interaction: Interaction) -> tuple[tuple, tuple]:
+		names = await resolveUsernames([row[0] for row in rows], interaction) if self.namedKeys else {}
+		return tuple(rows), tuple(self.formatRow(row, names) for row in rows)
+
+	def loadRows(self, cursor, index: int, after: tuple | None) -> list[tuple]:
+		if index > 0 and after is None:
+			# Previous page not loaded: find the row ending it
+			after = self.query.rowAt(cursor, index * PAGE_SIZE - 1)
+			if after is None:
+				return []
+		return self.query.page(cursor, after, PAGE_SIZE)
+
+
+snapshots = BoundedCache(MAX_SNAPSHOTS, ttl=SNAPSHOT_TTL)	# (board, channelId, version) -> BoardSnapshot
+
+async def getSnapshot(board: str, channelId: int, version: int | None = None) -> BoardSnapshot:
+	"""The snapshot a message was opened on if it's still cached, else one at the board's current version."""
+	if version is not None:
+		snapshot = snapshots.get((board, channelId, version))
+		if snapshot is not None:
+			return snapshot
+	version = await db.read(boardVersion, board, channelId)
+	snapshot = snapshots.get((board, channelId, version))
+	if snapshot is None:
+		snapshot = BoardSnapshot(board, channelId, version)
+		snapshots.set((board, channelId, version), snapshot)
+	return snapshot
+
+async def withSnapshot(board: str, channelId: int, version: int | None, render: Callable):
+	"""Await render(snapshot), reopening the board at its current version when the snapshot goes stale mid-read."""
+	for attempt in range(STALE_RETRIES):
+		snapshot = await getSnapshot(board, channelId, version)
+		try:
+			return await render(snapshot)
+		except StaleSnapshot:
+			if attempt == STALE_RETRIES - 1:
+				raise
+			version = None
+
+
+class LeaderboardButton(DynamicItem[Button], template=rf"lb:(?P<board>{'|'.join(BOARDS)}):(?P<channel>\d+):(?P<version>\d+):(?P<page>\d+):(?P<direction>[pn])(?::(?P<focus>\d+))?"):
+	"""
+	Prev / next button whose custom_id holds the whole page state, so it keeps working
+	after a restart and no View has to stay in memory for it.
+	"""
+
+	def __init__(self, board: str, channelId: int, version: int, page: int, direction: str, focusKey: int | None = None, label: str | None = None, disabled: bool = False):
+		customId = f"lb:{board}:{channelId}:{version}:{page}:{direction}"
+		if focusKey is not None:
+			customId += f":{focusKey}"
+		super().__init__(Button(style=discord.ButtonStyle.gray, label=label, custom_id=customId, disabled=disabled))
+		self.board = board
+		self.channelId = channelId
+		self.version = version
+		self.page = page
+		self.direction = direction
+		self.focusKey = focusKey
+
+	@classmethod
+	async def from_custom_id(cls, interaction: Interaction, item: Button, match: re.Match[str]):
+		focus = match["focus"]
+		return cls(match["board"], int(match["channel"]), int(match["version"]), int(match["page"]), match["direction"], int(focus) if focus else None)
+
+	async def callback(self, interaction: Interaction):
+		# Acknowledged first: reads and name lookups can outlast the interaction deadline
+		await interaction.response.defer()
+		target = self.page - 1 if self.direction == "p" else self.page + 1
+		embeds = interaction.message.embeds if interaction.message else []
+		title = embeds[0].title if embeds else None
+		try:
+			embed, view = await withSnapshot(
+				self.board, self.channelId, self.version,
+				lambda snapshot: renderBoard(interaction, snapshot, target, title, self.focusKey)
+			)
+		except StaleSnapshot:
+			await sendUpdating(interaction)
+			return
+		await interaction.edit_original_response(embed=embed, view=view)
+
+
+bot.add_dynamic_items(LeaderboardButton)
+
+
+async def renderBoard(interaction: Interaction, snapshot: BoardSnapshot, index: int | None, title: str | None, focusKey: int | None = None) -> tuple[discord.Embed, View] | None:
+	"""
+	Build the embed and buttons for one page, or with index None for the page ranking focusKey
+	(None if it isn't ranked), and prefetch the page after it.
+	"""
+	l = i18n.getLocale(interaction)
+	opened = await snapshot.open(index, interaction, focusKey)
+	if opened is None:
+		return None
+	index, rows, entries = opened
+	pageCount = snapshot.pageCount()
+	if index + 1 < pageCount:
+		snapshot.loadPage(index + 1, interaction)
+
+	description = ""
+	for idx, (row, (name, value)) in enumerate(zip(rows, entries), start=index * PAGE_SIZE + 1):
+		line = f"`#{idx:<2}` {escapeMarkdown(name)} — **{value}**"
+		if focusKey is not None and row[0] == focusKey:
+			line = f"__{line}__"
+		description += f"{line}\n"
+	description += f"\n\n{FOOTER_TEXT}"
+	embed = discord.Embed(title=title, description=description or f"*{i18n.t(l, 'commands.lb.embed.noData')}*", color=discord.Color.purple())
+	embed.set_footer(text=f"{i18n.t(l, 'commands.lb.embed.page')} {index+1}/{pageCount}")
+
+	view = View(timeout=None)
+	state = (snapshot.board, snapshot.channelId, snapshot.version, index)
+	view.add_item(LeaderboardButton(*state, "p", focusKey, label=f"⬅️ {i18n.t(l, 'commands.lb.embed.prev')}", disabled=index == 0))
+	view.add_item(LeaderboardButton(*state, "n", focusKey, label=f"{i18n.t(l, 'commands.lb.embed.next')} ➡️", disabled=index >= pageCount - 1))
+	return embed, view
+
+
+async def sendUpdating(interaction: Interaction):
+	"""Tell the user a board kept changing under every retry, instead of leaving the deferred interaction hanging."""
+	l = i18n.getLocale(interaction)
+	await interaction.followup.send(f"⏳ {i18n.t(l, 'commands.lb.embed.updating')}.", ephemeral=True)
+
+
+async def openLeaderboard(interaction: Interaction, title: str, board: str, channelId: int, focusKey: int | None = None):
+	"""
+	Send the first page of a board, or with focusKey the page holding that rank_key, highlighted.
+	The interaction must already be deferred.
+	"""
+	index = 0 if focusKey is None else None
 	try:
-		user = await interaction.client.fetch_user(int(userId))
-		if user:
-			return user.name
-	except Exception:
-		pass
+		rendered = await withSnapshot(board, channelId, None, lambda snapshot: renderBoard(interaction, snapshot, index, title, focusKey))
+	except StaleSnapshot:
+		await sendUpdating(interaction)
+		return
+	if rendered is None:
+		l = i18n.getLocale(interaction)
+		await interaction.followup.send(f"❌ {i18n.t(l, 'commands.lb.embed.notRanked')}.", ephemeral=True)
+		return
+	embed, view = rendered
+	await interaction.followup.send(embed=embed, view=view)
+
 
-	return f"{i18n.t(i18n.getLocale(interaction), 'commands.lb.embed.unknown')} ({userId})"
+def boardChannel(channel: discord.TextChannel | None) -> int | None:
+	"""channels.id of an optional channel argument, GLOBAL_CHANNEL without one, None if it isn't registered."""
+	if not channel:
+		return GLOBAL_CHANNEL
+	config = channels.get(channel.id)
+	return config.id if config else None
 
 
 @leaderboardGroup.command(
@@ -92,88 +328,36 @@ async def getUsername(userId: str, interaction: Interaction) -> str:
 	description=locale_str("commands.lb.messages.description")
 )
 @app_commands.describe(
-	channel=locale_str("commands.lb.arg.channel")
+	channel=locale_str("commands.lb.arg.channel"),
+	me=locale_str("commands.lb.arg.me")
 )
-async def messagesLeaderboard(interaction: Interaction, channel: discord.TextChannel | None = None):
+async def messagesLeaderboard(interaction: Interaction, channel: discord.TextChannel | None = None, me: bool = False):
 	await interaction.response.defer()
-	conn, cursor = connectDb()
 	l = i18n.getChannelLocale(interaction.channel.id, interaction)
-	if channel:
-		cursor.execute("SELECT id FROM channels WHERE discord_channel_id = ?", (str(channel.id),))
-		row = cursor.fetchone()
-		if not row:
-			conn.close()
-			await interaction.followup.send(f"❌ {channel.mention} {i18n.t(l, 'commands.lb.error')}.", ephemeral=True)
-			return
-		title = f"🏆 {i18n.t(l, 'commands.lb.messages.title')} #{channel.name}"
-		cursor.execute("""
-			SELECT users.discord_user_id, COUNT(*) 
-			FROM messages
-			JOIN users ON users.id = messages.user_id
-			WHERE messages.category = 'success' AND messages.channel_id = ?
-			GROUP BY users.discord_user_id
-		""", (row[0],))
-	else:
-		title = f"🏆 {i18n.t(l, 'commands.lb.messages.gtitle')}"
-		cursor.execute("""
-			SELECT users.discord_user_id, COUNT(*) 
-			FROM messages
-			JOIN users ON users.id = messages.user_id
-			WHERE messages.category = 'success'
-			GROUP BY users.discord_user_id
-		""")
-	rows = cursor.fetchall()
-	conn.close()
-	data = []
-	for userId, cnt in rows:
-		name = await getUsername(userId, interaction)
-		data.append((name, cnt))
-	board = Leaderboard(interaction, title, data)
-	await board.start()
+	channelId = boardChannel(channel)
+	if channelId is None:
+		await interaction.followup.send(f"❌ {channel.mention} {i18n.t(l, 'commands.lb.error')}.", ephemeral=True)
+		return
+	title = f"🏆 {i18n.t(l, 'commands.lb.messages.title')} #{channel.name}" if channel else f"🏆 {i18n.t(l, 'commands.lb.messages.gtitle')}"
+	await openLeaderboard(interaction, title, "messages", channelId, interaction.user.id if me else None)
 
 @leaderboardGroup.command(
 	name="reactions",
 	description=locale_str("commands.lb.reactions.description")
 )
 @app_commands.describe(
-	channel=locale_str("commands.lb.arg.channel")
+	channel=locale_str("commands.lb.arg.channel"),
+	me=locale_str("commands.lb.arg.me")
 )
-async def reactionsLeaderboard(interaction: Interaction, channel: discord.TextChannel | None = None):
+async def reactionsLeaderboard(interaction: Interaction, channel: discord.TextChannel | None = None, me: bool = False):
 	await interaction.response.defer()
 	l = i18n.getChannelLocale(interaction.channel, interaction)
-	conn, cursor = connectDb()
-	if channel:
-		cursor.execute("SELECT id FROM channels WHERE discord_channel_id = ?", (str(channel.id),))
-		row = cursor.fetchone()
-		if not row:
-			conn.close()
-			await interaction.followup.send(f"❌ {channel.mention} {i18n.t(l, 'commands.lb.error')}.", ephemeral=True)
-			return
-		title = f"💜 {i18n.t(l, 'commands.lb.reactions.title')} #{channel.name}"
-		cursor.execute("""
-			SELECT users.discord_user_id, COUNT(r.id)
-			FROM reactions r
-			JOIN messages m ON r.message_id = m.id
-			JOIN users ON users.id = r.user_id
-			WHERE m.channel_id = ?
-			GROUP BY users.discord_user_id
-		""", (row[0],))
-	else:
-		title = f"💜 {i18n.t(l, 'commands.lb.reactions.gtitle')}"
-		cursor.execute("""
-			SELECT users.discord_user_id, COUNT(r.id)
-			FROM reactions r
-			JOIN users ON users.id = r.user_id
-			GROUP BY users.discord_user_id
-		""")
-	rows = cursor.fetchall()
-	conn.close()
-	data = []
-	for userId, cnt in rows:
-		name = await getUsername(userId, interaction)
-		data.append((name, cnt))
-	board = Leaderboard(interaction, title, data)
-	await board.start()
+	channelId = boardChannel(channel)
+	if channelId is None:
+		await interaction.followup.send(f"❌ {channel.mention} {i18n.t(l, 'commands.lb.error')}.", ephemeral=True)
+		return
+	title = f"💜 {i18n.t(l, 'commands.lb.reactions.title')} #{channel.name}" if channel else f"💜 {i18n.t(l, 'commands.lb.reactions.gtitle')}"
+	await openLeaderboard(interaction, title, "reactions", channelId, interaction.user.id if me else None)
 
 @leaderboardGroup.command(
 	name="delays",
@@ -182,64 +366,26 @@ async def reactionsLeaderboard(interaction: Interaction, channel: discord.TextCh
 @app_commands.describe(
 	channel=locale_str("commands.lb.arg.channel"),
 	worst=locale_str("commands.lb.delays.arg.worst"),
-	avg=locale_str("commands.lb.delays.arg.avg")
+	avg=locale_str("commands.lb.delays.arg.avg"),
+	me=locale_str("commands.lb.arg.me")
 )
-async def delaysLeaderboard(interaction: Interaction, channel: discord.TextChannel | None = None, worst: bool = False, avg: bool = False):
+async def delaysLeaderboard(interaction: Interaction, channel: discord.TextChannel | None = None, worst: bool = False, avg: bool = False, me: bool = False):
 	l = i18n.getChannelLocale(interaction.channel, interaction)
 	if worst and avg:
 		await interaction.response.send_message(f"❌ {i18n.t(l, 'commands.lb.delays.error')}.", ephemeral=True)
 		return
 
 	await interaction.response.defer()
-	conn, cursor = connectDb()
+	channelId = boardChannel(channel)
+	if channelId is None:
+		return await interaction.followup.send(f"❌ {channel.mention} is not registered.", ephemeral=True)
+	kind = i18n.t(l, 'commands.lb.delays.worst') if worst else i18n.t(l, 'commands.lb.delays.avg') if avg else i18n.t(l, 'commands.lb.delays.best')
 	if channel:
-		cursor.execute("SELECT id FROM channels WHERE discord_channel_id = ?", (str(channel.id),))
-		row = cursor.fetchone()
-		if not row:
-			conn.close()
-			return await interaction.followup.send(f"❌ {channel.mention} is not registered.", ephemeral=True)
-		title = f"⏱️ {i18n.t(l, 'commands.lb.delays.worst') if worst else i18n.t(l, 'commands.lb.delays.avg') if avg else i18n.t(l, 'commands.lb.delays.best')} {i18n.t(l, 'commands.lb.delays.title')} #{channel.name}"
-		cursor.execute(
-			"""
-			SELECT users.discord_user_id, m.timestamp
-			FROM messages m
-			JOIN users ON users.id = m.user_id
-			WHERE m.category = 'success' AND m.channel_id = ?
-		""", (row[0],))
+		title = f"⏱️ {kind} {i18n.t(l, 'commands.lb.delays.title')} #{channel.name}"
 	else:
-		title = f"⏱️ {i18n.t(l, 'commands.lb.delays.worst') if worst else i18n.t(l, 'commands.lb.delays.avg') if avg else i18n.t(l, 'commands.lb.delays.best')} {i18n.t(l, 'commands.lb.delays.gtitle')}"
-		cursor.execute(
-			"""
-			SELECT users.discord_user_id, m.timestamp
-			FROM messages m
-			JOIN users ON users.id = m.user_id
-			WHERE m.category = 'success'
-		""")
-	rows = cursor.fetchall()
-	conn.close()
-
-	deltasPerUser: dict[str, list[float]] = {}
-	for userId, ts in rows:
-		dt = datetime.fromisoformat(ts)
-		delta = dt.second + dt.microsecond / 1_000_000
-		deltasPerUser.setdefault(userId, []).append(delta)
-
-	data: list[tuple[str, float]] = []
-	for userId, deltas in deltasPerUser.items():
-		name = await getUsername(userId, interaction)
-		if avg:
-			value = round(sum(deltas) / len(deltas), 3)
-			name = f"{name} ({len(deltas)})"
-		elif worst:
-			value = max(deltas)
-		else:
-			value = min(deltas)
-
-		data.append((name, value))
-
-
-	board = Leaderboard(interaction, title, data, sortReverse=worst)
-	await board.start()
+		title = f"⏱️ {kind} {i18n.t(l, 'commands.lb.delays.gtitle')}"
+	board = "delays_avg" if avg else "delays_worst" if worst else "delays_best"
+	await openLeaderboard(interaction, title, board, channelId, interaction.user.id if me else None)
 
 @leaderboardGroup.command(
 	name="streaks",
@@ -247,77 +393,18 @@ async def delaysLeaderboard(interaction: Interaction, channel: discord.TextChann
 )
 @app_commands.describe(
 	channel=locale_str("commands.lb.arg.channel"),
-	current=locale_str("commands.lb.streaks.arg.current"))
-async def streaksLeaderboard(interaction: Interaction, channel: discord.TextChannel | None = None, current: bool = False):
+	current=locale_str("commands.lb.streaks.arg.current"),
+	me=locale_str("commands.lb.arg.me"))
+async def streaksLeaderboard(interaction: Interaction, channel: discord.TextChannel | None = None, current: bool = False, me: bool = False):
 	await interaction.response.defer()
 	l = i18n.getChannelLocale(interaction.channel, interaction)
-	conn, cursor = connectDb()
-
-	try:
-		if channel:
-			cursor.execute(
-				"SELECT id FROM channels WHERE discord_channel_id = ?",
-				(str(channel.id),)
-			)
-			row = cursor.fetchone()
-			if not row:
-				await interaction.followup.send(f"❌ {channel.mention} is not registered.", ephemeral=True)
-				return
-
-			title = f"🔥 {i18n.t(l, 'commands.lb.streaks.title')} #{channel.name}"
-
-			# get users who have success messages in that channel, join to user_streaks
-			cursor.execute(
-				"""
-				SELECT u.discord_user_id, u.timezone,
-					   COALESCE(us.current_streak, 0) AS current_streak,
-					   COALESCE(us.max_streak, 0) AS max_streak
-				FROM messages m
-				JOIN users u ON u.id = m.user_id
-				LEFT JOIN user_streaks us ON us.user_id = u.id
-				WHERE m.category = 'success' AND m.channel_id = ?
-				GROUP BY u.discord_user_id, u.timezone
-				ORDER BY u.discord_user_id
-				""",
-				(row[0],)
-			)
-		else:
-			# global: read all users from user_streaks (precomputed)
-			title = f"🔥 {i18n.t(l, 'commands.lb.streaks.gtitle')}"
-			cursor.execute(
-				"""
-				SELECT u.discord_user_id, u.timezone,
-					   COALESCE(us.current_streak, 0) AS current_streak,
-					   COALESCE(us.max_streak, 0) AS max_streak
-				FROM user_streaks us
-				JOIN users u ON u.id = us.user_id
-				ORDER BY u.discord_user_id
-				"""
-			)
-
-		rows = cursor.fetchall()
-	finally:
-		conn.close()
-
-	# rows: (discord_user_id, timezone, current_streak, max_streak)
-	data: list[tuple[str, int]] = []
-	for discordId, tzStr, currentStreak, bestStreak in rows:
-
-		name = await getUsername(discordId, interaction)
-
-		if current:
-			value = currentStreak
-			paren = f" ({bestStreak})" if bestStreak > currentStreak else ""
-			display = f"{name}{paren}"
-		else:
-			value = bestStreak
-			name = f" 🔥 {name}" if currentStreak >= bestStreak else name
-			display = f"{name}"
-
-		data.append((display, value))
-
-	board = Leaderboard(interaction, title, data)
-	await board.start()
+	channelId = boardChannel(channel)
+	if channelId is None:
+		await interaction.followup.send(f"❌ {channel.mention} is not registered.", ephemeral=True)
+		return
+	title = f"🔥 {i18n.t(l, 'commands.lb.streaks.title')} #{channel.name}" if channel else f"🔥 {i18n.t(l, 'commands.lb.streaks.gtitle')}"
+	board = "streaks_current" if current else "streaks_best"
+	await openLeaderboard(interaction, title, board, channelId, interaction.user.id if me else None)
 
 
 @leaderboardGroup.command(
@@ -328,56 +415,14 @@ async def streaksLeaderboard(interaction: Interaction, channel: discord.TextChan
 	channel=locale_str("commands.lb.arg.channel")
 )
 async def participationDaysLeaderboard(interaction: Interaction, channel: discord.TextChannel | None = None):
-	"""Show the top 10 days by count of distinct users with a success message."""
+	"""Show the days with the most distinct users with a success message."""
 	await interaction.response.defer()
 	l = i18n.getChannelLocale(interaction.channel.id, interaction)
-	conn, cursor = connectDb()
-
-	if channel:
-		cursor.execute(
-			"SELECT id FROM channels WHERE discord_channel_id = ?",
-			(str(channel.id),)
-		)
-		row = cursor.fetchone()
-		if not row:
-			conn.close()
-			return await interaction.followup.send(
-				f"❌ {channel.mention} {i18n.t(l, 'commands.lb.errors.error')}. Use `/add channel` first.",
-				ephemeral=True
-			)
-		chan_id = row[0]
-		title = f"📅 {i18n.t(l, 'commands.lb.days.title')} #{channel.name}"
-		cursor.execute(
-			"""
-			SELECT DATE(m.timestamp) as day, COUNT(DISTINCT m.user_id) as users_count
-			FROM messages m
-			WHERE m.category = 'success' AND m.channel_id = ?
-			GROUP BY day
-			ORDER BY users_count DESC
-			LIMIT 10
-			""",
-			(chan_id,)
+	chanId = boardChannel(channel)
+	if chanId is None:
+		return await interaction.followup.send(
+			f"❌ {channel.mention} {i18n.t(l, 'commands.lb.errors.error')}. Use `/add channel` first.",
+			ephemeral=True
 		)
-	else:
-		title = f"📅 {i18n.t(l, 'commands.lb.days.gtitle')}"
-		cursor.execute(
-			"""
-			SELECT DATE(m.timestamp) as day, COUNT(DISTINCT m.user_id) as users_count
-			FROM messages m
-			WHERE m.category = 'success'
-			GROUP BY day
-			ORDER BY users_count DESC
-			LIMIT 10
-			"""
-		)
-
-	rows = cursor.fetchall()
-	conn.close()
-
-	data: list[tuple[str,int]] = []
-	for day, count in rows:
-		formatted = datetime.fromisoformat(day).strftime("%d %b, %Y")
-		data.append((formatted, count))
-
-	board = Leaderboard(interaction, title, data, itemsPerPage=10, sortReverse=True)
-	await board.start()
+	title = f"📅 {i18n.t(l, 'commands.lb.days.title')} #{channel.name}" if channel else f"📅 {i18n.t(l, 'commands.lb.days.gtitle')}"
+	await openLeaderboard(interaction, title, "days", chanId)
@@ -1,12 +1,15 @@
 from email.mime import message
 
 import discord
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, time as dtTime, timedelta, timezone
 from zoneinfo import available_timezones
 
 from commands import OWNER_ID
 from utils.i18n import i18n
-from utils.utils import connectDb
+from database.asyncDb import db
+from database.identities import identities
+from database.messageIndex import successMessages
+from database.types import delayMs
 
 TIMEZONES = sorted(available_timezones())
 
@@ -16,46 +19,122 @@ CATEGORY_TIME_RANGES = [
 	("choke", "12:07:00", "12:08:00"),
 ]
 
+# Parsed once: [(category, start, end)] as datetime.time
+CATEGORY_TIMES = [
+	(category, datetime.strptime(start, "%H:%M:%S").time(), datetime.strptime(end, "%H:%M:%S").time())
+	for category, start, end in CATEGORY_TIME_RANGES
+]
+
 def getCategoryFromTime(time):
-	for category, start_str, end_str in CATEGORY_TIME_RANGES:
-		start = datetime.strptime(start_str, "%H:%M:%S").time()
-		end = datetime.strptime(end_str, "%H:%M:%S").time()
+	for category, start, end in CATEGORY_TIMES:
 		if start <= time < end:
 			return category
 	return None
 
-def isUserUntracked(userId, cursor):
-	cursor.execute("SELECT 1 FROM untracked_users WHERE discord_user_id = ?", (userId,))
-	return cursor.fetchone() is not None
+
+class CategoryWindows:
+	"""
+	Classify message timestamps against CATEGORY_TIME_RANGES without converting them to local time.
+	For each timezone, the ranges of the current local day are kept as UTC instants, together
+	with the UTC bounds of that day. They are recomputed only when a timestamp falls outside
+	those bounds, so every day (DST changes included) gets its own windows.
+	"""
+
+	def __init__(self):
+		self.byZone = {}	# tz key -> (dayStartUtc, dayEndUtc, windowStartUtc, windowEndUtc, [(category, startUtc, endUtc)])
+
+	def compute(self, tz, createdAt: datetime):
+		localDay = createdAt.astimezone(tz).date()
+		dayStart = datetime.combine(localDay, dtTime.min, tzinfo=tz).astimezone(timezone.utc)
+		dayEnd = datetime.combine(localDay + timedelta(days=1), dtTime.min, tzinfo=tz).astimezone(timezone.utc)
+		windows = [
+			(
+				category,
+				datetime.combine(localDay, start, tzinfo=tz).astimezone(timezone.utc),
+				datetime.combine(localDay, end, tzinfo=tz).astimezone(timezone.utc),
+			)
+			for category, start, end in CATEGORY_TIMES
+		]
+		entry = (dayStart, dayEnd, min(w[1] for w in windows), max(w[2] for w in windows), windows)
+		self.byZone[tz.key] = entry
+		return entry
+
+	def classify(self, createdAt: datetime, tz) -> str | None:
+		"""Return the category of a UTC timestamp in the given channel timezone, or None."""
+		if createdAt.tzinfo is None:
+			createdAt = createdAt.replace(tzinfo=timezone.utc)
+
+		entry = self.byZone.get(tz.key)
+		if entry is None or not (entry[0] <= createdAt < entry[1]):
+			entry = self.compute(tz, createdAt)
+
+		_, _, windowStart, windowEnd, windows = entry
+		if not (windowStart <= createdAt < windowEnd):
+			return None
+		for category, start, end in windows:
+			if start <= createdAt < end:
+				return category
+		return None
+
+
+categoryWindows = CategoryWindows()
+
+def isUserUntracked(userId):
+	return identities.isUntracked(userId)
 
 async def authorize(interaction: discord.Interaction) -> bool:
 	reqId = str(interaction.user.id)
 	l = i18n.getLocale(interaction)
-	conn, cursor = connectDb()
-	cursor.execute("SELECT 1 FROM admins WHERE discord_user_id = ?", (reqId,))
-	isAdmin = cursor.fetchone() is not None
-	conn.close()
-	if not isAdmin and reqId != OWNER_ID:
+	if not identities.isAdmin(reqId) and reqId != OWNER_ID:
 		await interaction.response.send_message(f"❌ {i18n.t(l, 'errors.notAuthorized')}", ephemeral=True)
 		return False
 	return True
 
-def getUserId(conn, cursor, userId):
-	"""Fetch the user id from the database, or insert it if it doesn't exist."""
-	cursor.execute("SELECT id FROM users WHERE discord_user_id = ?", (userId,))
-	row = cursor.fetchone()
-	if row:
-		return row[0]
-	cursor.execute("INSERT INTO users (discord_user_id) VALUES (?)", (userId,))
-	conn.commit()
-	return cursor.lastrowid
+def getUserId(cursor, userId):
+	"""Fetch the user id, or insert it if it doesn't exist. Committed by the caller's transaction."""
+	return identities.getUserId(cursor, userId)
+
+
+def storeFetchedMessage(cursor, internalChannelId, uidStr, discordMessageId, localDt, category):
+	"""Store one historical message unless it breaks the per-day rules. Returns its row id, or None."""
+	if isUserUntracked(uidStr):
+		return None
+	userId = getUserId(cursor, uidStr)
+	dayStr = localDt.strftime("%Y-%m-%d")
+
+	cursor.execute(
+		"SELECT category FROM messages WHERE user_id = ? AND channel_id = ? AND success_day = ?",
+		(userId, internalChannelId, dayStr)
+	)
+	existing = {r[0] for r in cursor.fetchall()}
+	if category in existing:
+		return None
+	if category == "fail" and existing & {"success", "choke"}:
+		return None
+	if category == "success" and "choke" in existing:
+		return None
+	if category == "choke" and "success" in existing:
+		return None
+
+	if category == "success":
+		cursor.execute(
+			"SELECT COUNT(*) FROM messages WHERE user_id = ? AND category = 'success' AND success_day = ?",
+			(userId, dayStr)
+		)
+		successCount = cursor.fetchone()[0]
+		if successCount >= 3:
+			return None
+
+	cursor.execute(
+		"INSERT OR IGNORE INTO messages (message_id, channel_id, user_id, timestamp, category, success_day, delay_ms) VALUES (?, ?, ?, ?, ?, ?, ?)",
+		(discordMessageId, internalChannelId, userId, localDt, category, dayStr, delayMs(localDt))
+	)
+	return cursor.lastrowid if cursor.rowcount == 1 else None
 
 
 async def fetchMessages(
 	channel,
 	internalChannelId,
-	cursor,
-	conn,
 	tz,
 	embedMsg,
 	startTime,
@@ -65,7 +144,6 @@ async def fetchMessages(
 	stored = 0
 	count = 0
 	messageMap = []
-	userCache = {}
 
 	historyKwargs = {
 			"oldest_first": True
@@ -93,52 +171,32 @@ async def fetchMessages(
 		if not category:
 			continue
 
-		uidStr = str(msg.author.id)
-		if isUserUntracked(uidStr, cursor):
+		rowId = await db.transaction(storeFetchedMessage, internalChannelId, str(msg.author.id), str(msg.id), localDt, category)
+		if rowId is None:
 			continue
-		if uidStr not in userCache:
-			userCache[uidStr] = getUserId(conn, cursor, uidStr)
-
-		userId = userCache[uidStr]
-		dayStr = localDt.strftime("%Y-%m-%d")
 
-		cursor.execute(
-			"SELECT category FROM messages WHERE user_id = ? AND channel_id = ? AND DATE(timestamp) = ?",
-			(userId, internalChannelId, dayStr)
-		)
-		existing = {r[0] for r in cursor.fetchall()}
-		if category in existing:
-			continue
-		if category == "fail" and existing & {"success", "choke"}:
-			continue
-		if category == "success" and "choke" in existing:
-			continue
-		if category == "choke" and "success" in existing:
-			continue
-
-		if category == "success":
-			cursor.execute(
-				"SELECT COUNT(*) FROM messages WHERE user_id = ? AND category = 'success' AND DATE(timestamp) = ?",
-				(userId, dayStr)
-			)
-			successCount = cursor.fetchone()[0]
-			if successCount >= 3:
-				continue
-
-		cursor.execute(
-			"INSERT OR IGNORE INTO messages (message_id, channel_id, user_id, timestamp, category) VALUES (?, ?, ?, ?, ?)",
-			(str(msg.id), internalChannelId, userId, localDt, category)
-		)
-		conn.commit()
 		stored += 1
 		if category == "success":
-			messageMap.append((cursor.lastrowid, msg.id))
+			messageMap.append((rowId, msg.id))
+			successMessages.put(msg.id, rowId)
 	return stored, messageMap
 
-async def fetchReactions(channel, cursor, conn, messageMap):
+def storeReactions(cursor, pendingInserts):
+	"""Insert (discordUserId, messageRowId) reactions, skipping untracked users. Returns the number kept."""
+	rows = []
+	for uidStr, internalId in pendingInserts:
+		if isUserUntracked(uidStr):
+			continue
+		rows.append((getUserId(cursor, uidStr), internalId))
+
+	cursor.executemany(
+		"INSERT OR IGNORE INTO reactions (user_id, message_id) VALUES (?, ?)",
+		rows)
+	return len(rows)
+
+async def fetchReactions(channel, messageMap):
 	"""Fetch and store new reactions, return count."""
 	count = 0
-	userCache = {}
 	pendingInserts = []
 
 	for internalId, discordId in messageMap:
@@ -156,28 +214,15 @@ async def fetchReactions(channel, cursor, conn, messageMap):
 					if user.bot:
 						continue
 
-					uidStr = str(user.id)
-					if isUserUntracked(uidStr, cursor):
-						continue
-					if uidStr not in userCache:
-						userCache[uidStr] = getUserId(conn, cursor, uidStr)
-
-					pendingInserts.append((userCache[uidStr], internalId))
-					count += 1
+					pendingInserts.append((str(user.id), internalId))
 					if len(pendingInserts) >= 100:
-						cursor.executemany(
-							"INSERT OR IGNORE INTO reactions (user_id, message_id) VALUES (?, ?)",
-							pendingInserts)
-						conn.commit()
-						pendingInserts.clear()
+						count += await db.transaction(storeReactions, pendingInserts)
+						pendingInserts = []
 			except Exception as e:
 				print(f"Error fetching users for message {discordId}: {e}")
 
 	if pendingInserts:
-		cursor.executemany(
-			"INSERT OR IGNORE INTO reactions (user_id, message_id) VALUES (?, ?)",
-			pendingInserts)
-		conn.commit()
+		count += await db.transaction(storeReactions, pendingInserts)
 
 	return count
 
@@ -212,7 +257,7 @@ def calculateStreak(dates):
 	return maxStreak, currentStreak, lastDate
 
 
-def batchUpdateStreaks(cursor, conn, internalChannelId, messageMap):
+def batchUpdateStreaks(cursor, internalChannelId, messageMap):
 	"""
 	Update streak tables (user, channel, global) using only 'success' messages.
 	- messageMap: list of (messageRowId, discordMessageId)
@@ -232,7 +277,7 @@ def batchUpdateStreaks(cursor, conn, internalChannelId, messageMap):
 
 	# --- 2) Channel streak ---
 	cursor.execute(
-		"SELECT DISTINCT DATE(timestamp) FROM messages WHERE channel_id = ? AND category='success' ORDER BY DATE(timestamp) ASC",
+		"SELECT DISTINCT success_day FROM messages WHERE channel_id = ? AND category='success' ORDER BY success_day ASC",
 		(internalChannelId,)
 	)
 	channelDates = [datetime.fromisoformat(r[0]).date() for r in cursor.fetchall()]
@@ -252,7 +297,7 @@ def batchUpdateStreaks(cursor, conn, internalChannelId, messageMap):
 
 	# --- 3) User streaks ---
 	cursor.execute(
-		f"SELECT user_id, DATE(timestamp) FROM messages WHERE category='success' AND user_id IN ({','.join('?' for _ in userRows)}) ORDER BY user_id, DATE(timestamp) ASC",
+		f"SELECT DISTINCT user_id, success_day FROM messages WHERE category='success' AND user_id IN ({','.join('?' for _ in userRows)}) ORDER BY user_id, success_day ASC",
 		tuple(userRows)
 	)
 	datesByUser = {}
@@ -275,7 +320,7 @@ def batchUpdateStreaks(cursor, conn, internalChannelId, messageMap):
 			)
 
 	# --- 4) Global streak ---
-	cursor.execute("SELECT DISTINCT DATE(timestamp) FROM messages WHERE category='success' ORDER BY DATE(timestamp) ASC")
+	cursor.execute("SELECT DISTINCT success_day FROM messages WHERE category='success' ORDER BY success_day ASC")
 	globalDates = [datetime.fromisoformat(r[0]).date() for r in cursor.fetchall()]
 	globalMax, globalCurrent, globalLast = calculateStreak(globalDates)
 	if globalLast:
@@ -291,10 +336,9 @@ def batchUpdateStreaks(cursor, conn, internalChannelId, messageMap):
 			(globalCurrent, globalMax, globalLast)
 		)
 
-	conn.commit()
 	return (channelCurrent, channelMax), (globalCurrent, globalMax)
 
-async def generateSummary(cursor, channelId, stored, reacted, l, chStreaks=None, glStreaks=None):
+def generateSummary(cursor, channelId, stored, reacted, l, chStreaks=None, glStreaks=None):
 	cursor.execute("SELECT category,COUNT(*) FROM messages WHERE channel_id=? GROUP BY category", (channelId,))
 	counts={r[0]:r[1] for r in cursor.fetchall()}
 
@@ -5,7 +5,9 @@ from zoneinfo import ZoneInfo
 
 from commands import FOOTER_TEXT, statGroup
 from utils.i18n import i18n, locale_str
-from utils.utils import connectDb, escapeMarkdown
+from database.asyncDb import db
+from database.counters import getCounters
+from utils.utils import escapeMarkdown
 
 
 DEFAULT_CUTOFF = time(12, 7)
@@ -70,77 +72,77 @@ def computeStreakString(current: int, best: int, lastDay: date | None, tz: timez
 	return f"{best} {i18n.t(l, 'commands.stat.cDays')}: {currentStreak})"
 
 
-def calculateDelays(timestamps):
-	"""Returns the delay in seconds from the start of the minute for each timestamp."""
-	delays = [ts.second + ts.microsecond / 1_000_000 for ts in timestamps]
-	if not delays:
+def fetchDelays(cursor, whereClause="", params=()):
+	"""Returns (min, avg, max, last) success delays in seconds from the start of the minute."""
+	where = addCondition(whereClause, "m.category = 'success'")
+	cursor.execute(f"SELECT MIN(m.delay_ms), AVG(m.delay_ms), MAX(m.delay_ms) FROM messages m {where}", params)
+	minD, avgD, maxD = cursor.fetchone()
+	if minD is None:
 		return 0, 0, 0, 0
-	return min(delays), sum(delays) / len(delays), max(delays), delays[-1]
+	cursor.execute(f"""
+		SELECT m.delay_ms
+		FROM messages m
+		{where}
+		ORDER BY m.success_day DESC, m.timestamp DESC
+		LIMIT 1
+	""", params)
+	lastD = cursor.fetchone()[0]
+	return minD / 1000, avgD / 1000, maxD / 1000, lastD / 1000
 
 
 # -----------------------------
 # Stats Embed
 # -----------------------------
+def fetchStats(cursor, whereClause="", params=(), isUser=False):
+	"""
+	Gather every number shown in a stats embed.
+	Returns (categoryCounts, totalReceived, totalGiven, userTz, (current, best, lastDay), delays).
+	"""
+	# --- Messages and reactions counts ---
+	entityId = None
+	if isUser:
+		scope = "user"
+		row = cursor.execute("SELECT id FROM users WHERE discord_user_id = ?", params).fetchone()
+		entityId = row[0] if row else None
+	elif "channel_id" in whereClause:
+		scope = "channel"
+		row = cursor.execute("SELECT id FROM channels WHERE discord_channel_id = ?", params).fetchone()
+		entityId = row[0] if row else None
+	else:
+		scope = "global"
+	categoryCounts = getCounters(cursor, scope, entityId)
+	totalReceived = categoryCounts.get("reactions_received", 0)
+
+	totalGiven = None
+	if isUser:
+		totalGiven = categoryCounts.get("reactions_given", 0)
+		userTz = getUserTimezone(cursor, params[0])
+	else:
+		userTz = timezone.utc
+
+	# --- Streaks ---
+	if isUser:
+		streak = fetchStreak(cursor, "user_streaks", whereClause, params)
+	elif "channel_id" in whereClause:
+		streak = fetchStreak(cursor, "channel_streaks", whereClause, params)
+	else:
+		streak = fetchStreak(cursor, "global_streak")
+
+	return categoryCounts, totalReceived, totalGiven, userTz, streak, fetchDelays(cursor, whereClause, params)
+
+
 async def sendStatsEmbed(interaction, title, whereClause="", params=(), isUser=False):
 	l = i18n.getLocale(interaction)
-	conn, cursor = connectDb()
-	try:
-		# --- Messages counts ---
-		cursor.execute(f"""
-			SELECT category, COUNT(*) 
-			FROM messages m
-			{whereClause}
-			GROUP BY category
-		""", params)
-		categoryCounts = {row[0]: row[1] for row in cursor.fetchall()}
-
-		# --- Reactions counts ---
-		cursor.execute(f"""
-			SELECT COUNT(*)
-			FROM reactions r
-			JOIN messages m ON r.message_id = m.id
-			{whereClause.replace("m.", "m.")}
-		""", params)
-		totalReceived = cursor.fetchone()[0]
-
-		totalGiven = None
-		if isUser:
-			cursor.execute("""
-				SELECT COUNT(*)
-				  FROM reactions r
-				 WHERE r.user_id = (
-				   SELECT id FROM users WHERE discord_user_id = ?
-				 )
-			""", params)
-			totalGiven = cursor.fetchone()[0]
-			reactionsStr = f"{i18n.t(l, 'commands.stat.reactions.received')}: {totalReceived} 💜\n{i18n.t(l, 'commands.stat.reactions.given')}: {totalGiven} 💜"
-			userTz = getUserTimezone(cursor, params[0])
-		else:
-			reactionsStr = f"{totalReceived} 💜"
-			userTz = timezone.utc
-
-		# --- Streaks ---
-		if isUser:
-			current, best, lastDay = fetchStreak(cursor, "user_streaks", whereClause, params)
-		elif "channel_id" in whereClause:
-			current, best, lastDay = fetchStreak(cursor, "channel_streaks", whereClause, params)
-		else:
-			current, best, lastDay = fetchStreak(cursor, "global_streak")
-
-		streakStr = computeStreakString(current, best, lastDay, userTz, l)
-
-		# --- Success delays ---
-		streakWhere = addCondition(whereClause, "m.category = 'success'")
-		cursor.execute(f"""
-			SELECT m.timestamp
-			FROM messages m
-			{streakWhere}
-		""", params)
-		timestamps = [datetime.fromisoformat(r[0]) for r in cursor.fetchall()]
-		minD, avgD, maxD, lastD = calculateDelays(timestamps)
+	categoryCounts, totalReceived, totalGiven, userTz, (current, best, lastDay), (minD, avgD, maxD, lastD) = await db.read(
+		fetchStats, whereClause, params, isUser
+	)
+
+	if isUser:
+		reactionsStr = f"{i18n.t(l, 'commands.stat.reactions.received')}: {totalReceived} 💜\n{i18n.t(l, 'commands.stat.reactions.given')}: {totalGiven} 💜"
+	else:
+		reactionsStr = f"{totalReceived} 💜"
 
-	finally:
-		conn.close()
+	streakStr = computeStreakString(current, best, lastDay, userTz, l)
 
 	embed = discord.Embed(title=title, color=discord.Color.purple())
 	embed.add_field(
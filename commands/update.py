@@ -6,7 +6,8 @@ from zoneinfo import ZoneInfo
 from commands import makeEmbed, updateGroup, OWNER_ID
 from commands.populateDb import authorize, batchUpdateStreaks, fetchMessages, fetchReactions, generateSummary
 from utils.i18n import i18n, locale_str
-from utils.utils import connectDb, timezoneAutocomplete, safeEmbed
+from database.asyncDb import db
+from utils.utils import timezoneAutocomplete, safeEmbed
 
 @updateGroup.command(
 	name="channel",
@@ -26,18 +27,15 @@ async def updateChannelCommand(
 
 	l = i18n.getLocale(interaction)
 
-	conn, cursor = connectDb()
-	cursor.execute(
+	row = await db.fetchone(
 		"SELECT id, timezone FROM channels WHERE discord_channel_id = ?",
 		(str(channel.id),)
 	)
-	row = cursor.fetchone()
 	if not row:
 		await interaction.response.send_message(
 			f"❌ {i18n.t(l, 'commands.update.errors.notFound')}",
 			ephemeral=True
 		)
-		conn.close()
 		return
 
 	internalId, tzName = row
@@ -58,34 +56,29 @@ async def updateChannelCommand(
 			fetchFrom = fetchFrom.replace(tzinfo=ZoneInfo(tzName)).astimezone(timezone.utc)
 		except Exception as e:
 			await interaction.followup.send(f"❌ {i18n.t(l, 'commands.update.errors.date')}: {e}", ephemeral=True)
-			conn.close()
 			return
 
 	stored, msgMap = await fetchMessages(
 		channel,
 		internalId,
-		cursor,
-		conn,
 		ZoneInfo(tzName),
 		embedMsg,
 		addStart,
 		fromDate=fetchFrom
 	)
 
-	(chCurr, chMax), (glCurr, glMax) = batchUpdateStreaks(cursor, conn, internalId, msgMap)
+	(chCurr, chMax), (glCurr, glMax) = await db.transaction(batchUpdateStreaks, internalId, msgMap)
 
 	await safeEmbed(
 		interaction,
 		embed=makeEmbed(f"{i18n.t(l, 'commands.update.channel.embed2.title')}...", f"{i18n.t(l, 'commands.update.channel.embed2.desc')} 💜"),
 		message=embedMsg
 	)
-	reacted = await fetchReactions(channel, cursor, conn, msgMap)
+	reacted = await fetchReactions(channel, msgMap)
 
-	summary = await generateSummary(cursor, internalId, stored, reacted, l, (chCurr, chMax), (glCurr, glMax))
+	summary = await db.read(generateSummary, internalId, stored, reacted, l, (chCurr, chMax), (glCurr, glMax))
 	await safeEmbed(interaction, embed=makeEmbed(f"✅ {i18n.t(l, 'commands.add.channel.Done')}", summary), message=embedMsg)
 
-	conn.close()
-
 
 @updateGroup.command(
 	name="all",
@@ -115,13 +108,9 @@ async def updateAllChannelsCommand(interaction: discord.Interaction, from_date:
 		return
 
 	await interaction.response.defer()
-	conn, cursor = connectDb()
-
-	cursor.execute("SELECT id, discord_channel_id, timezone FROM channels")
-	channels = cursor.fetchall()
+	channels = await db.fetchall("SELECT id, discord_channel_id, timezone FROM channels")
 	if not channels:
 		await interaction.followup.send(f"❌ {i18n.t(l, 'commands.update.all.errors.noChannels')}", ephemeral=True)
-		conn.close()
 		return
 
 	embedMsg = await interaction.followup.send(embed=makeEmbed(f"{i18n.t(l, 'commands.update.all.embed.title')}...", f"{i18n.t(l, 'commands.update.all.embed.desc')} {from_date}⏳"))
@@ -140,9 +129,9 @@ async def updateAllChannelsCommand(interaction: discord.Interaction, from_date:
 				continue
 
 
-		stored, msgMap = await fetchMessages(ch, internalId, cursor, conn, ZoneInfo(tzName), embedMsg, datetime.now(timezone.utc), fromDate=fetchFrom)
-		(chCurr, chMax), (glCurr, glMax) = batchUpdateStreaks(cursor, conn, internalId, msgMap)
-		reacted = await fetchReactions(ch, cursor, conn, msgMap)
+		stored, msgMap = await fetchMessages(ch, internalId, ZoneInfo(tzName), embedMsg, datetime.now(timezone.utc), fromDate=fetchFrom)
+		(chCurr, chMax), (glCurr, glMax) = await db.transaction(batchUpdateStreaks, internalId, msgMap)
+		reacted = await fetchReactions(ch, msgMap)
 
 		totalStored += stored
 		totalReacted += reacted
@@ -150,7 +139,6 @@ async def updateAllChannelsCommand(interaction: discord.Interaction, from_date:
 			f"📌 {ch.guild.name if ch.guild else i18n.t(l, 'commands.update.all.guildSummary.unknown')} - [{ch.name}]:\n    {i18n.t(l, 'commands.update.all.guildSummary.p1')} {stored}, {i18n.t(l, 'commands.update.all.guildSummary.p2')} {reacted}, {i18n.t(l, 'commands.update.all.guildSummary.p3')} ({chCurr}/{chMax}), {i18n.t(l, 'commands.update.all.guildSummary.p4')} ({glCurr}/{glMax})"
 		)
 
-	conn.close()
 	await safeEmbed(interaction, embed=makeEmbed(f"✅ {i18n.t(l, 'commands.update.all.success')}", "\n".join(summaryLines)), message=embedMsg)
 
 
@@ -171,22 +159,17 @@ async def updateTimezoneCommand(interaction: discord.Interaction, tz: str):
 		await interaction.response.send_message(f"❌ {i18n.t(l, 'commands.update.timezone.errors.invalid')}: `{tz}`", ephemeral=True)
 		return
 
-	conn, cursor = connectDb()
 	discordUserId = str(interaction.user.id)
 
-	cursor.execute("SELECT id FROM users WHERE discord_user_id = ?", (discordUserId,))
-	row = cursor.fetchone()
+	row = await db.fetchone("SELECT id FROM users WHERE discord_user_id = ?", (discordUserId,))
 
 	if row:
-		cursor.execute("UPDATE users SET timezone = ? WHERE discord_user_id = ?", (tz, discordUserId))
+		await db.write("UPDATE users SET timezone = ? WHERE discord_user_id = ?", (tz, discordUserId))
 		msg = f"✅ {i18n.t(l, 'commands.update.timezone.success')} `{tz}`"
 	else:
-		cursor.execute("INSERT INTO users (discord_user_id, timezone) VALUES (?, ?)", (discordUserId, tz))
+		await db.write("INSERT INTO users (discord_user_id, timezone) VALUES (?, ?)", (discordUserId, tz))
 		msg = f"✅ {i18n.t(l, 'commands.update.timezone.created')} `{tz}`"
 
-	conn.commit()
-	conn.close()
-
 	await interaction.response.send_message(msg, ephemeral=True)
 
 CHANNEL_DEFAULT_TZ = ZoneInfo("Europe/Paris")
@@ -220,21 +203,8 @@ def calculateStreak(dates, now):
 
 	return max_streak, current_streak, last_date
 
-@updateGroup.command(
-	name="streaks",
-	description=locale_str("commands.update.streaks.description")
-)
-async def updateStreaksCommand(interaction: discord.Interaction):
-	l = i18n.getLocale(interaction)
-	# Check owner
-	if str(interaction.user.id) != OWNER_ID:
-		await interaction.response.send_message(f"❌ {i18n.t(l, 'commands.update.all.errors.notOwner')}", ephemeral=True)
-		return
-
-	await interaction.response.defer()
-	embed = await interaction.followup.send(embed=makeEmbed(f"{i18n.t(l, 'commands.update.streaks.embed.title')}...", f"{i18n.t(l, 'commands.update.streaks.embed.desc1')} ⏳"))
-	conn, cursor = connectDb()
-
+def recomputeUserStreaks(cursor):
+	"""Rebuild every user's streak from their success messages."""
 	cursor.execute("SELECT id, timezone FROM users")
 	users = cursor.fetchall()
 
@@ -243,10 +213,10 @@ async def updateStreaksCommand(interaction: discord.Interaction):
 
 		# Get all success message dates for this user
 		cursor.execute("""
-			SELECT DISTINCT DATE(timestamp)
+			SELECT DISTINCT success_day
 			FROM messages
 			WHERE user_id = ? AND category = 'success'
-			ORDER BY DATE(timestamp) ASC
+			ORDER BY success_day ASC
 		""", (user_id,))
 		rows = cursor.fetchall()
 		if not rows:
@@ -267,8 +237,8 @@ async def updateStreaksCommand(interaction: discord.Interaction):
 				last_success_date=excluded.last_success_date
 		""", (user_id, current_streak, max_streak, last_date.isoformat()))
 
-	await safeEmbed(interaction, embed=makeEmbed(f"✅ {i18n.t(l, 'commands.update.streaks.embed.title')}...", f"{i18n.t(l, 'commands.update.streaks.embed.desc2')} 💜"), message=embed)
-
+def recomputeChannelStreaks(cursor):
+	"""Rebuild every channel's streak from its success messages."""
 	cursor.execute("SELECT id, timezone FROM channels")
 	channels = cursor.fetchall()
 
@@ -276,10 +246,10 @@ async def updateStreaksCommand(interaction: discord.Interaction):
 		channel_tz = ZoneInfo(tz_str) if tz_str else CHANNEL_DEFAULT_TZ
 
 		cursor.execute("""
-			SELECT DISTINCT DATE(timestamp)
+			SELECT DISTINCT success_day
 			FROM messages
 			WHERE channel_id = ? AND category = 'success'
-			ORDER BY DATE(timestamp)
+			ORDER BY success_day
 		""", (channel_id,))
 		rows = cursor.fetchall()
 		dates = [datetime.fromisoformat(r[0]).date() for r in rows]
@@ -297,15 +267,13 @@ async def updateStreaksCommand(interaction: discord.Interaction):
 				last_success_date = excluded.last_success_date
 		""", (channel_id, current_streak, max_streak, last_date.isoformat()))
 
-	await safeEmbed(interaction, embed=makeEmbed(f"✅ {i18n.t(l, 'commands.update.streaks.embed.title')}...", f"{i18n.t(l, 'commands.update.streaks.embed.desc3')} 💜"), message=embed)
-	# -------------------
-	# Global streak
-	# -------------------
+def recomputeGlobalStreak(cursor):
+	"""Rebuild the global streak from all success messages."""
 	cursor.execute("""
-		SELECT DISTINCT DATE(timestamp)
+		SELECT DISTINCT success_day
 		FROM messages
 		WHERE category = 'success'
-		ORDER BY DATE(timestamp)
+		ORDER BY success_day
 	""")
 	rows = cursor.fetchall()
 	dates = [datetime.fromisoformat(r[0]).date() for r in rows]
@@ -323,7 +291,25 @@ async def updateStreaksCommand(interaction: discord.Interaction):
 				last_success_date = excluded.last_success_date
 		""", (current_streak, max_streak, last_date.isoformat()))
 
-	conn.commit()
-	conn.close()
+@updateGroup.command(
+	name="streaks",
+	description=locale_str("commands.update.streaks.description")
+)
+async def updateStreaksCommand(interaction: discord.Interaction):
+	l = i18n.getLocale(interaction)
+	# Check owner
+	if str(interaction.user.id) != OWNER_ID:
+		await interaction.response.send_message(f"❌ {i18n.t(l, 'commands.update.all.errors.notOwner')}", ephemeral=True)
+		return
+
+	await interaction.response.defer()
+	embed = await interaction.followup.send(embed=makeEmbed(f"{i18n.t(l, 'commands.update.streaks.embed.title')}...", f"{i18n.t(l, 'commands.update.streaks.embed.desc1')} ⏳"))
+
+	await db.transaction(recomputeUserStreaks)
+	await safeEmbed(interaction, embed=makeEmbed(f"✅ {i18n.t(l, 'commands.update.streaks.embed.title')}...", f"{i18n.t(l, 'commands.update.streaks.embed.desc2')} 💜"), message=embed)
+
+	await db.transaction(recomputeChannelStreaks)
+	await safeEmbed(interaction, embed=makeEmbed(f"✅ {i18n.t(l, 'commands.update.streaks.embed.title')}...", f"{i18n.t(l, 'commands.update.streaks.embed.desc3')} 💜"), message=embed)
 
+	await db.transaction(recomputeGlobalStreak)
 	await safeEmbed(interaction, embed=makeEmbed(f"✅ {i18n.t(l, 'commands.update.streaks.embed.title')}...", f"{i18n.t(l, 'commands.update.streaks.embed.desc4')} 💜"), message=embed)
@@ -2,7 +2,9 @@ import discord
 from commands import bot
 
 from utils.i18n import i18n, locale_str
-from utils.utils import connectDb
+from database.asyncDb import db
+from database.identities import identities
+from database.messageIndex import successMessages
 
 INVITE_PERMISSIONS = discord.Permissions()
 INVITE_PERMISSIONS.update(
@@ -132,6 +134,36 @@ async def helpCommand(interaction: discord.Interaction):
 	await interaction.response.send_message(embed=embed)
 
 
+def untrackUser(cursor, discordUserId):
+	"""
+	Delete a user's data and mark them untracked.
+	Returns (errorKey, None) when nothing was done, else (None, (messageCount, reactionCount)).
+	"""
+	if identities.isUntracked(discordUserId):
+		return "error1", None
+
+	cursor.execute("SELECT id FROM users WHERE discord_user_id=?", (discordUserId,))
+	userRow = cursor.fetchone()
+	if not userRow:
+		return "error2", None
+	userId = userRow[0]
+
+	cursor.execute("SELECT COUNT(*) FROM messages WHERE user_id=?", (userId,))
+	messageCount = cursor.fetchone()[0]
+	cursor.execute("SELECT COUNT(*) FROM reactions WHERE user_id=?", (userId,))
+	reactionCount = cursor.fetchone()[0]
+
+	cursor.execute("DELETE FROM messages WHERE user_id=?", (userId,))
+	cursor.execute("DELETE FROM reactions WHERE user_id=?", (userId,))
+	cursor.execute("DELETE FROM users WHERE id=?", (userId,))
+
+	cursor.execute(
+		"INSERT OR IGNORE INTO untracked_users (discord_user_id) VALUES (?)",
+		(discordUserId,)
+	)
+	return None, (messageCount, reactionCount)
+
+
 class UntrackConfirm(discord.ui.View):
 	def __init__(self, discordUserId, locale="fr"):
 		super().__init__(timeout=60)
@@ -140,42 +172,15 @@ class UntrackConfirm(discord.ui.View):
 		self.add_item(discord.ui.Button(label=i18n.t(locale, "commands.untrack.confirmView.button"), style=discord.ButtonStyle.danger, callback=self.confirm))
 
 	async def confirm(self, interaction: discord.Interaction):
-		conn, cursor = connectDb()
-
-		cursor.execute("SELECT 1 FROM untracked_users WHERE discord_user_id=?", (str(self.discordUserId),))
-		if cursor.fetchone():
+		error, counts = await db.transaction(untrackUser, str(self.discordUserId))
+		if error:
 			await interaction.response.edit_message(
-				content=f"⚠️ {i18n.t(self.locale, 'commands.untrack.error1')}.", view=None
+				content=f"⚠️ {i18n.t(self.locale, f'commands.untrack.{error}')}.", view=None
 			)
-			conn.close()
 			return
-
-		cursor.execute("SELECT id FROM users WHERE discord_user_id=?", (str(self.discordUserId),))
-		userRow = cursor.fetchone()
-		if not userRow:
-			await interaction.response.edit_message(
-				content=f"⚠️ {i18n.t(self.locale, 'commands.untrack.error2')}.", view=None
-			)
-			conn.close()
-			return
-		userId = userRow[0]
-
-		cursor.execute("SELECT COUNT(*) FROM messages WHERE user_id=?", (userId,))
-		messageCount = cursor.fetchone()[0]
-		cursor.execute("SELECT COUNT(*) FROM reactions WHERE user_id=?", (userId,))
-		reactionCount = cursor.fetchone()[0]
-
-		cursor.execute("DELETE FROM messages WHERE user_id=?", (userId,))
-		cursor.execute("DELETE FROM reactions WHERE user_id=?", (userId,))
-		cursor.execute("DELETE FROM users WHERE id=?", (userId,))
-
-		cursor.execute(
-			"INSERT OR IGNORE INTO untracked_users (discord_user_id) VALUES (?)",
-			(str(self.discordUserId),)
-		)
-
-		conn.commit()
-		conn.close()
+		identities.markUntracked(self.discordUserId)
+		successMessages.clear()	# the user's messages are gone
+		messageCount, reactionCount = counts
 
 		await interaction.response.edit_message(
 			content=f"✅ {i18n.t(self.locale, 'commands.untrack.success.part1')}.\n**{messageCount} {i18n.t(self.locale, 'commands.untrack.success.part2')}** and **{reactionCount} {i18n.t(self.locale, 'commands.untrack.success.part3')}.",
@@ -0,0 +1,119 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from database.pool import ConnectionPool, pool
+from utils.utils import log
+
+READER_THREADS = 3
+
+
+class AsyncDb:
+	"""
+	Async facade that keeps SQLite I/O off the event loop.
+	- Reads run on a few reader threads, each borrowing a pooled connection.
+	- Writes are serialized on a single writer thread that owns its own connection,
+	  so they never contend with each other for the database lock.
+	"""
+
+	def __init__(self, connectionPool: ConnectionPool, readers: int = READER_THREADS):
+		self.pool = connectionPool
+		self.readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="db-reader")
+		self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+		self.writerConn = None
+		self.closeHooks = []
+		self.rollbackHooks = []
+		self.drained = False
+		self.closed = False
+
+	async def runIn(self, executor, fn, *args):
+		loop = asyncio.get_running_loop()
+		return await loop.run_in_executor(executor, functools.partial(fn, *args))
+
+	# --- Thread-side helpers ---
+	def readSync(self, fn, *args):
+		with self.pool.connection() as (conn, cursor):
+			return fn(cursor, *args)
+
+	def transactionSync(self, fn, *args):
+		if self.writerConn is None:
+			self.writerConn = self.pool.open()
+		conn = self.writerConn
+		cursor = conn.cursor()
+		try:
+			cursor.execute("BEGIN IMMEDIATE")
+			result = fn(cursor, *args)
+			conn.commit()
+			return result
+		except Exception:
+			conn.rollback()
+			self.rolledBack()
+			raise
+		finally:
+			cursor.close()
+
+	# --- Public API ---
+	async def read(self, fn, *args):
+		"""Run fn(cursor, *args) on a reader thread and return its result."""
+		return await self.runIn(self.readers, self.readSync, fn, *args)
+
+	async def transaction(self, fn, *args):
+		"""Run fn(cursor, *args) on the writer thread inside a single transaction."""
+		return await self.runIn(self.writer, self.transactionSync, fn, *args)
+
+	async def fetchall(self, sql: str, params=()) -> list[tuple]:
+		return await self.read(lambda cursor: cursor.execute(sql, params).fetchall())
+
+	async def fetchone(self, sql: str, params=()) -> tuple | None:
+		return await self.read(lambda cursor: cursor.execute(sql, params).fetchone())
+
+	async def write(self, sql: str, params=()) -> int:
+		"""Execute a single write statement and return the last inserted row id."""
+		return await self.transaction(lambda cursor: cursor.execute(sql, params).lastrowid)
+
+	def addRollbackHook(self, hook):
+		"""Register a plain callable run on the writer thread whenever a transaction or savepoint rolls back."""
+		self.rollbackHooks.append(hook)
+
+	def rolledBack(self):
+		for hook in self.rollbackHooks:
+			try:
+				hook()
+			except Exception as e:
+				log(f"Database rollback hook failed: {e}")
+
+	# --- Lifecycle ---
+	def addCloseHook(self, hook):
+		"""Register a coroutine function awaited on shutdown, before the executors stop."""
+		self.closeHooks.append(hook)
+
+	async def drain(self):
+		"""
+		Await the close hooks, once: buffered writes are flushed and the work they queue has run.
+		The executors stay up, so whatever still has to reach Discord can be sent before close().
+		"""
+		if self.drained:
+			return
+		self.drained = True
+
+		for hook in self.closeHooks:
+			try:
+				await hook()
+			except Exception as e:
+				log(f"Database close hook failed: {e}")
+
+	async def close(self):
+		if self.closed:
+			return
+		self.closed = True
+		await self.drain()
+
+		self.readers.shutdown(wait=True)
+		self.writer.shutdown(wait=True)
+		if self.writerConn is not None:
+			self.writerConn.close()
+			self.writerConn = None
+		self.pool.closeAll()
+
+
+db = AsyncDb(pool)
@@ -0,0 +1,83 @@
+from dataclasses import dataclass
+from zoneinfo import ZoneInfo
+
+from utils.utils import log
+
+DEFAULT_TZ = ZoneInfo("Europe/Paris")
+
+
+@dataclass(frozen=True, slots=True)
+class ChannelConfig:
+	id: int	# channels.id
+	discordChannelId: int
+	tz: ZoneInfo
+	discordRoleId: int | None
+	lang: str | None
+
+
+def makeConfig(internalId, discordChannelId, tzName, discordRoleId, lang) -> ChannelConfig:
+	try:
+		tz = ZoneInfo(tzName) if tzName else DEFAULT_TZ
+	except Exception:
+		log(f"Invalid timezone {tzName} for channel {discordChannelId}, using {DEFAULT_TZ.key}")
+		tz = DEFAULT_TZ
+	return ChannelConfig(
+		id=internalId,
+		discordChannelId=int(discordChannelId),
+		tz=tz,
+		discordRoleId=int(discordRoleId) if discordRoleId else None,
+		lang=lang,
+	)
+
+
+class ChannelRegistry:
+	"""
+	Process-wide copy of the channels table, keyed by Discord channel id.
+	Loaded once at startup; commands that change a channel must update it through `put` / `remove`
+	so event handlers can resolve channels without touching the database.
+	Listeners registered with `addListener` are called as listener(previous, current) on every
+	put / remove, with None for a channel that didn't exist or was removed.
+	"""
+
+	def __init__(self):
+		self.byDiscordId: dict[int, ChannelConfig] = {}
+		self.listeners = []
+
+	def addListener(self, listener):
+		self.listeners.append(listener)
+
+	def notify(self, previous: ChannelConfig | None, current: ChannelConfig | None):
+		for listener in self.listeners:
+			try:
+				listener(previous, current)
+			except Exception as e:
+				log(f"Channel listener failed: {e}")
+
+	def load(self, cursor):
+		cursor.execute("SELECT id, discord_channel_id, timezone, discord_role_id, lang FROM channels")
+		self.byDiscordId = {}
+		for row in cursor.fetchall():
+			config = makeConfig(*row)
+			self.byDiscordId[config.discordChannelId] = config
+		log(f"Loaded {len(self.byDiscordId)} channel configurations.")
+
+	def get(self, discordChannelId) -> ChannelConfig | None:
+		return self.byDiscordId.get(int(discordChannelId))
+
+	def put(self, internalId: int, discordChannelId, tzName: str | None, discordRoleId, lang: str | None) -> ChannelConfig:
+		config = makeConfig(internalId, discordChannelId, tzName, discordRoleId, lang)
+		previous = self.byDiscordId.get(config.discordChannelId)
+		self.byDiscordId[config.discordChannelId] = config
+		self.notify(previous, config)
+		return config
+
+	def remove(self, discordChannelId):
+		previous = self.byDiscordId.pop(int(discordChannelId), None)
+		if previous is not None:
+			self.notify(previous, None)
+
+	def all(self) -> list[ChannelConfig]:
+		return list(self.byDiscordId.values())
+
+
+channels = ChannelRegistry()
@@ -0,0 +1,105 @@
+import asyncio
+
+from utils.utils import log
+
+BATCH_WINDOW = 0.005	# seconds to wait for more submissions before committing
+MAX_BATCH = 256
+
+
+def runBatch(cursor, units, onRollback=None):
+	"""
+	Apply each (fn, args) unit in order inside the current transaction.
+	Every unit runs under its own savepoint, so a failing one is rolled back alone.
+	Returns a list of (ok, resultOrException).
+	"""
+	results = []
+	for fn, args in units:
+		cursor.execute("SAVEPOINT unit")
+		try:
+			value = fn(cursor, *args)
+		except Exception as e:
+			cursor.execute("ROLLBACK TO unit")
+			cursor.execute("RELEASE unit")
+			if onRollback:
+				onRollback()
+			results.append((False, e))
+		else:
+			cursor.execute("RELEASE unit")
+			results.append((True, value))
+	return results
+
+
+class WriteCoalescer:
+	"""
+	Group commit for small write units on top of AsyncDb.
+	Units submitted within a few milliseconds of each other are applied in submission order
+	in a single writer transaction, so later units see the rows written by earlier ones.
+	Each caller gets back its own result, or its own exception.
+	"""
+
+	def __init__(self, database, window: float = BATCH_WINDOW, maxBatch: int = MAX_BATCH):
+		self.db = database
+		self.window = window
+		self.maxBatch = maxBatch
+		self.pending = []
+		self.timer = None
+		self.inFlight = set()
+		self.closed = False
+		self.batches = 0
+		self.units = 0
+
+	async def submit(self, fn, *args):
+		"""Queue fn(cursor, *args) for the next batch and wait for its result."""
+		if self.closed:
+			return await self.db.transaction(fn, *args)
+
+		loop = asyncio.get_running_loop()
+		future = loop.create_future()
+		self.pending.append((fn, args, future))
+		if len(self.pending) >= self.maxBatch:
+			self.flush()
+		elif self.timer is None:
+			self.timer = loop.call_later(self.window, self.flush)
+		return await future
+
+	def flush(self):
+		"""Start committing everything queued so far."""
+		if self.timer is not None:
+			self.timer.cancel()
+			self.timer = None
+		if not self.pending:
+			return
+
+		batch, self.pending = self.pending, []
+		task = asyncio.create_task(self.applyBatch(batch))
+		self.inFlight.add(task)
+		task.add_done_callback(self.inFlight.discard)
+
+	async def applyBatch(self, batch):
+		try:
+			results = await self.db.transaction(runBatch, [(fn, args) for fn, args, _ in batch], self.db.rolledBack)
+		except Exception as e:
+			log(f"Write batch of {len(batch)} failed: {e}")
+			for _, _, future in batch:
+				if not future.done():
+					future.set_exception(e)
+			return
+
+		self.batches += 1
+		self.units += len(batch)
+		for (_, _, future), (ok, value) in zip(batch, results):
+			if future.done():
+				continue	# caller went away
+			if ok:
+				future.set_result(value)
+			else:
+				future.set_exception(value)
+
+	async def close(self):
+		"""Commit whatever is still queued and wait for batches in flight."""
+		self.closed = True
+		self.flush()
+		if self.inFlight:
+			await asyncio.gather(*self.inFlight, return_exceptions=True)
+		if self.batches:
+			log(f"Write coalescer: {self.units} writes in {self.batches} commits")
@@ -0,0 +1,32 @@
+GLOBAL_ENTITY = 0
+
+
+def getCounter(cursor, scope: str, entityId: int | None, metric: str) -> int:
+	"""
+	Read one value from the trigger-maintained counters table.
+	- scope: 'user', 'channel' or 'global'
+	- entityId: users.id / channels.id, ignored for 'global'
+	"""
+	if scope == "global":
+		entityId = GLOBAL_ENTITY
+	elif entityId is None:
+		return 0
+	cursor.execute(
+		"SELECT value FROM counters WHERE scope = ? AND entity_id = ? AND metric = ?",
+		(scope, entityId, metric)
+	)
+	row = cursor.fetchone()
+	return row[0] if row else 0
+
+
+def getCounters(cursor, scope: str, entityId: int | None = None) -> dict[str, int]:
+	"""Return every metric recorded for one entity as {metric: value}."""
+	if scope == "global":
+		entityId = GLOBAL_ENTITY
+	elif entityId is None:
+		return {}
+	cursor.execute(
+		"SELECT metric, value FROM counters WHERE scope = ? AND entity_id = ?",
+		(scope, entityId)
+	)
+	return {metric: value for metric, value in cursor.fetchall()}
@@ -0,0 +1,74 @@
+from collections import OrderedDict
+
+from database.asyncDb import db
+
+USER_ID_CACHE_SIZE = 4096
+
+
+class IdentityCache:
+	"""
+	In-memory view of who a Discord user is to the bot.
+	- untracked / admins: full copies of untracked_users and admins, loaded at startup
+	- userIds: bounded LRU of discord_user_id -> users.id
+
+	userIds is only touched from the database writer thread, through getUserId inside a transaction.
+	Rows it creates are part of that transaction, so it is cleared whenever a transaction or
+	savepoint rolls back rather than risk serving an id that was never committed.
+	"""
+
+	def __init__(self, maxUserIds: int = USER_ID_CACHE_SIZE):
+		self.untracked: set[int] = set()
+		self.admins: set[int] = set()
+		self.userIds: OrderedDict[int, int] = OrderedDict()
+		self.maxUserIds = maxUserIds
+
+	def load(self, cursor):
+		cursor.execute("SELECT discord_user_id FROM untracked_users")
+		self.untracked = {int(r[0]) for r in cursor.fetchall()}
+		cursor.execute("SELECT discord_user_id FROM admins")
+		self.admins = {int(r[0]) for r in cursor.fetchall()}
+		self.userIds.clear()
+
+	# --- Membership checks ---
+	def isUntracked(self, discordUserId) -> bool:
+		return int(discordUserId) in self.untracked
+
+	def isAdmin(self, discordUserId) -> bool:
+		return int(discordUserId) in self.admins
+
+	def addAdmin(self, discordUserId):
+		self.admins.add(int(discordUserId))
+
+	def markUntracked(self, discordUserId):
+		"""Call once the untrack transaction has committed: the user row is gone."""
+		self.untracked.add(int(discordUserId))
+		self.userIds.pop(int(discordUserId), None)
+
+	# --- Internal user ids ---
+	def getUserId(self, cursor, discordUserId) -> int:
+		"""Return users.id for a Discord user, inserting the row in the caller's transaction if needed."""
+		key = int(discordUserId)
+		userId = self.userIds.get(key)
+		if userId is not None:
+			self.userIds.move_to_end(key)
+			return userId
+
+		cursor.execute("SELECT id FROM users WHERE discord_user_id = ?", (key,))
+		row = cursor.fetchone()
+		if row:
+			userId = row[0]
+		else:
+			cursor.execute("INSERT INTO users (discord_user_id) VALUES (?)", (key,))
+			userId = cursor.lastrowid
+
+		self.userIds[key] = userId
+		if len(self.userIds) > self.maxUserIds:
+			self.userIds.popitem(last=False)
+		return userId
+
+	def forgetUserIds(self):
+		self.userIds.clear()
+
+
+identities = IdentityCache()
+db.addRollbackHook(identities.forgetUserIds)
@@ -0,0 +1,106 @@
+from database.rollup import GLOBAL_CHANNEL
+
+# Boards kept in leaderboard_entries by the triggers of migration 017; zero counts are hidden, zero streaks aren't
+SNAPSHOT_BOARDS = {
+	"messages": True,
+	"reactions": True,
+	"streaks_best": False,
+	"streaks_current": False,
+	"delays_best": False,
+	"delays_worst": False,
+	"delays_avg": False,
+}
+
+
+class LeaderboardQuery:
+	"""
+	A ranked list read one page at a time.
+	`source` is a SELECT whose rows start with `rank_key` (a unique id, e.g. a Discord user id)
+	and `rank_value`, optionally followed by extra columns passed through to the caller.
+	Rows are ordered by (rank_value, rank_key), both in the board's direction, and each page
+	continues from the (value, key) of the last row of the previous one (keyset pagination).
+	With a single direction the row-value comparison is one range on the ranking index, so a
+	page costs a LIMIT walk along it instead of sorting every remaining row.
+	"""
+
+	def __init__(self, source: str, params: tuple = (), descending: bool = True):
+		self.source = source
+		self.params = tuple(params)
+		self.descending = descending
+
+	def count(self, cursor) -> int:
+		cursor.execute(f"SELECT COUNT(*) FROM ({self.source})", self.params)
+		return cursor.fetchone()[0]
+
+	@property
+	def order(self) -> str:
+		direction = "DESC" if self.descending else "ASC"
+		return f"ORDER BY rank_value {direction}, rank_key {direction}"
+
+	def page(self, cursor, after: tuple | None, limit: int) -> list[tuple]:
+		"""Return up to `limit` rows ranked after `after`, the (rank_key, rank_value) of the previous page's last row."""
+		where, params = "", self.params
+		if after is not None:
+			key, value = after
+			comparison = "<" if self.descending else ">"
+			where = f"WHERE (rank_value, rank_key) {comparison} (?, ?)"
+			params = (*params, value, key)
+		cursor.execute(f"""
+			SELECT * FROM ({self.source})
+			{where}
+			{self.order}
+			LIMIT ?
+		""", (*params, limit))
+		return cursor.fetchall()
+
+	def rankOf(self, cursor, key) -> int | None:
+		"""Return the 1-based rank of `key`, or None when it isn't on the board."""
+		cursor.execute(f"SELECT rank_value FROM ({self.source}) WHERE rank_key = ?", (*self.params, key))
+		row = cursor.fetchone()
+		if row is None:
+			return None
+		comparison = ">" if self.descending else "<"
+		cursor.execute(
+			f"SELECT COUNT(*) FROM ({self.source}) WHERE (rank_value, rank_key) {comparison} (?, ?)",
+			(*self.params, row[0], key)
+		)
+		return cursor.fetchone()[0] + 1
+
+	def rowAt(self, cursor, position: int) -> tuple | None:
+		"""Return the (rank_key, rank_value) at a 0-based position: the cursor to start a page right after it."""
+		cursor.execute(f"""
+			SELECT rank_key, rank_value FROM ({self.source})
+			{self.order}
+			LIMIT 1 OFFSET ?
+		""", (*self.params, position))
+		return cursor.fetchone()
+
+
+def boardVersion(cursor, board: str, channelId: int) -> int:
+	"""Version of one board's rows, bumped by the triggers of migration 019 on every change."""
+	cursor.execute("SELECT version FROM leaderboard_versions WHERE board = ? AND channel_id = ?", (board, channelId))
+	row = cursor.fetchone()
+	return row[0] if row else 0
+
+def readAtVersion(cursor, board: str, channelId: int, fn, *args) -> tuple[int, object]:
+	"""Run fn(cursor, *args) in the same read transaction as the board's version, so both see the same data."""
+	cursor.execute("BEGIN")
+	try:
+		return boardVersion(cursor, board, channelId), fn(cursor, *args)
+	finally:
+		cursor.connection.commit()
+
+
+def snapshotQuery(board: str, channelId: int = GLOBAL_CHANNEL, descending: bool = True) -> LeaderboardQuery:
+	"""
+	Ranked rows of one precomputed board: (discordUserId, value, extra).
+	- channelId: channels.id, or GLOBAL_CHANNEL for all channels together
+	"""
+	if board not in SNAPSHOT_BOARDS:
+		raise ValueError("Invalid board for snapshotQuery")
+	hideZero = "AND value > 0" if SNAPSHOT_BOARDS[board] else ""
+	return LeaderboardQuery(f"""
+		SELECT discord_user_id AS rank_key, value AS rank_value, extra
+		FROM leaderboard_entries
+		WHERE board = ? AND channel_id = ? {hideZero}
+	""", (board, channelId), descending)
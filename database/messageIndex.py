@@ -0,0 +1,51 @@
+from collections import OrderedDict
+
+MESSAGE_INDEX_SIZE = 20000
+MISSING = object()
+
+
+class MessageIndex:
+	"""
+	Bounded LRU of Discord message id -> internal messages.id for success messages.
+	None is cached too, for messages known not to be tracked successes, so repeated reactions
+	on them are skipped without a query. Writers that store a success message must `put` it
+	once committed, which replaces any earlier None. A None never replaces a cached entry: a
+	lookup that started before the success committed may finish after its id was put.
+	"""
+
+	def __init__(self, maxSize: int = MESSAGE_INDEX_SIZE):
+		self.entries: OrderedDict[int, int | None] = OrderedDict()
+		self.maxSize = maxSize
+
+	def get(self, discordMessageId):
+		"""Return the cached internal id (possibly None), or MISSING if unknown."""
+		key = int(discordMessageId)
+		value = self.entries.get(key, MISSING)
+		if value is not MISSING:
+			self.entries.move_to_end(key)
+		return value
+
+	def put(self, discordMessageId, messageId: int | None):
+		key = int(discordMessageId)
+		if messageId is None and key in self.entries:
+			return
+		self.entries[key] = messageId
+		self.entries.move_to_end(key)
+		if len(self.entries) > self.maxSize:
+			self.entries.popitem(last=False)
+
+	def clear(self):
+		self.entries.clear()
+
+
+def findSuccessMessage(cursor, channelId: int, discordMessageId) -> int | None:
+	"""Return messages.id of a stored success message in the channel, or None."""
+	cursor.execute(
+		"SELECT id FROM messages WHERE message_id = ? AND channel_id = ? AND category = 'success'",
+		(int(discordMessageId), channelId)
+	)
+	row = cursor.fetchone()
+	return row[0] if row else None
+
+
+successMessages = MessageIndex()
@@ -1,5 +1,7 @@
 import importlib
-from utils.utils import connectDb, log
+import sqlite3
+from database.pool import dbConnection
+from utils.utils import log
 import time
 
 MIGRATIONS = [
@@ -10,49 +12,75 @@ MIGRATIONS = [
 	"005_fix_global_streak",
 	"006_limit_daily_success",
 	"007_remove_bot_users",
+	"008_add_query_indexes",
+	"009_add_success_day",
+	"010_compact_integer_storage",
+	"011_add_counters",
+	"012_add_daily_rollup",
+	"013_add_milestones",
+	"014_add_scheduled_runs",
+	"015_add_user_profiles",
+	"016_add_leaderboard_indexes",
+	"017_add_leaderboard_entries",
+	"018_add_delay_ms",
+	"019_add_leaderboard_versions",
 ]
 
 def runMigrations():
-	conn, cursor = connectDb()
-
-	# Ensure migration table exists
-	cursor.execute(
-		"""
-		CREATE TABLE IF NOT EXISTS schema_migrations (
-			id INTEGER PRIMARY KEY AUTOINCREMENT,
-			name TEXT NOT NULL UNIQUE,
-			applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
-		);
-		"""
-	)
-
-	cursor.execute("SELECT name FROM schema_migrations")
-	applied = {row[0] for row in cursor.fetchall()}
-
-	for migration in MIGRATIONS:
-		if migration in applied:
-			log(f"Skipping already applied migration {migration}")
-			continue
-
-		module = importlib.import_module(f"database.migrations.src.{migration}")
-
-		log(f"Starting migration {migration}...")
-		start_time = time.perf_counter()
-
-		cursor.execute("BEGIN")
-		try:
-			module.up(cursor)
-			cursor.execute(
-				"INSERT INTO schema_migrations (name) VALUES (?)",
-				(migration,)
-			)
-			cursor.execute("COMMIT")
-
-			elapsed = time.perf_counter() - start_time
-			log(f"Applied migration {migration} in {elapsed:.4f}s")
-		except Exception:
-			cursor.execute("ROLLBACK")
-			log(f"Migration {migration} failed!")
-			raise
-
-	conn.close()
+	with dbConnection() as (conn, cursor):
+		# Ensure migration table exists
+		cursor.execute(
+			"""
+			CREATE TABLE IF NOT EXISTS schema_migrations (
+				id INTEGER PRIMARY KEY AUTOINCREMENT,
+				name TEXT NOT NULL UNIQUE,
+				applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+			);
+			"""
+		)
+
+		cursor.execute("SELECT name FROM schema_migrations")
+		applied = {row[0] for row in cursor.fetchall()}
+
+		for migration in MIGRATIONS:
+			if migration in applied:
+				log(f"Skipping already applied migration {migration}")
+				continue
+
+			module = importlib.import_module(f"database.migrations.src.{migration}")
+
+			log(f"Starting migration {migration}...")
+			start_time = time.perf_counter()
+
+			# Table rebuilds need foreign keys off, which can only be toggled outside a transaction
+			disableForeignKeys = getattr(module, "DISABLE_FOREIGN_KEYS", False)
+			if disableForeignKeys:
+				cursor.execute("PRAGMA foreign_keys = OFF")
+
+			cursor.execute("BEGIN")
+			try:
+				module.up(cursor)
+				if disableForeignKeys:
+					cursor.execute("PRAGMA foreign_key_check")
+					violations = cursor.fetchall()
+					if violations:
+						raise sqlite3.IntegrityError(f"Foreign key violations after {migration}: {violations[:10]}")
+				cursor.execute(
+					"INSERT INTO schema_migrations (name) VALUES (?)",
+					(migration,)
+				)
+				cursor.execute("COMMIT")
+
+				elapsed = time.perf_counter() - start_time
+				log(f"Applied migration {migration} in {elapsed:.4f}s")
+			except Exception:
+				cursor.execute("ROLLBACK")
+				log(f"Migration {migration} failed!")
+				raise
+			finally:
+				if disableForeignKeys:
+					cursor.execute("PRAGMA foreign_keys = ON")
+
+			if getattr(module, "VACUUM_AFTER", False):
+				cursor.execute("VACUUM")
+				log(f"Vacuumed database after {migration}")
@@ -1,6 +1,5 @@
 from datetime import datetime, time, timedelta
 from zoneinfo import ZoneInfo
-from utils.utils import connectDb
 
 CHANNEL_DEFAULT_TZ = ZoneInfo("Europe/Paris")
 CUTOFF_TIME = time(12, 7)
@@ -34,8 +33,6 @@ def calculateStreak(dates, now):
 	return max_streak, current_streak, last_date
 
 def up(cursor):
-	conn, _ = connectDb()
-
 	# -------------------
 	# Channel streaks
 	# -------------------
@@ -0,0 +1,28 @@
+INDEXES = (
+	# Per-user success lookups: daily dedupe/cap, achievements, stats, role checks
+	"""
+	CREATE INDEX IF NOT EXISTS idx_messages_user_category_ts
+		ON messages(user_id, category, timestamp)
+	""",
+	# Per-channel success lookups: leaderboards, stats, participation milestones
+	"""
+	CREATE INDEX IF NOT EXISTS idx_messages_channel_category_ts
+		ON messages(channel_id, category, timestamp)
+	""",
+	# Global queries filtering or grouping on category only (counts, distinct users, days, delays)
+	"""
+	CREATE INDEX IF NOT EXISTS idx_messages_category_ts_user
+		ON messages(category, timestamp, user_id)
+	""",
+	# Reactions joined to messages; reactions.user_id is already covered by UNIQUE(user_id, message_id)
+	"""
+	CREATE INDEX IF NOT EXISTS idx_reactions_message
+		ON reactions(message_id)
+	""",
+)
+
+def up(cursor):
+	for sql in INDEXES:
+		cursor.execute(sql)
+	# Refresh planner statistics so the new indexes get picked up
+	cursor.execute("ANALYZE")
@@ -0,0 +1,56 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+DEFAULT_TZ = "Europe/Paris"
+
+def up(cursor):
+	"""
+	Adds messages.success_day, the message's day in its channel's timezone (YYYY-MM-DD),
+	backfills it, and re-keys the day-based indexes on it instead of the raw timestamp.
+	"""
+	cursor.execute("PRAGMA table_info(messages)")
+	columns = [col[1] for col in cursor.fetchall()]
+	if "success_day" not in columns:
+		cursor.execute("ALTER TABLE messages ADD COLUMN success_day TEXT")
+	else:
+		print("'success_day' column already exists in messages.")
+
+	cursor.execute("""
+		SELECT m.id, m.timestamp, c.timezone
+		FROM messages m
+		JOIN channels c ON c.id = m.channel_id
+		WHERE m.success_day IS NULL AND m.timestamp IS NOT NULL
+	""")
+	zones = {}
+	updates = []
+	for msgId, timestamp, tzName in cursor.fetchall():
+		dt = datetime.fromisoformat(str(timestamp))
+		# Aware timestamps are converted to the channel's day, naive ones are already local
+		if dt.tzinfo is not None:
+			tzName = tzName or DEFAULT_TZ
+			if tzName not in zones:
+				zones[tzName] = ZoneInfo(tzName)
+			dt = dt.astimezone(zones[tzName])
+		updates.append((dt.strftime("%Y-%m-%d"), msgId))
+
+	cursor.executemany("UPDATE messages SET success_day = ? WHERE id = ?", updates)
+	print(f"Backfilled success_day on {len(updates)} messages.")
+
+	# The timestamp-keyed indexes from 008 are superseded by day-keyed ones
+	cursor.execute("DROP INDEX IF EXISTS idx_messages_user_category_ts")
+	cursor.execute("DROP INDEX IF EXISTS idx_messages_channel_category_ts")
+	cursor.execute("DROP INDEX IF EXISTS idx_messages_category_ts_user")
+
+	cursor.execute("""
+		CREATE INDEX IF NOT EXISTS idx_messages_user_category_day
+			ON messages(user_id, category, success_day)
+	""")
+	cursor.execute("""
+		CREATE INDEX IF NOT EXISTS idx_messages_channel_category_day
+			ON messages(channel_id, category, success_day, user_id)
+	""")
+	cursor.execute("""
+		CREATE INDEX IF NOT EXISTS idx_messages_category_day
+			ON messages(category, success_day, user_id)
+	""")
+	cursor.execute("ANALYZE")
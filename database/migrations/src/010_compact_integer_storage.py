@@ -0,0 +1,135 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from database.types import toEpochMs
+
+# Rebuilding referenced tables requires foreign keys off; the runner toggles it outside the transaction
+DISABLE_FOREIGN_KEYS = True
+# Reclaim the space freed by the narrower rows once the migration is committed
+VACUUM_AFTER = True
+
+DEFAULT_TZ = "Europe/Paris"
+
+# New definitions, keyed by table; {name} is the temporary table name used during the rebuild
+TABLES = {
+	"channels": """
+		CREATE TABLE {name} (
+			id INTEGER PRIMARY KEY AUTOINCREMENT,
+			discord_channel_id INTEGER NOT NULL UNIQUE,
+			discord_role_id INTEGER,
+			timezone TEXT DEFAULT 'Europe/Paris',
+			lang TEXT DEFAULT 'fr'
+		)
+	""",
+	"users": """
+		CREATE TABLE {name} (
+			id INTEGER PRIMARY KEY AUTOINCREMENT,
+			discord_user_id INTEGER NOT NULL UNIQUE,
+			timezone TEXT DEFAULT 'Europe/Paris'
+		)
+	""",
+	"messages": """
+		CREATE TABLE {name} (
+			id INTEGER PRIMARY KEY AUTOINCREMENT,
+			message_id INTEGER NOT NULL UNIQUE,
+			channel_id INTEGER NOT NULL,
+			user_id INTEGER NOT NULL,
+			timestamp INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER) * 1000),
+			category TEXT DEFAULT 'unknown',
+			success_day TEXT,
+			FOREIGN KEY(channel_id) REFERENCES channels(id) ON DELETE CASCADE,
+			FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE,
+			UNIQUE(channel_id, user_id, message_id)
+		)
+	""",
+	"admins": """
+		CREATE TABLE {name} (
+			id INTEGER PRIMARY KEY AUTOINCREMENT,
+			discord_user_id INTEGER NOT NULL UNIQUE
+		)
+	""",
+	"untracked_users": """
+		CREATE TABLE {name} (
+			id INTEGER PRIMARY KEY AUTOINCREMENT,
+			discord_user_id INTEGER NOT NULL UNIQUE
+		)
+	""",
+}
+
+SNOWFLAKE_COLUMNS = {
+	"channels": ("discord_channel_id", "discord_role_id"),
+	"users": ("discord_user_id",),
+	"messages": ("message_id",),
+	"admins": ("discord_user_id",),
+	"untracked_users": ("discord_user_id",),
+}
+
+
+def isCompact(cursor, table):
+	"""A table is already converted once its first snowflake column is declared INTEGER."""
+	cursor.execute(f"PRAGMA table_info({table})")
+	types = {col[1]: col[2].upper() for col in cursor.fetchall()}
+	return types.get(SNOWFLAKE_COLUMNS[table][0]) == "INTEGER"
+
+
+def legacyTimestampToMs(value, tz):
+	"""Stored ISO strings carry the channel offset; naive ones are channel-local."""
+	dt = datetime.fromisoformat(str(value))
+	if dt.tzinfo is None:
+		dt = dt.replace(tzinfo=tz)
+	return toEpochMs(dt)
+
+
+def rebuildTable(cursor, table, convertRow):
+	# Explicit indexes and triggers are dropped with the table, keep them to recreate afterwards
+	cursor.execute(
+		"SELECT sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL",
+		(table,)
+	)
+	dependents = [r[0] for r in cursor.fetchall()]
+	cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,))
+	sequence = cursor.fetchone()
+
+	cursor.execute(f"SELECT * FROM {table}")
+	columns = [d[0] for d in cursor.description]
+	rows = [convertRow(dict(zip(columns, row))) for row in cursor.fetchall()]
+
+	tmpName = f"{table}_compact"
+	cursor.execute(TABLES[table].format(name=tmpName))
+	cursor.executemany(
+		f"INSERT INTO {tmpName} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+		[tuple(row[c] for c in columns) for row in rows]
+	)
+	cursor.execute(f"DROP TABLE {table}")
+	cursor.execute(f"ALTER TABLE {tmpName} RENAME TO {table}")
+	if sequence:
+		# Keep AUTOINCREMENT from reusing ids of rows deleted before the rebuild
+		cursor.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (sequence[0], table))
+	for sql in dependents:
+		cursor.execute(sql)
+	print(f"Rebuilt {table} with {len(rows)} rows.")
+
+
+def up(cursor):
+	"""
+	Moves Discord snowflakes to INTEGER columns and messages.timestamp to INTEGER
+	epoch milliseconds, rebuilding each table that still uses the TEXT layout.
+	"""
+	cursor.execute("SELECT id, timezone FROM channels")
+	channelZones = {chId: ZoneInfo(tzName or DEFAULT_TZ) for chId, tzName in cursor.fetchall()}
+	defaultZone = ZoneInfo(DEFAULT_TZ)
+
+	for table, snowflakes in SNOWFLAKE_COLUMNS.items():
+		if isCompact(cursor, table):
+			print(f"{table} already uses integer storage.")
+			continue
+
+		def convertRow(row, snowflakes=snowflakes, table=table):
+			for col in snowflakes:
+				if row[col] is not None:
+					row[col] = int(row[col])
+			if table == "messages" and row["timestamp"] is not None:
+				row["timestamp"] = legacyTimestampToMs(row["timestamp"], channelZones.get(row["channel_id"], defaultZone))
+			return row
+
+		rebuildTable(cursor, table, convertRow)
@@ -0,0 +1,189 @@
+CATEGORY_METRICS = "('success', 'fail', 'choke')"
+
+TRIGGERS = (
+	# --- messages: per-category counts for the author, the channel and globally ---
+	f"""
+	CREATE TRIGGER IF NOT EXISTS counters_messages_insert
+	AFTER INSERT ON messages
+	WHEN NEW.category IN {CATEGORY_METRICS}
+	BEGIN
+		INSERT INTO counters (scope, entity_id, metric, value) VALUES ('user', NEW.user_id, NEW.category, 1)
+			ON CONFLICT(scope, entity_id, metric) DO UPDATE SET value = value + 1;
+		INSERT INTO counters (scope, entity_id, metric, value) VALUES ('channel', NEW.channel_id, NEW.category, 1)
+			ON CONFLICT(scope, entity_id, metric) DO UPDATE SET value = value + 1;
+		INSERT INTO counters (scope, entity_id, metric, value) VALUES ('global', 0, NEW.category, 1)
+			ON CONFLICT(scope, entity_id, metric) DO UPDATE SET value = value + 1;
+	END
+	""",
+	f"""
+	CREATE TRIGGER IF NOT EXISTS counters_messages_delete
+	AFTER DELETE ON messages
+	WHEN OLD.category IN {CATEGORY_METRICS}
+	BEGIN
+		UPDATE counters SET value = value - 1
+			WHERE metric = OLD.category
+			AND ((scope = 'user' AND entity_id = OLD.user_id)
+				OR (scope = 'channel' AND entity_id = OLD.channel_id)
+				OR (scope = 'global' AND entity_id = 0));
+	END
+	""",
+	# A deleted message takes its reactions with it through ON DELETE CASCADE, and by the time
+	# the reaction triggers run the message row is gone. Its received counts are settled here,
+	# before the cascade, and counters_reactions_delete only handles reactions whose message remains.
+	"""
+	CREATE TRIGGER IF NOT EXISTS counters_messages_before_delete
+	BEFORE DELETE ON messages
+	BEGIN
+		UPDATE counters SET value = value - (SELECT COUNT(*) FROM reactions WHERE message_id = OLD.id)
+			WHERE metric = 'reactions_received'
+			AND ((scope = 'user' AND entity_id = OLD.user_id)
+				OR (scope = 'channel' AND entity_id = OLD.channel_id)
+				OR (scope = 'global' AND entity_id = 0));
+	END
+	""",
+	# --- reactions: given by the reactor, received by the message author, its channel and globally ---
+	"""
+	CREATE TRIGGER IF NOT EXISTS counters_reactions_insert
+	AFTER INSERT ON reactions
+	BEGIN
+		INSERT INTO counters (scope, entity_id, metric, value) VALUES ('user', NEW.user_id, 'reactions_given', 1)
+			ON CONFLICT(scope, entity_id, metric) DO UPDATE SET value = value + 1;
+		INSERT INTO counters (scope, entity_id, metric, value)
+			SELECT 'user', m.user_id, 'reactions_received', 1 FROM messages m WHERE m.id = NEW.message_id
+			ON CONFLICT(scope, entity_id, metric) DO UPDATE SET value = value + 1;
+		INSERT INTO counters (scope, entity_id, metric, value)
+			SELECT 'channel', m.channel_id, 'reactions_received', 1 FROM messages m WHERE m.id = NEW.message_id
+			ON CONFLICT(scope, entity_id, metric) DO UPDATE SET value = value + 1;
+		INSERT INTO counters (scope, entity_id, metric, value) VALUES ('global', 0, 'reactions_received', 1)
+			ON CONFLICT(scope, entity_id, metric) DO UPDATE SET value = value + 1;
+	END
+	""",
+	"""
+	CREATE TRIGGER IF NOT EXISTS counters_reactions_delete
+	AFTER DELETE ON reactions
+	BEGIN
+		UPDATE counters SET value = value - 1
+			WHERE scope = 'user' AND entity_id = OLD.user_id AND metric = 'reactions_given';
+		UPDATE counters SET value = value - 1
+			WHERE metric = 'reactions_received'
+			AND EXISTS (SELECT 1 FROM messages WHERE id = OLD.message_id)
+			AND ((scope = 'user' AND entity_id = (SELECT user_id FROM messages WHERE id = OLD.message_id))
+				OR (scope = 'channel' AND entity_id = (SELECT channel_id FROM messages WHERE id = OLD.message_id))
+				OR (scope = 'global' AND entity_id = 0));
+	END
+	""",
+	# --- Global number of users with at least one success, tracked from their own counter ---
+	"""
+	CREATE TRIGGER IF NOT EXISTS counters_success_users_insert
+	AFTER INSERT ON counters
+	WHEN NEW.scope = 'user' AND NEW.metric = 'success' AND NEW.value > 0
+	BEGIN
+		INSERT INTO counters (scope, entity_id, metric, value) VALUES ('global', 0, 'success_users', 1)
+			ON CONFLICT(scope, entity_id, metric) DO UPDATE SET value = value + 1;
+	END
+	""",
+	"""
+	CREATE TRIGGER IF NOT EXISTS counters_success_users_update
+	AFTER UPDATE OF value ON counters
+	WHEN NEW.scope = 'user' AND NEW.metric = 'success' AND (OLD.value > 0) != (NEW.value > 0)
+	BEGIN
+		INSERT INTO counters (scope, entity_id, metric, value) VALUES ('global', 0, 'success_users', 1)
+			ON CONFLICT(scope, entity_id, metric) DO UPDATE SET value = value + (CASE WHEN NEW.value > 0 THEN 1 ELSE -1 END);
+	END
+	""",
+	"""
+	CREATE TRIGGER IF NOT EXISTS counters_success_users_delete
+	AFTER DELETE ON counters
+	WHEN OLD.scope = 'user' AND OLD.metric = 'success' AND OLD.value > 0
+	BEGIN
+		UPDATE counters SET value = value - 1
+			WHERE scope = 'global' AND entity_id = 0 AND metric = 'success_users';
+	END
+	""",
+	# --- Drop the rows of deleted users and channels once their cascades have run ---
+	"""
+	CREATE TRIGGER IF NOT EXISTS counters_users_delete
+	AFTER DELETE ON users
+	BEGIN
+		DELETE FROM counters WHERE scope = 'user' AND entity_id = OLD.id;
+	END
+	""",
+	"""
+	CREATE TRIGGER IF NOT EXISTS counters_channels_delete
+	AFTER DELETE ON channels
+	BEGIN
+		DELETE FROM counters WHERE scope = 'channel' AND entity_id = OLD.id;
+	END
+	""",
+)
+
+BACKFILL = (
+	f"""
+	INSERT INTO counters (scope, entity_id, metric, value)
+	SELECT 'user', user_id, category, COUNT(*) FROM messages
+	WHERE category IN {CATEGORY_METRICS} GROUP BY user_id, category
+	""",
+	f"""
+	INSERT INTO counters (scope, entity_id, metric, value)
+	SELECT 'channel', channel_id, category, COUNT(*) FROM messages
+	WHERE category IN {CATEGORY_METRICS} GROUP BY channel_id, category
+	""",
+	f"""
+	INSERT INTO counters (scope, entity_id, metric, value)
+	SELECT 'global', 0, category, COUNT(*) FROM messages
+	WHERE category IN {CATEGORY_METRICS} GROUP BY category
+	""",
+	"""
+	INSERT INTO counters (scope, entity_id, metric, value)
+	SELECT 'global', 0, 'success_users', COUNT(DISTINCT user_id) FROM messages
+	WHERE category = 'success'
+	""",
+	"""
+	INSERT INTO counters (scope, entity_id, metric, value)
+	SELECT 'user', user_id, 'reactions_given', COUNT(*) FROM reactions GROUP BY user_id
+	""",
+	"""
+	INSERT INTO counters (scope, entity_id, metric, value)
+	SELECT 'user', m.user_id, 'reactions_received', COUNT(*)
+	FROM reactions r JOIN messages m ON m.id = r.message_id GROUP BY m.user_id
+	""",
+	"""
+	INSERT INTO counters (scope, entity_id, metric, value)
+	SELECT 'channel', m.channel_id, 'reactions_received', COUNT(*)
+	FROM reactions r JOIN messages m ON m.id = r.message_id GROUP BY m.channel_id
+	""",
+	"""
+	INSERT INTO counters (scope, entity_id, metric, value)
+	SELECT 'global', 0, 'reactions_received', COUNT(*)
+	FROM reactions r JOIN messages m ON m.id = r.message_id
+	""",
+)
+
+def up(cursor):
+	"""
+	Creates the counters table (scope, entity_id, metric) -> value, kept current by triggers
+	on messages and reactions, and backfills it from the existing history.
+	- scope: 'user' (users.id), 'channel' (channels.id) or 'global' (entity_id 0)
+	- metric: 'success', 'fail', 'choke', 'reactions_given', 'reactions_received',
+	  plus 'success_users' (users with at least one success) on the global scope
+	"""
+	cursor.execute("""
+		CREATE TABLE IF NOT EXISTS counters (
+			scope TEXT NOT NULL,
+			entity_id INTEGER NOT NULL,
+			metric TEXT NOT NULL,
+			value INTEGER NOT NULL DEFAULT 0,
+			PRIMARY KEY(scope, entity_id, metric)
+		) WITHOUT ROWID
+	""")
+
+	# Rebuilt from scratch: drop the triggers first so the backfill doesn't fire them
+	cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'counters_%'")
+	for (name,) in cursor.fetchall():
+		cursor.execute(f"DROP TRIGGER {name}")
+	cursor.execute("DELETE FROM counters")
+	for sql in BACKFILL:
+		cursor.execute(sql)
+
+	for sql in TRIGGERS:
+		cursor.execute(sql)
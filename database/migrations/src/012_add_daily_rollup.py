@@ -0,0 +1,140 @@
+GLOBAL_CHANNEL = 0
+
+# 1 when no other success of the same user exists in the scope and day, i.e. the user is new (or gone) there
+DISTINCT_IN_CHANNEL = """
+	(NOT EXISTS (
+		SELECT 1 FROM messages
+		WHERE user_id = {row}.user_id AND category = 'success' AND success_day = {row}.success_day
+		AND channel_id = {row}.channel_id AND id != {row}.id
+	))
+"""
+DISTINCT_GLOBALLY = """
+	(NOT EXISTS (
+		SELECT 1 FROM messages
+		WHERE user_id = {row}.user_id AND category = 'success' AND success_day = {row}.success_day
+		AND id != {row}.id
+	))
+"""
+
+TRIGGERS = (
+	f"""
+	CREATE TRIGGER daily_rollup_messages_insert
+	AFTER INSERT ON messages
+	WHEN NEW.category = 'success' AND NEW.success_day IS NOT NULL
+	BEGIN
+		INSERT INTO daily_rollup (channel_id, day, success_count, distinct_users)
+			VALUES (NEW.channel_id, NEW.success_day, 1, {DISTINCT_IN_CHANNEL.format(row="NEW")})
+			ON CONFLICT(channel_id, day) DO UPDATE SET
+				success_count = success_count + 1,
+				distinct_users = distinct_users + excluded.distinct_users;
+		INSERT INTO daily_rollup (channel_id, day, success_count, distinct_users)
+			VALUES ({GLOBAL_CHANNEL}, NEW.success_day, 1, {DISTINCT_GLOBALLY.format(row="NEW")})
+			ON CONFLICT(channel_id, day) DO UPDATE SET
+				success_count = success_count + 1,
+				distinct_users = distinct_users + excluded.distinct_users;
+	END
+	""",
+	f"""
+	CREATE TRIGGER daily_rollup_messages_delete
+	AFTER DELETE ON messages
+	WHEN OLD.category = 'success' AND OLD.success_day IS NOT NULL
+	BEGIN
+		UPDATE daily_rollup SET
+			success_count = success_count - 1,
+			distinct_users = distinct_users - {DISTINCT_IN_CHANNEL.format(row="OLD")}
+			WHERE channel_id = OLD.channel_id AND day = OLD.success_day;
+		UPDATE daily_rollup SET
+			success_count = success_count - 1,
+			distinct_users = distinct_users - {DISTINCT_GLOBALLY.format(row="OLD")}
+			WHERE channel_id = {GLOBAL_CHANNEL} AND day = OLD.success_day;
+	END
+	""",
+	# --- Running maxima: raised in place, recomputed from the channel's days only when a count drops ---
+	"""
+	CREATE TRIGGER daily_rollup_max_insert
+	AFTER INSERT ON daily_rollup
+	BEGIN
+		INSERT INTO daily_rollup_max (channel_id, max_success_count, max_distinct_users)
+			VALUES (NEW.channel_id, NEW.success_count, NEW.distinct_users)
+			ON CONFLICT(channel_id) DO UPDATE SET
+				max_success_count = MAX(max_success_count, excluded.max_success_count),
+				max_distinct_users = MAX(max_distinct_users, excluded.max_distinct_users);
+	END
+	""",
+	"""
+	CREATE TRIGGER daily_rollup_max_update
+	AFTER UPDATE ON daily_rollup
+	BEGIN
+		UPDATE daily_rollup_max SET
+			max_success_count = CASE WHEN NEW.success_count >= OLD.success_count
+				THEN MAX(max_success_count, NEW.success_count)
+				ELSE (SELECT MAX(success_count) FROM daily_rollup WHERE channel_id = NEW.channel_id) END,
+			max_distinct_users = CASE WHEN NEW.distinct_users >= OLD.distinct_users
+				THEN MAX(max_distinct_users, NEW.distinct_users)
+				ELSE (SELECT MAX(distinct_users) FROM daily_rollup WHERE channel_id = NEW.channel_id) END
+			WHERE channel_id = NEW.channel_id;
+	END
+	""",
+	"""
+	CREATE TRIGGER daily_rollup_channels_delete
+	AFTER DELETE ON channels
+	BEGIN
+		DELETE FROM daily_rollup WHERE channel_id = OLD.id;
+		DELETE FROM daily_rollup_max WHERE channel_id = OLD.id;
+	END
+	""",
+)
+
+def up(cursor):
+	"""
+	Creates daily_rollup (per channel and day: success count and distinct users, channel_id 0 for
+	all channels together) and daily_rollup_max (running maxima per channel), both kept current by
+	triggers on messages, and backfills them from the existing history.
+	"""
+	cursor.execute("""
+		CREATE TABLE IF NOT EXISTS daily_rollup (
+			channel_id INTEGER NOT NULL,
+			day TEXT NOT NULL,
+			success_count INTEGER NOT NULL DEFAULT 0,
+			distinct_users INTEGER NOT NULL DEFAULT 0,
+			PRIMARY KEY(channel_id, day)
+		) WITHOUT ROWID
+	""")
+	cursor.execute("""
+		CREATE TABLE IF NOT EXISTS daily_rollup_max (
+			channel_id INTEGER PRIMARY KEY,
+			max_success_count INTEGER NOT NULL DEFAULT 0,
+			max_distinct_users INTEGER NOT NULL DEFAULT 0
+		)
+	""")
+
+	# Rebuilt from scratch: drop the triggers first so the backfill doesn't fire them
+	cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'daily_rollup_%'")
+	for (name,) in cursor.fetchall():
+		cursor.execute(f"DROP TRIGGER {name}")
+	cursor.execute("DELETE FROM daily_rollup")
+	cursor.execute("DELETE FROM daily_rollup_max")
+
+	cursor.execute("""
+		INSERT INTO daily_rollup (channel_id, day, success_count, distinct_users)
+		SELECT channel_id, success_day, COUNT(*), COUNT(DISTINCT user_id)
+		FROM messages
+		WHERE category = 'success' AND success_day IS NOT NULL
+		GROUP BY channel_id, success_day
+	""")
+	cursor.execute(f"""
+		INSERT INTO daily_rollup (channel_id, day, success_count, distinct_users)
+		SELECT {GLOBAL_CHANNEL}, success_day, COUNT(*), COUNT(DISTINCT user_id)
+		FROM messages
+		WHERE category = 'success' AND success_day IS NOT NULL
+		GROUP BY success_day
+	""")
+	cursor.execute("""
+		INSERT INTO daily_rollup_max (channel_id, max_success_count, max_distinct_users)
+		SELECT channel_id, MAX(success_count), MAX(distinct_users)
+		FROM daily_rollup
+		GROUP BY channel_id
+	""")
+
+	for sql in TRIGGERS:
+		cursor.execute(sql)
@@ -0,0 +1,78 @@
+# Same rules as events/achievements.py when this migration was written
+NOTABLE_THRESHOLDS = (10, 25, 42, 50, 69, 420)
+
+TRIGGERS = (
+	"""
+	CREATE TRIGGER milestones_users_delete
+	AFTER DELETE ON users
+	BEGIN
+		DELETE FROM milestones WHERE scope = 'user' AND entity_id = OLD.id;
+	END
+	""",
+	"""
+	CREATE TRIGGER milestones_channels_delete
+	AFTER DELETE ON channels
+	BEGIN
+		DELETE FROM milestones WHERE scope = 'channel' AND entity_id = OLD.id;
+	END
+	""",
+)
+
+def countMilestones(count: int) -> list[int]:
+	values = {t for t in NOTABLE_THRESHOLDS if t <= count}
+	values.update(range(100, count + 1, 100))
+	return sorted(values)
+
+def isStreakMilestone(streak: int) -> bool:
+	if streak <= 0:
+		return False
+	return streak in NOTABLE_THRESHOLDS or streak % 100 == 0 or streak % 365 == 0
+
+def up(cursor):
+	"""
+	Creates the milestones ledger: one row per announced (scope, entity_id, kind, value).
+	- scope: 'user', 'channel' or 'global' (entity_id 0)
+	- kind: 'count' (success messages) or 'streak' (consecutive days)
+	- day: day the milestone was reached, NULL for rows backfilled from past counts
+	Backfills every count milestone already passed, and current streaks sitting on a milestone,
+	so nothing is announced a second time after the upgrade.
+	"""
+	cursor.execute("""
+		CREATE TABLE IF NOT EXISTS milestones (
+			scope TEXT NOT NULL,
+			entity_id INTEGER NOT NULL,
+			kind TEXT NOT NULL,
+			value INTEGER NOT NULL,
+			day TEXT,
+			PRIMARY KEY(scope, entity_id, kind, value)
+		) WITHOUT ROWID
+	""")
+
+	cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'milestones_%'")
+	for (name,) in cursor.fetchall():
+		cursor.execute(f"DROP TRIGGER {name}")
+	cursor.execute("DELETE FROM milestones")
+
+	rows = []
+	cursor.execute("SELECT scope, entity_id, value FROM counters WHERE metric = 'success' AND value > 0")
+	for scope, entityId, count in cursor.fetchall():
+		rows.extend((scope, entityId, "count", value, None) for value in countMilestones(count))
+
+	streakSources = (
+		("user", "SELECT user_id, current_streak, last_success_date FROM user_streaks"),
+		("channel", "SELECT channel_id, current_streak, last_success_date FROM channel_streaks"),
+		("global", "SELECT 0, current_streak, last_success_date FROM global_streak"),
+	)
+	for scope, sql in streakSources:
+		cursor.execute(sql)
+		for entityId, streak, lastDay in cursor.fetchall():
+			if isStreakMilestone(streak or 0):
+				rows.append((scope, entityId, "streak", streak, lastDay))
+
+	cursor.executemany(
+		"INSERT OR IGNORE INTO milestones (scope, entity_id, kind, value, day) VALUES (?, ?, ?, ?, ?)",
+		rows
+	)
+
+	for sql in TRIGGERS:
+		cursor.execute(sql)
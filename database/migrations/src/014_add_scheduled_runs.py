@@ -0,0 +1,13 @@
+def up(cursor):
+	"""
+	Creates scheduled_runs: the last local day each daily job ran for, so a job fires once per
+	day and a run missed while the bot was down is caught up on startup.
+	- job: scheduler key, e.g. 'daily:<channels.id>'
+	- last_day: YYYY-MM-DD in the job's timezone
+	"""
+	cursor.execute("""
+		CREATE TABLE IF NOT EXISTS scheduled_runs (
+			job TEXT PRIMARY KEY,
+			last_day TEXT NOT NULL
+		) WITHOUT ROWID
+	""")
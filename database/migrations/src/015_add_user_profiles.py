@@ -0,0 +1,14 @@
+def up(cursor):
+	"""
+	Creates user_profiles, a cache of Discord display names for leaderboards and graphs.
+	- discord_user_id: Discord user id
+	- name: last display name seen
+	- updated_at: epoch milliseconds of the last refresh, rows older than the TTL are re-resolved
+	"""
+	cursor.execute("""
+		CREATE TABLE IF NOT EXISTS user_profiles (
+			discord_user_id INTEGER PRIMARY KEY,
+			name TEXT NOT NULL,
+			updated_at INTEGER NOT NULL
+		) WITHOUT ROWID
+	""")
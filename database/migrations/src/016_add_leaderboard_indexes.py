@@ -0,0 +1,26 @@
+INDEXES = (
+	# Global message / reaction leaderboards read per-user counters ordered by value
+	"""
+	CREATE INDEX IF NOT EXISTS idx_counters_scope_metric_value
+		ON counters(scope, metric, value)
+	""",
+	# Global streak leaderboards, best and current
+	"""
+	CREATE INDEX IF NOT EXISTS idx_user_streaks_max
+		ON user_streaks(max_streak)
+	""",
+	"""
+	CREATE INDEX IF NOT EXISTS idx_user_streaks_current
+		ON user_streaks(current_streak)
+	""",
+	# Days leaderboard: a channel's days ordered by participants
+	"""
+	CREATE INDEX IF NOT EXISTS idx_daily_rollup_channel_users
+		ON daily_rollup(channel_id, distinct_users)
+	""",
+)
+
+def up(cursor):
+	for sql in INDEXES:
+		cursor.execute(sql)
+	cursor.execute("ANALYZE")
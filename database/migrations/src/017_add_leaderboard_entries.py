@@ -0,0 +1,275 @@
+GLOBAL_CHANNEL = 0
+
+# Seconds past the minute of a success message, from its epoch ms timestamp
+DELAY = "(({row}.timestamp % 60000) / 1000.0)"
+DISCORD_ID = "(SELECT discord_user_id FROM users WHERE id = {row}.user_id)"
+
+# --- Success messages: count, delays and streak board membership, per channel and globally ---
+def successInsert(channel: str) -> str:
+	delay = DELAY.format(row="NEW")
+	discordId = DISCORD_ID.format(row="NEW")
+	return f"""
+		INSERT INTO leaderboard_entries (board, channel_id, discord_user_id, value, extra)
+			VALUES ('messages', {channel}, {discordId}, 1, 0)
+			ON CONFLICT(board, channel_id, discord_user_id) DO UPDATE SET value = value + 1;
+		INSERT INTO leaderboard_entries (board, channel_id, discord_user_id, value, extra)
+			VALUES ('delays_best', {channel}, {discordId}, {delay}, 1)
+			ON CONFLICT(board, channel_id, discord_user_id) DO UPDATE SET
+				value = MIN(value, excluded.value), extra = extra + 1;
+		INSERT INTO leaderboard_entries (board, channel_id, discord_user_id, value, extra)
+			VALUES ('delays_worst', {channel}, {discordId}, {delay}, 1)
+			ON CONFLICT(board, channel_id, discord_user_id) DO UPDATE SET
+				value = MAX(value, excluded.value), extra = extra + 1;
+		INSERT INTO leaderboard_entries (board, channel_id, discord_user_id, value, extra)
+			VALUES ('delays_avg', {channel}, {discordId}, {delay}, 1)
+			ON CONFLICT(board, channel_id, discord_user_id) DO UPDATE SET
+				value = (value * extra + excluded.value) / (extra + 1), extra = extra + 1;
+	"""
+
+def successDelete(channel: str, scope: str) -> str:
+	"""
+	Decrement the count; delay aggregates can't be undone in place, so they are recomputed for the user.
+	The trigger is skipped while a user's messages cascade away, and `scope` skips a channel being deleted,
+	so nothing is recomputed for an entity the users / channels delete triggers are clearing.
+	"""
+	delay = DELAY.format(row="m")
+	discordId = DISCORD_ID.format(row="OLD")
+	return f"""
+		UPDATE leaderboard_entries SET value = value - 1
+			WHERE board = 'messages' AND channel_id = {channel} AND discord_user_id = {discordId};
+		DELETE FROM leaderboard_entries
+			WHERE board IN ('delays_best', 'delays_worst', 'delays_avg')
+			AND channel_id = {channel} AND discord_user_id = {discordId};
+		INSERT INTO leaderboard_entries (board, channel_id, discord_user_id, value, extra)
+			SELECT 'delays_best', {channel}, {discordId}, MIN({delay}), COUNT(*)
+			FROM messages m WHERE m.user_id = OLD.user_id AND m.category = 'success' {scope}
+			HAVING COUNT(*) > 0;
+		INSERT INTO leaderboard_entries (board, channel_id, discord_user_id, value, extra)
+			SELECT 'delays_worst', {channel}, {discordId}, MAX({delay}), COUNT(*)
+			FROM messages m WHERE m.user_id = OLD.user_id AND m.category = 'success' {scope}
+			HAVING COUNT(*) > 0;
+		INSERT INTO leaderboard_entries (board, channel_id, discord_user_id, value, extra)
+			SELECT 'delays_avg', {channel}, {discordId}, AVG({delay}), COUNT(*)
+			FROM messages m WHERE m.user_id = OLD.user_id AND m.category = 'success' {scope}
+			HAVING COUNT(*) > 0;
+	"""
+
+# A user's streaks are global; a channel's streak boards list the users with a success there
+STREAK_MEMBERSHIP = f"""
+	INSERT INTO leaderboard_entries (board, channel_id, discord_user_id, value, extra)
+		SELECT 'streaks_best', NEW.channel_id, {DISCORD_ID.format(row="NEW")},
+			COALESCE(us.max_streak, 0), COALESCE(us.current_streak, 0)
+		FROM (SELECT NEW.user_id AS user_id) u LEFT JOIN user_streaks us ON us.user_id = u.user_id
+		WHERE true
+		ON CONFLICT(board, channel_id, discord_user_id) DO NOTHING;
+	INSERT INTO leaderboard_entries (board, channel_id, discord_user_id, value, extra)
+		SELECT 'streaks_current', NEW.channel_id, {DISCORD_ID.format(row="NEW")},
+			COALESCE(us.current_streak, 0), COALESCE(us.max_streak, 0)
+		FROM (SELECT NEW.user_id AS user_id) u LEFT JOIN user_streaks us ON us.user_id = u.user_id
+		WHERE true
+		ON CONFLICT(board, channel_id, discord_user_id) DO NOTHING;
+"""
+
+STREAK_UPSERT = f"""
+	BEGIN
+		INSERT INTO leaderboard_entries (board, channel_id, discord_user_id, value, extra)
+			VALUES ('streaks_best', {GLOBAL_CHANNEL}, {DISCORD_ID.format(row="NEW")}, 0, 0),
+				('streaks_current', {GLOBAL_CHANNEL}, {DISCORD_ID.format(row="NEW")}, 0, 0)
+			ON CONFLICT(board, channel_id, discord_user_id) DO NOTHING;
+		UPDATE leaderboard_entries SET value = NEW.max_streak, extra = NEW.current_streak
+			WHERE board = 'streaks_best' AND discord_user_id = {DISCORD_ID.format(row="NEW")};
+		UPDATE leaderboard_entries SET value = NEW.current_streak, extra = NEW.max_streak
+			WHERE board = 'streaks_current' AND discord_user_id = {DISCORD_ID.format(row="NEW")};
+	END
+"""
+
+TRIGGERS = (
+	f"""
+	CREATE TRIGGER leaderboard_messages_insert
+	AFTER INSERT ON messages
+	WHEN NEW.category = 'success'
+	BEGIN
+		{successInsert("NEW.channel_id")}
+		{successInsert(str(GLOBAL_CHANNEL))}
+		{STREAK_MEMBERSHIP}
+	END
+	""",
+	f"""
+	CREATE TRIGGER leaderboard_messages_delete
+	AFTER DELETE ON messages
+	WHEN OLD.category = 'success' AND EXISTS (SELECT 1 FROM users WHERE id = OLD.user_id)
+	BEGIN
+		{successDelete("OLD.channel_id", "AND m.channel_id = OLD.channel_id AND EXISTS (SELECT 1 FROM channels WHERE id = OLD.channel_id)")}
+		{successDelete(str(GLOBAL_CHANNEL), "")}
+		DELETE FROM leaderboard_entries
+			WHERE board IN ('streaks_best', 'streaks_current')
+			AND channel_id = OLD.channel_id AND discord_user_id = {DISCORD_ID.format(row="OLD")}
+			AND NOT EXISTS (
+				SELECT 1 FROM messages
+				WHERE user_id = OLD.user_id AND channel_id = OLD.channel_id AND category = 'success'
+			);
+	END
+	""",
+	# --- Reactions given, in the channel of the reacted message and globally ---
+	# A deleted message takes its reactions with it through ON DELETE CASCADE, and by the time the
+	# reaction triggers run the message row is gone: they are settled here, before the cascade.
+	f"""
+	CREATE TRIGGER leaderboard_messages_before_delete
+	BEFORE DELETE ON messages
+	BEGIN
+		UPDATE leaderboard_entries SET value = value - (
+				SELECT COUNT(*) FROM reactions r JOIN users u ON u.id = r.user_id
+				WHERE r.message_id = OLD.id AND u.discord_user_id = leaderboard_entries.discord_user_id
+			)
+			WHERE board = 'reactions' AND channel_id IN (OLD.channel_id, {GLOBAL_CHANNEL})
+			AND discord_user_id IN (
+				SELECT u.discord_user_id FROM reactions r JOIN users u ON u.id = r.user_id
+				WHERE r.message_id = OLD.id
+			);
+	END
+	""",
+	f"""
+	CREATE TRIGGER leaderboard_reactions_insert
+	AFTER INSERT ON reactions
+	BEGIN
+		INSERT INTO leaderboard_entries (board, channel_id, discord_user_id, value, extra)
+			SELECT 'reactions', m.channel_id, u.discord_user_id, 1, 0
+			FROM messages m, users u WHERE m.id = NEW.message_id AND u.id = NEW.user_id
+			ON CONFLICT(board, channel_id, discord_user_id) DO UPDATE SET value = value + 1;
+		INSERT INTO leaderboard_entries (board, channel_id, discord_user_id, value, extra)
+			SELECT 'reactions', {GLOBAL_CHANNEL}, u.discord_user_id, 1, 0
+			FROM users u WHERE u.id = NEW.user_id
+			ON CONFLICT(board, channel_id, discord_user_id) DO UPDATE SET value = value + 1;
+	END
+	""",
+	f"""
+	CREATE TRIGGER leaderboard_reactions_delete
+	AFTER DELETE ON reactions
+	WHEN EXISTS (SELECT 1 FROM messages WHERE id = OLD.message_id)
+	BEGIN
+		UPDATE leaderboard_entries SET value = value - 1
+			WHERE board = 'reactions'
+			AND channel_id IN ((SELECT channel_id FROM messages WHERE id = OLD.message_id), {GLOBAL_CHANNEL})
+			AND discord_user_id = {DISCORD_ID.format(row="OLD")};
+	END
+	""",
+	# --- Streaks: the global boards list every user_streaks row, channel boards follow it ---
+	f"""
+	CREATE TRIGGER leaderboard_user_streaks_insert
+	AFTER INSERT ON user_streaks
+	{STREAK_UPSERT}
+	""",
+	f"""
+	CREATE TRIGGER leaderboard_user_streaks_update
+	AFTER UPDATE ON user_streaks
+	{STREAK_UPSERT}
+	""",
+	f"""
+	CREATE TRIGGER leaderboard_user_streaks_delete
+	AFTER DELETE ON user_streaks
+	BEGIN
+		DELETE FROM leaderboard_entries
+			WHERE board IN ('streaks_best', 'streaks_current') AND channel_id = {GLOBAL_CHANNEL}
+			AND discord_user_id = {DISCORD_ID.format(row="OLD")};
+		UPDATE leaderboard_entries SET value = 0, extra = 0
+			WHERE board IN ('streaks_best', 'streaks_current')
+			AND discord_user_id = {DISCORD_ID.format(row="OLD")};
+	END
+	""",
+	"""
+	CREATE TRIGGER leaderboard_users_delete
+	AFTER DELETE ON users
+	BEGIN
+		DELETE FROM leaderboard_entries WHERE discord_user_id = OLD.discord_user_id;
+	END
+	""",
+	"""
+	CREATE TRIGGER leaderboard_channels_delete
+	AFTER DELETE ON channels
+	BEGIN
+		DELETE FROM leaderboard_entries WHERE channel_id = OLD.id;
+	END
+	""",
+)
+
+def up(cursor):
+	"""
+	Creates leaderboard_entries: one ranked value per (board, channel, user), channel_id 0 for all
+	channels together, kept current by triggers on messages, reactions and user_streaks.
+	- board: 'messages', 'reactions', 'streaks_best', 'streaks_current',
+	  'delays_best', 'delays_worst' or 'delays_avg'
+	- value: the ranked value; extra: the other streak for streak boards, the message count for delays
+	Backfills every board from the existing history.
+	"""
+	cursor.execute("""
+		CREATE TABLE IF NOT EXISTS leaderboard_entries (
+			board TEXT NOT NULL,
+			channel_id INTEGER NOT NULL,
+			discord_user_id INTEGER NOT NULL,
+			value NUMERIC NOT NULL,
+			extra INTEGER NOT NULL DEFAULT 0,
+			PRIMARY KEY(board, channel_id, discord_user_id)
+		) WITHOUT ROWID
+	""")
+	cursor.execute("""
+		CREATE INDEX IF NOT EXISTS idx_leaderboard_entries_rank
+			ON leaderboard_entries(board, channel_id, value, discord_user_id)
+	""")
+
+	# Rebuilt from scratch: drop the triggers first so the backfill doesn't fire them
+	cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'leaderboard_%'")
+	for (name,) in cursor.fetchall():
+		cursor.execute(f"DROP TRIGGER {name}")
+	cursor.execute("DELETE FROM leaderboard_entries")
+
+	delay = DELAY.format(row="m")
+	aggregates = (
+		("messages", "COUNT(*)", "0"),
+		("delays_best", f"MIN({delay})", "COUNT(*)"),
+		("delays_worst", f"MAX({delay})", "COUNT(*)"),
+		("delays_avg", f"AVG({delay})", "COUNT(*)"),
+	)
+	scopes = (("m.channel_id", "m.channel_id, u.discord_user_id"), (str(GLOBAL_CHANNEL), "u.discord_user_id"))
+	for board, value, extra in aggregates:
+		for channel, groupBy in scopes:
+			cursor.execute(f"""
+				INSERT INTO leaderboard_entries (board, channel_id, discord_user_id, value, extra)
+				SELECT '{board}', {channel}, u.discord_user_id, {value}, {extra}
+				FROM messages m JOIN users u ON u.id = m.user_id
+				WHERE m.category = 'success'
+				GROUP BY {groupBy}
+			""")
+
+	cursor.execute("""
+		INSERT INTO leaderboard_entries (board, channel_id, discord_user_id, value, extra)
+		SELECT 'reactions', m.channel_id, u.discord_user_id, COUNT(*), 0
+		FROM reactions r
+		JOIN messages m ON m.id = r.message_id
+		JOIN users u ON u.id = r.user_id
+		GROUP BY m.channel_id, u.discord_user_id
+	""")
+	cursor.execute(f"""
+		INSERT INTO leaderboard_entries (board, channel_id, discord_user_id, value, extra)
+		SELECT 'reactions', {GLOBAL_CHANNEL}, u.discord_user_id, COUNT(*), 0
+		FROM reactions r JOIN users u ON u.id = r.user_id
+		GROUP BY u.discord_user_id
+	""")
+
+	for board, value, extra in (("streaks_best", "max_streak", "current_streak"), ("streaks_current", "current_streak", "max_streak")):
+		cursor.execute(f"""
+			INSERT INTO leaderboard_entries (board, channel_id, discord_user_id, value, extra)
+			SELECT '{board}', {GLOBAL_CHANNEL}, u.discord_user_id, us.{value}, us.{extra}
+			FROM user_streaks us JOIN users u ON u.id = us.user_id
+		""")
+		cursor.execute(f"""
+			INSERT INTO leaderboard_entries (board, channel_id, discord_user_id, value, extra)
+			SELECT '{board}', m.channel_id, u.discord_user_id, COALESCE(us.{value}, 0), COALESCE(us.{extra}, 0)
+			FROM messages m
+			JOIN users u ON u.id = m.user_id
+			LEFT JOIN user_streaks us ON us.user_id = u.id
+			WHERE m.category = 'success'
+			GROUP BY m.channel_id, u.discord_user_id
+		""")
+
+	for sql in TRIGGERS:
+		cursor.execute(sql)
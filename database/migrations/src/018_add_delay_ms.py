@@ -0,0 +1,25 @@
+def up(cursor):
+	"""
+	Adds messages.delay_ms, the milliseconds into the minute a message was sent (0-59999),
+	backfills it from the epoch ms timestamp and indexes it for delay aggregates.
+	"""
+	cursor.execute("PRAGMA table_info(messages)")
+	columns = [col[1] for col in cursor.fetchall()]
+	if "delay_ms" not in columns:
+		cursor.execute("ALTER TABLE messages ADD COLUMN delay_ms INTEGER")
+	else:
+		print("'delay_ms' column already exists in messages.")
+
+	cursor.execute("""
+		UPDATE messages SET delay_ms = timestamp % 60000
+		WHERE delay_ms IS NULL AND timestamp IS NOT NULL
+	""")
+	print(f"Backfilled delay_ms on {cursor.rowcount} messages.")
+
+	# Global min / max are read straight off the index; per user and per channel
+	# aggregates narrow on the existing (user_id|channel_id, category, ...) indexes first
+	cursor.execute("""
+		CREATE INDEX IF NOT EXISTS idx_messages_category_delay
+			ON messages(category, delay_ms)
+	""")
+	cursor.execute("ANALYZE")
@@ -0,0 +1,45 @@
+BUMP = """
+	INSERT INTO leaderboard_versions (board, channel_id, version) VALUES ({board}, {row}.channel_id, 1)
+		ON CONFLICT(board, channel_id) DO UPDATE SET version = version + 1;
+"""
+
+# (table, board of a row) for every table a leaderboard reads
+SOURCES = (
+	("leaderboard_entries", "{row}.board"),
+	("daily_rollup", "'days'"),
+)
+
+def triggers():
+	for table, board in SOURCES:
+		for event, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+			yield f"""
+				CREATE TRIGGER leaderboard_versions_{table}_{event.lower()}
+				AFTER {event} ON {table}
+				BEGIN
+					{BUMP.format(board=board.format(row=row), row=row)}
+				END
+			"""
+
+
+def up(cursor):
+	"""
+	Creates leaderboard_versions, bumped by triggers whenever the rows of one board change.
+	- board: a leaderboard_entries board, or 'days' for daily_rollup
+	- channel_id: channels.id, or GLOBAL_CHANNEL
+	- version: changes counter; pages read at the same version come from the same data
+	Rows and keys of a board never move between boards or channels, so NEW and OLD share them on update.
+	"""
+	cursor.execute("""
+		CREATE TABLE IF NOT EXISTS leaderboard_versions (
+			board TEXT NOT NULL,
+			channel_id INTEGER NOT NULL,
+			version INTEGER NOT NULL DEFAULT 0,
+			PRIMARY KEY(board, channel_id)
+		) WITHOUT ROWID
+	""")
+
+	cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'leaderboard_versions_%'")
+	for (name,) in cursor.fetchall():
+		cursor.execute(f"DROP TRIGGER {name}")
+	for sql in triggers():
+		cursor.execute(sql)
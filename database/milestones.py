@@ -0,0 +1,18 @@
+def recordMilestone(cursor, scope: str, entityId: int, kind: str, value: int, day: str) -> bool:
+	"""
+	Add a milestone to the ledger. Returns True if it had not been announced yet.
+	- kind 'count': announced once per value
+	- kind 'streak': announced again when a later streak reaches the same value on another day
+	"""
+	if kind == "streak":
+		cursor.execute("""
+			INSERT INTO milestones (scope, entity_id, kind, value, day) VALUES (?, ?, ?, ?, ?)
+			ON CONFLICT(scope, entity_id, kind, value) DO UPDATE SET day = excluded.day
+			WHERE milestones.day IS NOT excluded.day
+		""", (scope, entityId, kind, value, day))
+	else:
+		cursor.execute(
+			"INSERT OR IGNORE INTO milestones (scope, entity_id, kind, value, day) VALUES (?, ?, ?, ?, ?)",
+			(scope, entityId, kind, value, day)
+		)
+	return cursor.rowcount == 1
@@ -0,0 +1,91 @@
+import queue
+import sqlite3
+from contextlib import contextmanager
+
+from database.types import registerAdapters
+
+DB_PATH = "patherine.db"
+POOL_SIZE = 4
+
+# Applied once when a connection is opened, then kept for its whole lifetime
+CONNECTION_PRAGMAS = (
+	"PRAGMA journal_mode = WAL;",
+	"PRAGMA synchronous = NORMAL;",
+	"PRAGMA foreign_keys = ON;",
+	"PRAGMA busy_timeout = 5000;",
+	"PRAGMA temp_store = MEMORY;",
+	"PRAGMA cache_size = -16000;",	# 16 MiB of page cache per connection
+	"PRAGMA mmap_size = 268435456;",	# 256 MiB memory-mapped reads
+)
+
+registerAdapters()
+
+
+class ConnectionPool:
+	"""
+	Small pool of long-lived SQLite connections.
+	Connections are configured once when opened and handed out through `connection()`.
+	If every pooled connection is busy, a temporary one is opened instead of blocking
+	the caller, and closed again when it is released.
+	"""
+
+	def __init__(self, path: str = DB_PATH, size: int = POOL_SIZE):
+		self.path = path
+		self.size = size
+		self.idle = queue.LifoQueue()
+
+	def open(self) -> sqlite3.Connection:
+		conn = sqlite3.connect(self.path, check_same_thread=False)
+		for pragma in CONNECTION_PRAGMAS:
+			conn.execute(pragma)
+		return conn
+
+	def acquire(self) -> sqlite3.Connection:
+		try:
+			return self.idle.get_nowait()
+		except queue.Empty:
+			return self.open()
+
+	def release(self, conn: sqlite3.Connection):
+		try:
+			# Same semantics as closing a connection: uncommitted work is discarded
+			if conn.in_transaction:
+				conn.rollback()
+		except sqlite3.Error:
+			conn.close()
+			return
+
+		if self.idle.qsize() < self.size:
+			self.idle.put(conn)
+		else:
+			conn.close()
+
+	@contextmanager
+	def connection(self):
+		"""Borrow a (conn, cursor) pair for the duration of a `with` block."""
+		conn = self.acquire()
+		cursor = conn.cursor()
+		try:
+			yield conn, cursor
+		finally:
+			cursor.close()
+			self.release(conn)
+
+	def closeAll(self):
+		while True:
+			try:
+				conn = self.idle.get_nowait()
+			except queue.Empty:
+				return
+			conn.close()
+
+
+pool = ConnectionPool()
+
+def dbConnection():
+	"""
+	Usage:
+		with dbConnection() as (conn, cursor):
+			cursor.execute(...)
+	"""
+	return pool.connection()
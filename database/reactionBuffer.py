@@ -0,0 +1,107 @@
+import asyncio
+
+from database.identities import identities
+from utils.utils import log
+
+FLUSH_INTERVAL = 1.0	# seconds
+MAX_BUFFERED = 500
+
+ADD = "add"
+REMOVE = "remove"
+
+
+def applyReactions(cursor, ops):
+	"""
+	Apply [((messageId, discordUserId), op)] with one executemany per operation.
+	Changes are re-checked at write time: users who untracked since the event are skipped, so
+	their users row isn't re-created, and adds for a message deleted in the meantime insert
+	nothing instead of failing the foreign key, which would roll back the whole batch.
+	"""
+	adds = []
+	removes = []
+	for (messageId, discordUserId), op in ops:
+		if identities.isUntracked(discordUserId):
+			continue
+		userId = identities.getUserId(cursor, discordUserId)
+		if op == ADD:
+			adds.append((messageId, userId, messageId))
+		else:
+			removes.append((messageId, userId))
+
+	if adds:
+		cursor.executemany("""
+			INSERT OR IGNORE INTO reactions (message_id, user_id)
+			SELECT ?, ? WHERE EXISTS (SELECT 1 FROM messages WHERE id = ?)
+		""", adds)
+	if removes:
+		cursor.executemany("DELETE FROM reactions WHERE message_id = ? AND user_id = ?", removes)
+
+
+class ReactionBuffer:
+	"""
+	Ordered buffer of reaction adds and removes, written in one transaction per flush.
+	Only the net change per (message, user) is kept: an add followed by a remove (or the
+	reverse) cancels out, since the row is back to the state it had before the first event.
+	Flushed every `interval` seconds, as soon as `maxSize` changes are pending, and on close.
+	"""
+
+	def __init__(self, database, interval: float = FLUSH_INTERVAL, maxSize: int = MAX_BUFFERED):
+		self.db = database
+		self.interval = interval
+		self.maxSize = maxSize
+		self.pending = {}	# (messageId, discordUserId) -> ADD / REMOVE, in arrival order
+		self.timer = None
+		self.inFlight = set()
+		self.closed = False
+		self.events = 0
+		self.written = 0
+		self.flushes = 0
+
+	def record(self, messageId: int, discordUserId: str, op: str):
+		self.events += 1
+		key = (messageId, discordUserId)
+		previous = self.pending.get(key)
+		if previous is not None and previous != op:
+			del self.pending[key]
+			return
+		self.pending[key] = op
+
+		if self.closed or len(self.pending) >= self.maxSize:
+			self.flush()
+		elif self.timer is None:
+			self.timer = asyncio.get_running_loop().call_later(self.interval, self.flush)
+
+	def add(self, messageId: int, discordUserId: str):
+		self.record(messageId, discordUserId, ADD)
+
+	def remove(self, messageId: int, discordUserId: str):
+		self.record(messageId, discordUserId, REMOVE)
+
+	def flush(self):
+		if self.timer is not None:
+			self.timer.cancel()
+			self.timer = None
+		if not self.pending:
+			return
+
+		ops, self.pending = list(self.pending.items()), {}
+		task = asyncio.create_task(self.write(ops))
+		self.inFlight.add(task)
+		task.add_done_callback(self.inFlight.discard)
+
+	async def write(self, ops):
+		try:
+			await self.db.transaction(applyReactions, ops)
+		except Exception as e:
+			log(f"Failed to write {len(ops)} reaction changes: {e}")
+			return
+		self.flushes += 1
+		self.written += len(ops)
+
+	async def close(self):
+		self.closed = True
+		self.flush()
+		if self.inFlight:
+			await asyncio.gather(*self.inFlight, return_exceptions=True)
+		if self.events:
+			log(f"Reaction buffer: {self.events} events, {self.written} changes in {self.flushes} transactions")
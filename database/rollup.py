@@ -0,0 +1,33 @@
+GLOBAL_CHANNEL = 0
+ROLLUP_METRICS = ("success_count", "distinct_users")
+
+
+def getDayRecord(cursor, channelId: int, day: str) -> tuple[int, int]:
+	"""
+	Return (successCount, maxSuccessCount) for one day of a channel from the trigger-maintained rollup.
+	- channelId: channels.id, or GLOBAL_CHANNEL for all channels together
+	"""
+	cursor.execute(
+		"SELECT success_count FROM daily_rollup WHERE channel_id = ? AND day = ?",
+		(channelId, day)
+	)
+	row = cursor.fetchone()
+	todayCount = row[0] if row else 0
+
+	cursor.execute("SELECT max_success_count FROM daily_rollup_max WHERE channel_id = ?", (channelId,))
+	row = cursor.fetchone()
+	return todayCount, row[0] if row else 0
+
+
+def getDailySeries(cursor, metric: str, channelId: int = GLOBAL_CHANNEL) -> list[tuple[str, int]]:
+	"""Return [(day, value)] in day order for days with at least one success."""
+	if metric not in ROLLUP_METRICS:
+		raise ValueError("Invalid metric for getDailySeries")
+	cursor.execute(f"""
+		SELECT day, {metric}
+		FROM daily_rollup
+		WHERE channel_id = ? AND success_count > 0
+		ORDER BY day
+	""", (channelId,))
+	return cursor.fetchall()
+
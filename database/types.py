@@ -0,0 +1,30 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def toEpochMs(dt: datetime) -> int:
+	"""Convert a datetime to integer milliseconds since the Unix epoch. Naive datetimes are taken as UTC."""
+	if dt.tzinfo is None:
+		dt = dt.replace(tzinfo=timezone.utc)
+	return (dt - EPOCH) // timedelta(milliseconds=1)
+
+
+def delayMs(dt: datetime) -> int:
+	"""Milliseconds into the minute of `dt`, i.e. how late a catch was: stored as messages.delay_ms."""
+	return toEpochMs(dt) % 60000
+
+
+def fromEpochMs(ms: int, tz=timezone.utc) -> datetime:
+	"""Convert stored epoch milliseconds back to an aware datetime in `tz`."""
+	return (EPOCH + timedelta(milliseconds=ms)).astimezone(tz)
+
+
+def registerAdapters():
+	"""
+	Compatibility layer for the compact INTEGER columns:
+	- datetimes bound as parameters are stored as epoch milliseconds
+	- Discord ids may still be bound as str, INTEGER column affinity converts them on insert and compare
+	"""
+	sqlite3.register_adapter(datetime, toEpochMs)
@@ -1,9 +1,10 @@
-from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
-from commands import bot
+from commands import outbox
 
+from database.channels import channels
+from database.counters import getCounter
+from database.milestones import recordMilestone
 from utils.i18n import i18n
-from utils.utils import log
+from utils.dispatcher import PRIORITY_HIGH
 
 # -----------------------------
 # Config
@@ -18,89 +19,53 @@ MILESTONE_MESSAGES: dict[int, str] = {
 	420: "achievements.count.c420"
 }
 
-todayMilestoneCache = {}
+# Announcement order when one success reaches milestones in several scopes
+SCOPES = ("user", "channel", "global")
 
 # -----------------------------
-# Count helpers using precomputed tables
+# Detection, inside the success transaction
 # -----------------------------
-def getUserSuccessCount(cursor, userId: int) -> int:
-	"""Return total 'success' messages sent by a user."""
-	cursor.execute(
-		"SELECT COUNT(*) FROM messages WHERE user_id = ? AND category = 'success'",
-		(userId,)
-	)
-	row = cursor.fetchone()
-	return row[0] if row else 0
-
-
-def getChannelSuccessCount(cursor, channelId: int) -> int:
-	"""Return total 'success' messages in a channel."""
-	cursor.execute(
-		"SELECT COUNT(*) FROM messages WHERE channel_id = ? AND category = 'success'",
-		(channelId,)
-	)
-	row = cursor.fetchone()
-	return row[0] if row else 0
-
-
-def getTotalSuccessCount(cursor) -> int:
-	"""Return global total 'success' messages."""
-	cursor.execute("SELECT COUNT(*) FROM messages WHERE category = 'success'")
-	row = cursor.fetchone()
-	return row[0] if row else 0
-
-
-def getUserCurrentStreak(cursor, userId: int, tzName: str) -> int:
-	"""Return user's current consecutive-day streak from user_streaks."""
-	cursor.execute(
-		"SELECT current_streak, last_success_date FROM user_streaks WHERE user_id = ?",
-		(userId,)
-	)
-	row = cursor.fetchone()
-	if not row:
-		return 0
-
-	current, lastDateIso = row
-	lastDay = datetime.fromisoformat(lastDateIso).date() if lastDateIso else None
-	tz = ZoneInfo(tzName)
-	today = datetime.now(tz).date()
-
-	if lastDay and (today == lastDay or today == lastDay + timedelta(days=1)):
-		return current
-	return 0
-
-def getChannelCurrentStreak(cursor, channelId: int) -> int:
-	"""Return channel's current consecutive-day streak from channel_streaks."""
-	cursor.execute(
-		"SELECT current_streak, last_success_date FROM channel_streaks WHERE channel_id = ?",
-		(channelId,)
-	)
-	row = cursor.fetchone()
-	if not row:
-		return 0
-
-	current, lastDateIso = row
-	lastDay = datetime.fromisoformat(lastDateIso).date() if lastDateIso else None
-	today = datetime.now().date()
-
-	if lastDay and (today == lastDay or today == lastDay + timedelta(days=1)):
-		return current
-	return 0
-
-def getGlobalCurrentStreak(cursor) -> int:
-	"""Return global current consecutive-day streak from global_streak."""
-	cursor.execute("SELECT current_streak, last_success_date FROM global_streak LIMIT 1")
-	row = cursor.fetchone()
-	if not row:
-		return 0
-
-	current, lastDateIso = row
-	lastDay = datetime.fromisoformat(lastDateIso).date() if lastDateIso else None
-	today = datetime.now().date()
-
-	if lastDay and (today == lastDay or today == lastDay + timedelta(days=1)):
-		return current
-	return 0
+def readCurrentStreaks(cursor, userId: int, channelId: int) -> dict[str, int]:
+	"""Return the stored current_streak for the user, the channel and globally."""
+	cursor.execute("SELECT current_streak FROM user_streaks WHERE user_id = ?", (userId,))
+	user = cursor.fetchone()
+	cursor.execute("SELECT current_streak FROM channel_streaks WHERE channel_id = ?", (channelId,))
+	channel = cursor.fetchone()
+	cursor.execute("SELECT current_streak FROM global_streak LIMIT 1")
+	total = cursor.fetchone()
+	return {
+		"user": user[0] if user else 0,
+		"channel": channel[0] if channel else 0,
+		"global": total[0] if total else 0,
+	}
+
+def detectMilestones(cursor, channelId: int, userId: int, day: str) -> list[tuple[str, int, dict[str, int]]]:
+	"""
+	Called right after a success message and its streak updates were written, so every scope's
+	count and current streak are today's. Each one on a milestone goes to the ledger, which keeps
+	a count once and a streak value once a day; returns those it had not seen yet, in SCOPES order,
+	as (scope, entityId, {kind: value}).
+	"""
+	streaks = readCurrentStreaks(cursor, userId, channelId)
+	entities = {"user": userId, "channel": channelId, "global": 0}
+
+	milestones = []
+	for scope in SCOPES:
+		entityId = entities[scope]
+		reached = {}
+		count = getCounter(cursor, scope, entityId, "success")
+		if isMilestone(count):
+			reached["count"] = count
+		if isMilestone(streaks[scope], isStreak=True):
+			reached["streak"] = streaks[scope]
+
+		fresh = {
+			kind: value for kind, value in reached.items()
+			if recordMilestone(cursor, scope, entityId, kind, value, day)
+		}
+		if fresh:
+			milestones.append((scope, entityId, fresh))
+	return milestones
 
 def isMilestone(count: int, isStreak = False) -> bool:
 	"""Return True if the count is a notable milestone."""
@@ -118,96 +83,40 @@ def getMilestoneMessage(count: int, l) -> str:
 # -----------------------------
 # Achievement handler
 # -----------------------------
-async def handleAchievements(conn, cursor, internalId: int, userId: int, tzName: str, message, l):
+def handleAchievements(milestones, message, l):
 	"""
-	Check notable milestones and send congrats messages.
-
-	Priority:
+	Announce the milestones returned by detectMilestones, one message per scope.
 	1. User milestones (count or streak) → same channel
 	2. Channel milestones → same channel
 	3. Global milestones → broadcast to all channels
 	"""
-	global todayMilestoneCache
-
-	# Clean up cache for previous days
-	today = datetime.now().date()
-	todayMilestoneCache.update({
-		key: val for key, val in todayMilestoneCache.items()
-		if key[2] == today
-	})
-
-	# Fetch counts and streaks
-	userCount = getUserSuccessCount(cursor, userId)
-	userStreak = getUserCurrentStreak(cursor, userId, tzName)
-	channelCount = getChannelSuccessCount(cursor, internalId)
-	channelStreak = getChannelCurrentStreak(cursor, internalId)
-	totalCount = getTotalSuccessCount(cursor)
-	totalStreak = getGlobalCurrentStreak(cursor)
-
-	# --- User milestones ---
-	if (isMilestone(userCount) or isMilestone(userStreak, isStreak=True)) and (("user", userId, datetime.now().date()) not in todayMilestoneCache):
-		parts = []
-		if isMilestone(userCount):
-			parts.append(f"{i18n.t(l, 'achievements.user.msg.p1')} **{userCount}** {i18n.t(l, 'achievements.user.msg.p2')}")
-		if isMilestone(userStreak, isStreak=True):
-			parts.append(f"🔥 {i18n.t(l, 'achievements.user.streak.p1')} **{userStreak}** {i18n.t(l, 'achievements.user.streak.p2')}\n")
-			if not isMilestone(userCount):
-				parts.append(getMilestoneMessage(userStreak, l))
-
-		content = f"{i18n.t(l, 'achievements.user.congrats')} {message.author.mention}! {' — '.join(parts)}"
-		todayMilestoneCache[("user", userId, datetime.now().date())] = True
-		try:
-			await message.channel.send(content)
-		except Exception as e:
-			log(f"Failed to send congrats in channel {message.channel.id}: {e}")
-		return
-
-	# --- Channel milestones (send only in this channel) ---
-	if (isMilestone(channelCount) or isMilestone(channelStreak, isStreak=True)) and (("channel", internalId, datetime.now().date()) not in todayMilestoneCache):
-		parts = []
-		if isMilestone(channelCount):
-			parts.append(f"{i18n.t(l, 'achievements.channel.msg.p1')} **{channelCount}** 🎊\n{getMilestoneMessage(channelCount, l)}")
-		if isMilestone(channelStreak, isStreak=True):
-			parts.append(f"🔥 {i18n.t(l, 'achievements.channel.streak.p1')} **{channelStreak}** {i18n.t(l, 'achievements.channel.streak.p2')}\n")
-			if not isMilestone(channelCount):
-				parts.append(getMilestoneMessage(channelStreak, l))
-
-		content = " / ".join(parts)
-		todayMilestoneCache[("channel", internalId, datetime.now().date())] = True
-		try:
-			await message.channel.send(content)
-		except Exception as e:
-			log(f"Failed to send channel milestone in {message.channel.id}: {e}")
-		return
-
-	# --- Global milestones (broadcast) ---
-	if (isMilestone(totalCount) or isMilestone(totalStreak, isStreak=True)) and (("global", 0, datetime.now().date()) not in todayMilestoneCache):
-		parts = []
-		if isMilestone(totalCount):
-			parts.append(f"{i18n.t(l, 'achievements.global.msg.p1')} **{totalCount}** 🎊\n{getMilestoneMessage(totalCount, l)}")
-		if isMilestone(totalStreak, isStreak=True):
-			parts.append(f"🔥 {i18n.t(l, 'achievements.global.streak.p1')} **{totalStreak}** {i18n.t(l, 'achievements.channel.streak.p2')}\n")
-			if not isMilestone(totalCount):
-				parts.append(getMilestoneMessage(totalStreak, l))
-		content = " / ".join(parts)
-
-		todayMilestoneCache[("global", 0, datetime.now().date())] = True
-		cursor.execute("SELECT discord_channel_id FROM channels WHERE discord_channel_id IS NOT NULL")
-		rows = cursor.fetchall()
-
-		for (discordChannelId,) in rows:
-			try:
-				ch = bot.get_channel(int(discordChannelId))
-				if ch:
-					await ch.send(content)
-			except Exception:
-				try:
-					ch = await bot.fetch_channel(int(discordChannelId))
-					if ch:
-						await ch.send(content)
-				except Exception as e2:
-					log(f"Failed to broadcast global milestone to channel {discordChannelId}: {e2}")
+	for scope, _, reached in milestones:
+		announceMilestone(scope, reached, message, l)
+
+def announceMilestone(scope: str, reached: dict[str, int], message, l):
+	count = reached.get("count")
+	streak = reached.get("streak")
+
+	parts = []
+	if scope == "user":
+		if count:
+			parts.append(f"{i18n.t(l, 'achievements.user.msg.p1')} **{count}** {i18n.t(l, 'achievements.user.msg.p2')}")
+		if streak:
+			parts.append(f"🔥 {i18n.t(l, 'achievements.user.streak.p1')} **{streak}** {i18n.t(l, 'achievements.user.streak.p2')}\n")
+			if not count:
+				parts.append(getMilestoneMessage(streak, l))
+		outbox.send(message.channel, f"{i18n.t(l, 'achievements.user.congrats')} {message.author.mention}! {' — '.join(parts)}", PRIORITY_HIGH)
 		return
 
-	# No milestone reached → nothing to do
-	return
+	if count:
+		parts.append(f"{i18n.t(l, f'achievements.{scope}.msg.p1')} **{count}** 🎊\n{getMilestoneMessage(count, l)}")
+	if streak:
+		parts.append(f"🔥 {i18n.t(l, f'achievements.{scope}.streak.p1')} **{streak}** {i18n.t(l, 'achievements.channel.streak.p2')}\n")
+		if not count:
+			parts.append(getMilestoneMessage(streak, l))
+	content = " / ".join(parts)
+
+	if scope == "channel":
+		outbox.send(message.channel, content, PRIORITY_HIGH)
+	else:
+		outbox.broadcast([config.discordChannelId for config in channels.all()], content)
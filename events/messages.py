@@ -1,40 +1,41 @@
 import discord
-from datetime import timezone
-from zoneinfo import ZoneInfo
+from datetime import datetime, timezone
 
 from commands import bot
-from commands.populateDb import getCategoryFromTime, getUserId, isUserUntracked
+from commands.populateDb import categoryWindows, getUserId, isUserUntracked
 from utils.i18n import i18n
-from utils.utils import connectDb, log
-from events.achievements import handleAchievements
+from database.asyncDb import db
+from database.channels import channels
+from database.coalescer import WriteCoalescer
+from database.messageIndex import successMessages
+from database.types import delayMs
+from utils.utils import log
+from utils.workQueue import WorkQueue
+from events.achievements import detectMilestones, handleAchievements
 
-DEFAULT_TZ = ZoneInfo("Europe/Paris")
+successWrites = WriteCoalescer(db)
+db.addCloseHook(successWrites.close)
 
-
-# --- DB helpers ---
-def getChannelInfo(cursor, discordChannelId: str):
-	"""Return (internalChId, tzName, discord_role_id, lang) for channel, or None."""
-	cursor.execute(
-		"SELECT id, timezone, discord_role_id, lang FROM channels WHERE discord_channel_id = ?",
-		(discordChannelId,),
-	)
-	return cursor.fetchone()
+# Role grants for stored successes, run off the ingest path
+postProcess = WorkQueue("Post-process")
+db.addCloseHook(postProcess.close)
 
 
-def insertMessage(cursor, channelId: int, userId: int, messageId: str, timestampIso: str) -> bool:
+# --- DB helpers ---
+def insertMessage(cursor, channelId: int, userId: int, messageId: str, timestamp: datetime, successDay: str) -> int | None:
 	"""
-	Insert message as 'success'. Returns True if inserted, False if duplicate.
+	Insert message as 'success'. Returns the new row id, or None if duplicate.
+	- successDay: channel-local day of the message (YYYY-MM-DD)
 	"""
 	cursor.execute(
 		"""
-		INSERT INTO messages (channel_id, user_id, message_id, timestamp, category)
-		VALUES (?, ?, ?, ?, 'success')
+		INSERT INTO messages (channel_id, user_id, message_id, timestamp, category, success_day, delay_ms)
+		VALUES (?, ?, ?, ?, 'success', ?, ?)
 		ON CONFLICT(message_id) DO NOTHING
 		""",
-		(channelId, userId, messageId, timestampIso),
+		(channelId, userId, messageId, timestamp, successDay, delayMs(timestamp)),
 	)
-	cursor.execute("SELECT changes()")
-	return cursor.fetchone()[0] > 0
+	return cursor.lastrowid if cursor.rowcount == 1 else None
 
 
 def upsertStreak(cursor, table: str, messageDateIso: str, entityId: int | None = None):
@@ -110,6 +111,53 @@ def upsertStreak(cursor, table: str, messageDateIso: str, entityId: int | None =
 		""", (entityId, messageDateIso))
 
 
+def storeSuccessMessage(cursor, channelId: int, discordUserId: str, discordMessageId: str, localDt):
+	"""
+	Store a success message and update streaks, enforcing one success per channel
+	and three per user each day. Returns the internal (userId, messageId, milestones) if stored,
+	else None; milestones is what detectMilestones found.
+	"""
+	if isUserUntracked(discordUserId):
+		return None
+	userId = getUserId(cursor, discordUserId)
+
+	messageDateIso = localDt.date().isoformat()
+
+	cursor.execute("""
+		SELECT 1 FROM messages 
+		WHERE user_id = ? AND channel_id = ? 
+		AND category = 'success' AND success_day = ?
+		LIMIT 1
+	""", (userId, channelId, messageDateIso))
+
+	if cursor.fetchone():
+		# User already has a success message for this channel and day, do nothing
+		return None
+
+	cursor.execute("""
+		SELECT COUNT(*) FROM messages 
+		WHERE user_id = ?
+		AND category = 'success' AND success_day = ?
+	""", (userId, messageDateIso))
+
+	if cursor.fetchone()[0] >= 3:
+		# User already has 3+ success messages for this day, do nothing
+		return None
+
+	messageId = insertMessage(cursor, channelId, userId, discordMessageId, localDt, messageDateIso)
+	if messageId is None:
+		return None
+
+	# User
+	upsertStreak(cursor, "user_streaks", messageDateIso, userId)
+	# Channel
+	upsertStreak(cursor, "channel_streaks", messageDateIso, channelId)
+	# Global
+	upsertStreak(cursor, "global_streak", messageDateIso)
+
+	return userId, messageId, detectMilestones(cursor, channelId, userId, messageDateIso)
+
+
 def fetchUserRoleIds(cursor, userId: int) -> list[str]:
 	"""Return list of role IDs for channels where the user has success messages."""
 	cursor.execute(
@@ -151,6 +199,12 @@ async def assignRolesAcrossGuilds(member: discord.User, roleIds: list[str]):
 				log(f"Failed to add roles {[r.id for r in rolesToAdd]} in guild {guild.name} for user {member.id}: {e}")
 
 
+async def grantSuccessRoles(member: discord.User, userId: int):
+	"""Give a member the roles of every channel they have succeeded in."""
+	roleIds = await db.read(fetchUserRoleIds, userId)
+	await assignRolesAcrossGuilds(member, roleIds)
+
+
 # --- Event handler ---
 @bot.event
 async def on_message(message: discord.Message):
@@ -162,88 +216,31 @@ async def on_message(message: discord.Message):
 	if "cath" not in message.content.lower():
 		return
 
-	conn, cursor = connectDb()
+	# --- Get channel config ---
+	ch = channels.get(message.channel.id)
+	if not ch:
+		return
+	internalChId = ch.id
+
+	# Only 'success' messages matter
+	if categoryWindows.classify(message.created_at, ch.tz) != "success":
+		return
+
+	# --- Local datetime in channel TZ ---
+	localDt = message.created_at.replace(tzinfo=timezone.utc).astimezone(ch.tz)
+
 	try:
-		# --- Get channel config ---
-		ch = getChannelInfo(cursor, str(message.channel.id))
-		if not ch:
-			return
-		internalChId, tzName, _, cl = ch
-		tz = ZoneInfo(tzName) if tzName else DEFAULT_TZ
-
-		# --- Local datetime in channel TZ ---
-		localDt = message.created_at.replace(tzinfo=timezone.utc).astimezone(tz)
-
-		# Only 'success' messages matter
-		category = getCategoryFromTime(localDt.time())
-		if category != "success":
-			return
-		
-		try:
-			await message.add_reaction("💜")
-		except discord.HTTPException:
-			pass
-
-		# --- User checks ---
-		uidStr = str(message.author.id)
-		if isUserUntracked(uidStr, cursor):
-			return
-		userId = getUserId(conn, cursor, uidStr)
-
-		messageDateIso = localDt.date().isoformat()
-
-		dayStart = localDt.replace(hour=0, minute=0, second=0, microsecond=0)
-		dayEnd = localDt.replace(hour=23, minute=59, second=59, microsecond=999999)
-
-		cursor.execute("""
-			SELECT 1 FROM messages 
-			WHERE user_id = ? AND channel_id = ? 
-			AND timestamp >= ? AND timestamp <= ?
-			AND category = 'success'
-			LIMIT 1
-		""", (userId, internalChId, dayStart.isoformat(), dayEnd.isoformat()))
-
-		if cursor.fetchone():
-			# User already has a success message for this channel and day, do nothing
-			return
-
-		cursor.execute("""
-			SELECT COUNT(*) FROM messages 
-			WHERE user_id = ?
-			AND timestamp >= ? AND timestamp <= ?
-			AND category = 'success'
-		""", (userId, dayStart.isoformat(), dayEnd.isoformat()))
-
-		if cursor.fetchone()[0] >= 3:
-			# User already has 3+ success messages for this day, do nothing
-			return
-
-		# --- DB transaction: insert + streak update ---
-		try:
-			conn.execute("BEGIN")
-			if not insertMessage(cursor, internalChId, userId, str(message.id), localDt.isoformat()):
-				conn.rollback()
-				return
-
-			# User
-			upsertStreak(cursor, "user_streaks", messageDateIso, userId)
-			# Channel
-			upsertStreak(cursor, "channel_streaks", messageDateIso, internalChId)
-			# Global
-			upsertStreak(cursor, "global_streak", messageDateIso)
-
-			conn.commit()
-		except Exception:
-			conn.rollback()
-			raise
-
-		# --- Post-commit async tasks ---
-		roleIds = fetchUserRoleIds(cursor, userId)
-		await assignRolesAcrossGuilds(message.author, roleIds)
-		await handleAchievements(conn, cursor, internalChId, userId, tzName, message, cl)
-
-	finally:
-		try:
-			conn.close()
-		except Exception:
-			pass
+		await message.add_reaction("💜")
+	except discord.HTTPException:
+		pass
+
+	# --- DB write: user checks + insert + streak update, group-committed with the rest of the burst ---
+	stored = await successWrites.submit(storeSuccessMessage, internalChId, str(message.author.id), str(message.id), localDt)
+	if stored is None:
+		return
+	userId, messageId, milestones = stored
+	successMessages.put(message.id, messageId)
+
+	# --- Post-commit tasks, queued: one role grant per member however many successes are waiting ---
+	await postProcess.submit(grantSuccessRoles, message.author, userId, key=("roles", userId))
+	handleAchievements(milestones, message, ch.lang)
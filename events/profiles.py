@@ -0,0 +1,34 @@
+import discord
+
+from commands import bot
+from database.asyncDb import db
+from utils.usernames import profileName, refreshProfile, storeProfiles
+from utils.utils import log
+
+
+@bot.listen("on_ready")
+async def cacheGuildProfiles():
+	"""Fill user_profiles in bulk from every guild's member list, for tracked users only, with their account names."""
+	rows = await db.fetchall("SELECT discord_user_id FROM users")
+	tracked = {int(r[0]) for r in rows}
+
+	names = {}
+	for guild in bot.guilds:
+		if not guild.chunked:
+			try:
+				await guild.chunk()
+			except discord.HTTPException as e:
+				log(f"Failed to chunk members of {guild.name}: {e}")
+				continue
+		for member in guild.members:
+			if member.id in tracked:
+				names[member.id] = profileName(member)
+
+	await storeProfiles(names)
+	log(f"Cached {len(names)} user profiles from guild members.")
+
+
+@bot.listen("on_user_update")
+async def refreshUserProfile(before: discord.User, after: discord.User):
+	if profileName(before) != profileName(after):
+		await db.transaction(refreshProfile, after.id, profileName(after))
@@ -1,16 +1,25 @@
+import time
 import discord
 from discord.ext import tasks
-from commands import TOKEN, bot
+from commands import TOKEN, bot, outbox
 
-from datetime import datetime, time as dtTime, timedelta
-from zoneinfo import ZoneInfo
+from datetime import time as dtTime
 
+from utils.cache import BoundedCache
+from utils.scheduler import DailyScheduler
 from utils.utils import log
-from database.db import createDb, connectDb
+from database.db import createDb
+from database.asyncDb import db
+from database.channels import channels
+from database.identities import identities
+from database.counters import getCounters
+from database.rollup import GLOBAL_CHANNEL, getDayRecord
 from database.migrations.migrate import runMigrations
+from database.pool import dbConnection
 
 # Need to be imported even if not called directly
 import events.messages
+import events.profiles
 import events.reactions
 
 TARGET_TIME = dtTime(12, 7, 0)
@@ -21,176 +30,161 @@ log("Database initialized successfully.")
 runMigrations()
 log("Migrations applied successfully.")
 
+with dbConnection() as (conn, cursor):
+	channels.load(cursor)
+	identities.load(cursor)
+
+scheduler = DailyScheduler(db)
+db.addCloseHook(scheduler.close)
+
 @bot.event
 async def on_ready():
 	log(f"Bot is ready as {bot.user.name} (ID: {bot.user.id})")
 	log("Bot is connected to the following guilds:")
 	for guild in bot.guilds:
 		print(f"\t\t\t\t- {guild.name} - {guild.member_count} members")
-	checkRolesRemoval.start()
-	updateStatus.start()
-
-lastChannelMilestone = {}
-lastGlobalMilestone = None
-
-async def checkDailyParticipationMilestone(cursor, guild, dbChannelId, todayDate, channelName=None):
+	if not scheduler.started:
+		await scheduler.start()
+		for config in channels.all():
+			scheduleDailyJob(None, config)
+		channels.addListener(scheduleDailyJob)
+	presence["text"] = None	# presence is lost on reconnect
+	presence["at"] = 0.0
+	if not updateStatus.is_running():
+		updateStatus.start()
+
+# (dbChannelId or "global", localDay) of record days already announced; days are channel-local, so kept two days
+announcedRecordDays = BoundedCache(maxSize=1024, ttl=2 * 24 * 3600)
+
+def getParticipationCounts(cursor, dbChannelId, todayDate):
+	"""Return (todayCount, maxCount) for the channel and (globalToday, globalMax) across all channels."""
+	return getDayRecord(cursor, dbChannelId, todayDate), getDayRecord(cursor, GLOBAL_CHANNEL, todayDate)
+
+async def checkDailyParticipationMilestone(guild, dbChannelId, todayDate, channelName=None):
 	"""
 	Check if today is a record day for the channel or global participation.
 	Returns a list of messages to send.
 	"""
 	messages = []
+	(todayCount, maxCount), (globalToday, globalMax) = await db.read(getParticipationCounts, dbChannelId, todayDate)
 
 	# --- Channel milestone ---
-	cursor.execute("""
-		SELECT COUNT(*) FROM messages
-		WHERE channel_id = ? AND category='success'
-		AND DATE(timestamp, 'localtime') = ?
-	""", (dbChannelId, todayDate))
-	todayCount = cursor.fetchone()[0]
-
-	cursor.execute("""
-		SELECT MAX(count) FROM (
-			SELECT COUNT(*) AS count, DATE(timestamp, 'localtime') AS day
-			FROM messages
-			WHERE channel_id = ? AND category='success'
-			GROUP BY day
-		)
-	""", (dbChannelId,))
-	maxCount = cursor.fetchone()[0] or 0
-
-	if todayCount >= maxCount and lastChannelMilestone.get(dbChannelId) != todayDate:
-		lastChannelMilestone[dbChannelId] = todayDate
+	if todayCount >= maxCount and (dbChannelId, todayDate) not in announcedRecordDays:
+		announcedRecordDays.set((dbChannelId, todayDate), True)
 		messages.append(
 			f"🎉 Today is the most active day in {guild.name} - #{channelName or 'channel'} with {todayCount} caths!"
 		)
 
 	# --- Global milestone ---
-	cursor.execute("""
-		SELECT COUNT(*) FROM messages
-		WHERE category='success'
-		AND DATE(timestamp, 'localtime') = ?
-	""", (todayDate,))
-	globalToday = cursor.fetchone()[0]
-
-	cursor.execute("""
-		SELECT MAX(count) FROM (
-			SELECT COUNT(*) AS count, DATE(timestamp, 'localtime') AS day
-			FROM messages
-			WHERE category='success'
-			GROUP BY day
-		)
-	""")
-	globalMax = cursor.fetchone()[0] or 0
-
 	globalMessage = None
-	global lastGlobalMilestone
-	if globalToday >= globalMax and lastGlobalMilestone != todayDate:
-		lastGlobalMilestone = todayDate
+	if globalToday >= globalMax and ("global", todayDate) not in announcedRecordDays:
+		announcedRecordDays.set(("global", todayDate), True)
 		globalMessage = f"🌐 Today is a record participation day globally with {globalToday} caths!"
 
 	return messages, globalMessage
 
-@tasks.loop(minutes=1)
-async def checkRolesRemoval():
-	nowUtc = datetime.now(tz=ZoneInfo("UTC"))
-
-	conn, cursor = connectDb()
+def getSuccessfulUserIds(cursor, dbChannelId, todayDate) -> set[int]:
+	"""Return the Discord IDs of every user with a success message today in the channel."""
 	cursor.execute("""
-		SELECT discord_channel_id, discord_role_id, timezone, id
-		FROM channels
-		WHERE discord_role_id IS NOT NULL AND timezone IS NOT NULL
-	""")
-	channelConfigs = cursor.fetchall()
-	conn.close()
-
-	for (channelIdStr, roleIdStr, timezoneName, dbChannelId) in channelConfigs:
-		try:
-			timezone = ZoneInfo(timezoneName)
-		except Exception:
-			log(f"Invalid timezone {timezoneName} for role {roleIdStr}")
-			continue
-
-		nowLocal = nowUtc.astimezone(timezone)
-		targetDatetime = datetime.combine(nowLocal.date(), TARGET_TIME, tzinfo=timezone)
-		diffSeconds = abs((nowLocal - targetDatetime).total_seconds())
-
-		if diffSeconds > 60 or diffSeconds < 0:
-			continue
-
-		for guild in bot.guilds:
-			role = guild.get_role(int(roleIdStr))
-			if not role:
-				log(f"Role ID {roleIdStr} not found in guild {guild.name}")
-				continue
-
-			log(f"Checking {len(role.members)} members for role removal in guild {guild.name}")
-			conn, cursor = connectDb()
-			todayDate = nowLocal.strftime("%Y-%m-%d")
-
-			for member in role.members:
-				userIdStr = str(member.id)
-
-				cursor.execute("SELECT id FROM users WHERE discord_user_id = ?", (userIdStr,))
-				userRow = cursor.fetchone()
-
-				if not userRow:
-					shouldRemove = True
-				else:
-					userDbId = userRow[0]
-					cursor.execute("""
-						SELECT 1 FROM messages
-						WHERE user_id = ?
-						AND channel_id = ?
-						AND category = 'success'
-						AND DATE(timestamp, 'localtime') = ?
-					""", (userDbId, dbChannelId, todayDate))
-					shouldRemove = cursor.fetchone() is None
-
-				if shouldRemove:
-					try:
-						await member.remove_roles(role, reason="Did not post success message today")
-						log(f"Removed role {role.name} from {member.name}")
-					except discord.Forbidden:
-						log(f"Missing permissions to remove role {role.name} from {member.name}")
-					except discord.HTTPException as e:
-						log(f"HTTP error removing role: {e}")
-
-		# --- Check milestones ---
-		channel = bot.get_channel(int(channelIdStr)) or await bot.fetch_channel(int(channelIdStr))
-		guild = channel.guild if channel else None
-		channelName = channel.name if channel else None
-		channelMessages, globalMessage = await checkDailyParticipationMilestone(cursor, guild, dbChannelId, todayDate, channelName=channelName)
-		conn.close()
-		if not globalMessage and channel:
-			for msg in channelMessages:
-				await channel.send(msg)
-		if globalMessage:
-			for chIdStr, _, _, _ in channelConfigs:
-				ch = bot.get_channel(int(chIdStr)) or await bot.fetch_channel(int(chIdStr))
-				if ch:
-					await ch.send(globalMessage)
-
-
-@tasks.loop(minutes=5)
-async def updateStatus():
-	conn, cursor = connectDb()
-	cursor.execute("SELECT COUNT(*) FROM messages WHERE category = 'success'")
-	totalSuccess = cursor.fetchone()[0] or 0
+		SELECT u.discord_user_id
+		FROM messages m
+		JOIN users u ON u.id = m.user_id
+		WHERE m.channel_id = ?
+		AND m.category = 'success'
+		AND m.success_day = ?
+	""", (dbChannelId, todayDate))
+	return {int(row[0]) for row in cursor.fetchall()}
+
+# role id -> guild id, filled the first time a role is looked up
+roleGuilds = {}
+
+def resolveRole(roleId: int, channel=None):
+	"""Return the role object, looking in the cached guild, then the channel's guild, then every guild."""
+	guild = bot.get_guild(roleGuilds[roleId]) if roleId in roleGuilds else None
+	candidates = [guild] if guild else []
+	if channel is not None and getattr(channel, "guild", None):
+		candidates.append(channel.guild)
+	candidates.extend(bot.guilds)
+
+	for guild in candidates:
+		role = guild.get_role(roleId)
+		if role:
+			roleGuilds[roleId] = guild.id
+			return role
+	return None
+
+def dailyJobKey(config) -> str:
+	return f"daily:{config.id}"
+
+def scheduleDailyJob(previous, config):
+	"""Channel registry listener: keep one daily job per channel with a role, at TARGET_TIME in its timezone."""
+	if previous is not None:
+		scheduler.unschedule(dailyJobKey(previous))
+	if config is not None and config.discordRoleId is not None:
+		scheduler.schedule(dailyJobKey(config), config.tz, TARGET_TIME, lambda todayDate: runDailyChannelJob(config, todayDate))
+
+async def runDailyChannelJob(config, todayDate: str):
+	"""Remove the channel role from members without a success today, then announce record days."""
+	dbChannelId = config.id
+	try:
+		channel = await outbox.resolve(config.discordChannelId)
+	except discord.HTTPException:
+		channel = None
+
+	role = resolveRole(config.discordRoleId, channel)
+	if not role:
+		log(f"Role ID {config.discordRoleId} not found in any guild")
+	else:
+		log(f"Checking {len(role.members)} members for role removal in guild {role.guild.name}")
+		succeeded = await db.read(getSuccessfulUserIds, dbChannelId, todayDate)
+		missing = [member for member in role.members if member.id not in succeeded]
+
+		for member in missing:
+			try:
+				await member.remove_roles(role, reason="Did not post success message today")
+				log(f"Removed role {role.name} from {member.name}")
+			except discord.Forbidden:
+				log(f"Missing permissions to remove role {role.name} from {member.name}")
+			except discord.HTTPException as e:
+				log(f"HTTP error removing role: {e}")
+
+	# --- Check milestones ---
+	guild = channel.guild if channel else None
+	channelName = channel.name if channel else None
+	channelMessages, globalMessage = await checkDailyParticipationMilestone(guild, dbChannelId, todayDate, channelName=channelName)
+	if not globalMessage and channel:
+		for msg in channelMessages:
+			outbox.send(channel, msg)
+	if globalMessage:
+		roleChannels = [other.discordChannelId for other in channels.all() if other.discordRoleId is not None]
+		outbox.broadcast(roleChannels, globalMessage)
+
+
+def getStatusTotals(cursor):
+	"""Return (totalSuccess, totalUsersWithSuccess, totalReactions)."""
+	counters = getCounters(cursor, "global")
+	return counters.get("success", 0), counters.get("success_users", 0), counters.get("reactions_received", 0)
+
+# Totals are read from counters every minute, but the presence only changes when its text does
+PRESENCE_MIN_INTERVAL = 300	# seconds between change_presence calls
+presence = {"text": None, "at": 0.0}
 
-	cursor.execute("SELECT COUNT(*) FROM reactions")
-	totalReactions = cursor.fetchone()[0] or 0
+@tasks.loop(minutes=1)
+async def updateStatus():
+	totalSuccess, totalUsersWithSuccess, totalReactions = await db.read(getStatusTotals)
 
-	cursor.execute("SELECT COUNT(DISTINCT user_id) FROM messages WHERE category = 'success'")
-	totalUsersWithSuccess = cursor.fetchone()[0] or 0
-	conn.close()
+	text = f"{totalSuccess} caths by {totalUsersWithSuccess} users | {totalReactions} reactions 💜"
+	now = time.monotonic()
+	if text == presence["text"] or now - presence["at"] < PRESENCE_MIN_INTERVAL:
+		return
 
-	activity = discord.Game(
-		f"{totalSuccess} caths by {totalUsersWithSuccess} users | {totalReactions} reactions 💜"
-	)
 	try:
-		await bot.change_presence(status=discord.Status.online, activity=activity)
+		await bot.change_presence(status=discord.Status.online, activity=discord.Game(text))
 	except Exception as e:
 		log(f"Failed to update presence: {e}")
+		return
+	presence["text"] = text
+	presence["at"] = now
 
 
 if __name__ == "__main__":
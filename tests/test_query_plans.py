@@ -0,0 +1,157 @@
+import re
+
+import pytest
+
+from database.db import createDb
+from database.leaderboards import LeaderboardQuery, snapshotQuery
+from database.migrations.migrate import runMigrations
+from database.pool import dbConnection, pool
+
+# Tables that grow with every message, reaction or day, and the aliases the statements give them
+HOT_TABLES = {"messages", "m", "reactions", "r", "leaderboard_entries", "daily_rollup"}
+
+# Hot statements: each must search an index, never walk a whole hot table
+STATEMENTS = {
+	# events/messages.py: daily dedupe and cap on a new success, then the roles it grants
+	"success dedupe": (
+		"""
+		SELECT 1 FROM messages
+		WHERE user_id = ? AND channel_id = ?
+		AND category = 'success' AND success_day = ?
+		LIMIT 1
+		""",
+		(1, 1, "2026-01-01"),
+	),
+	"success daily cap": (
+		"""
+		SELECT COUNT(*) FROM messages
+		WHERE user_id = ?
+		AND category = 'success' AND success_day = ?
+		""",
+		(1, "2026-01-01"),
+	),
+	"user role ids": (
+		"""
+		SELECT DISTINCT c.discord_role_id
+		FROM channels c
+		JOIN messages m ON m.channel_id = c.id
+		WHERE m.user_id = ? AND m.category = 'success' AND c.discord_role_id IS NOT NULL
+		""",
+		(1,),
+	),
+	# events/reactions.py through database/messageIndex.py: is the reacted message a success
+	"success message lookup": (
+		"SELECT id FROM messages WHERE message_id = ? AND channel_id = ? AND category = 'success'",
+		(1, 1),
+	),
+	# database/reactionBuffer.py: buffered reaction writes
+	"reaction insert": (
+		"""
+		INSERT OR IGNORE INTO reactions (message_id, user_id)
+		SELECT ?, ? WHERE EXISTS (SELECT 1 FROM messages WHERE id = ?)
+		""",
+		(1, 1, 1),
+	),
+	"reaction delete": (
+		"DELETE FROM reactions WHERE message_id = ? AND user_id = ?",
+		(1, 1),
+	),
+	# main.py: today's successful users of a channel, for the role sweep
+	"successful users today": (
+		"""
+		SELECT u.discord_user_id
+		FROM messages m
+		JOIN users u ON u.id = m.user_id
+		WHERE m.channel_id = ?
+		AND m.category = 'success'
+		AND m.success_day = ?
+		""",
+		(1, "2026-01-01"),
+	),
+}
+
+# commands/stat.py: fetchDelays, globally, for a channel and for a user
+DELAY_SCOPES = {
+	"global": ("WHERE m.category = 'success'", ()),
+	"channel": ("WHERE m.channel_id = (SELECT id FROM channels WHERE discord_channel_id = ?) AND m.category = 'success'", (1,)),
+	"user": ("WHERE m.user_id = (SELECT id FROM users WHERE discord_user_id = ?) AND m.category = 'success'", (1,)),
+}
+for scope, (where, params) in DELAY_SCOPES.items():
+	STATEMENTS[f"{scope} delays"] = (f"SELECT MIN(m.delay_ms), AVG(m.delay_ms), MAX(m.delay_ms) FROM messages m {where}", params)
+	STATEMENTS[f"{scope} last delay"] = (
+		f"SELECT m.delay_ms FROM messages m {where} ORDER BY m.success_day DESC, m.timestamp DESC LIMIT 1",
+		params,
+	)
+
+# commands/leaderboard.py: pages and ranks of the trigger-maintained boards, in both directions, and of the days board
+BOARDS = {
+	"messages": snapshotQuery("messages", 1),
+	"delays": snapshotQuery("delays_best", 0, descending=False),
+	"days": LeaderboardQuery("""
+		SELECT day AS rank_key, distinct_users AS rank_value
+		FROM daily_rollup
+		WHERE channel_id = ? AND distinct_users > 0
+	""", (1,)),
+}
+
+
+class RecordingCursor:
+	"""Stands in for a cursor to capture the statements a LeaderboardQuery builds."""
+
+	def __init__(self):
+		self.statements = []
+
+	def execute(self, sql, params=()):
+		self.statements.append((sql, params))
+
+	def fetchall(self):
+		return []
+
+	def fetchone(self):
+		return (0,)
+
+
+for board, query in BOARDS.items():
+	recorder = RecordingCursor()
+	query.page(recorder, None, 10)
+	query.page(recorder, ("1", 1), 10)
+	query.rankOf(recorder, 1)
+	for index, statement in enumerate(recorder.statements, start=1):
+		STATEMENTS[f"{board} leaderboard #{index}"] = statement
+
+
+def scans(cursor, sql: str, params: tuple = ()) -> list[str]:
+	"""Plan steps that walk a hot table or one of its indexes from end to end."""
+	cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+	steps = []
+	for row in cursor.fetchall():
+		detail = row[3]
+		match = re.match(r"SCAN (\w+)", detail)
+		if match and match.group(1) in HOT_TABLES:
+			steps.append(detail)
+	return steps
+
+
+@pytest.fixture(scope="module")
+def cursor(tmp_path_factory):
+	path = pool.path
+	pool.closeAll()
+	pool.path = str(tmp_path_factory.mktemp("db") / "plans.db")
+	try:
+		with pytest.MonkeyPatch.context() as monkeypatch:
+			# Migration 007 needs a token to import; with no users it never calls Discord
+			monkeypatch.setenv("DISCORD_TOKEN", "test")
+			createDb()
+			runMigrations()
+		with dbConnection() as (conn, cursor):
+			yield cursor
+	finally:
+		pool.closeAll()
+		pool.path = path
+
+
+@pytest.mark.parametrize("name", STATEMENTS)
+def test_statement_searches_an_index(cursor, name):
+	sql, params = STATEMENTS[name]
+	assert scans(cursor, sql, params) == []
+
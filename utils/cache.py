@@ -0,0 +1,83 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+MISSING = object()
+
+
+class BoundedCache:
+	"""
+	Thread-safe LRU cache with optional expiry.
+	- maxSize: least recently used entries are evicted beyond this many
+	- ttl: seconds an entry stays valid, None to keep it until evicted
+	- daily: drop every entry when the day changes in `tz` (server local time if None)
+	hits / misses / evictions are counted for monitoring.
+	"""
+
+	def __init__(self, maxSize: int, ttl: float | None = None, daily: bool = False, tz=None):
+		self.maxSize = maxSize
+		self.ttl = ttl
+		self.daily = daily
+		self.tz = tz
+		self.entries: OrderedDict = OrderedDict()	# key -> (value, expiresAt)
+		self.day = self.today() if daily else None
+		self.lock = threading.Lock()
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+	def today(self):
+		return datetime.now(self.tz).date()
+
+	def rollOver(self):
+		if not self.daily:
+			return
+		today = self.today()
+		if today != self.day:
+			self.evictions += len(self.entries)
+			self.entries.clear()
+			self.day = today
+
+	def get(self, key, default=None):
+		with self.lock:
+			self.rollOver()
+			entry = self.entries.get(key, MISSING)
+			if entry is not MISSING and entry[1] is not None and entry[1] <= time.monotonic():
+				del self.entries[key]
+				self.evictions += 1
+				entry = MISSING
+			if entry is MISSING:
+				self.misses += 1
+				return default
+			self.entries.move_to_end(key)
+			self.hits += 1
+			return entry[0]
+
+	def __contains__(self, key) -> bool:
+		return self.get(key, MISSING) is not MISSING
+
+	def set(self, key, value):
+		with self.lock:
+			self.rollOver()
+			expiresAt = time.monotonic() + self.ttl if self.ttl is not None else None
+			self.entries[key] = (value, expiresAt)
+			self.entries.move_to_end(key)
+			while len(self.entries) > self.maxSize:
+				self.entries.popitem(last=False)
+				self.evictions += 1
+
+	def pop(self, key, default=None):
+		with self.lock:
+			entry = self.entries.pop(key, MISSING)
+			return default if entry is MISSING else entry[0]
+
+	def clear(self):
+		with self.lock:
+			self.entries.clear()
+
+	def __len__(self) -> int:
+		return len(self.entries)
+
+	def stats(self) -> dict:
+		return {"size": len(self.entries), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
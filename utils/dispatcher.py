@@ -0,0 +1,165 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+
+import discord
+
+from utils.utils import log
+
+PRIORITY_HIGH = 0	# replies to what a user just did
+PRIORITY_NORMAL = 1	# announcements and broadcasts
+PRIORITY_LOW = 2
+
+WORKERS = 5
+CHANNEL_RATE = (5, 5.0)	# Discord's message bucket: 5 sends per 5 s per channel
+GLOBAL_RATE = (40, 1.0)	# kept under the 50 requests/s global limit
+CLOSE_TIMEOUT = 10.0
+
+
+class TokenBucket:
+	def __init__(self, capacity: int, per: float):
+		self.capacity = capacity
+		self.rate = capacity / per
+		self.tokens = float(capacity)
+		self.updated = time.monotonic()
+
+	def take(self) -> float:
+		"""Take a token; returns 0, or how long to wait before one is available."""
+		now = time.monotonic()
+		self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+		self.updated = now
+		if self.tokens >= 1:
+			self.tokens -= 1
+			return 0.0
+		return (1 - self.tokens) / self.rate
+
+
+class Dispatcher:
+	"""
+	Outbound message queue: sends run on a few workers in priority order, so callers never
+	wait on Discord. Sends to one channel keep their order and respect that channel's bucket,
+	and all sends share a global bucket, so broadcasts fan out without hitting 429s.
+	A message whose channel is out of tokens is parked with that channel and put back on the
+	queue once a token is available, so workers keep serving other channels meanwhile.
+	Resolved channel objects are cached.
+	"""
+
+	def __init__(self, client: discord.Client, workers: int = WORKERS):
+		self.client = client
+		self.workerCount = workers
+		self.queue = None
+		self.workers = []
+		self.sequence = itertools.count()
+		self.channels = {}
+		self.channelLocks = {}
+		self.channelBuckets = {}
+		self.parked = {}	# channelId -> deque of messages waiting on the channel's bucket, in order
+		self.globalBucket = TokenBucket(*GLOBAL_RATE)
+		self.closed = False
+		self.stats = {"sent": 0, "failed": 0, "throttled": 0, "maxDepth": 0}
+
+	@property
+	def depth(self) -> int:
+		return self.queue.qsize() if self.queue else 0
+
+	# --- Producers ---
+	def send(self, target, content: str, priority: int = PRIORITY_NORMAL):
+		"""Queue a message for a channel object or a Discord channel id."""
+		if self.closed:
+			log(f"Dispatcher closed, dropping message for channel {getattr(target, 'id', target)}")
+			return
+		if self.queue is None:
+			self.queue = asyncio.PriorityQueue()
+			self.workers = [asyncio.create_task(self.worker()) for _ in range(self.workerCount)]
+
+		if isinstance(target, int):
+			channelId = target
+		else:
+			channelId = target.id
+			self.channels[channelId] = target
+
+		self.queue.put_nowait((priority, next(self.sequence), channelId, content, False))
+		self.stats["maxDepth"] = max(self.stats["maxDepth"], self.queue.qsize())
+
+	def broadcast(self, channelIds, content: str, priority: int = PRIORITY_NORMAL):
+		for channelId in channelIds:
+			self.send(channelId, content, priority)
+
+	# --- Workers ---
+	async def resolve(self, channelId: int):
+		channel = self.channels.get(channelId) or self.client.get_channel(channelId)
+		if channel is None:
+			channel = await self.client.fetch_channel(channelId)
+		self.channels[channelId] = channel
+		return channel
+
+	async def throttle(self, bucket: TokenBucket):
+		while (delay := bucket.take()) > 0:
+			self.stats["throttled"] += 1
+			await asyncio.sleep(delay)
+
+	def hold(self, channelId: int, message: tuple) -> bool:
+		"""
+		Take a token for a message, or park it when its channel is out of them or already has
+		messages parked. Parked messages stay unfinished on the queue until released.
+		"""
+		parked = self.parked.get(channelId)
+		if parked is None:
+			delay = self.channelBuckets.setdefault(channelId, TokenBucket(*CHANNEL_RATE)).take()
+			if delay <= 0:
+				return False
+			parked = self.parked[channelId] = deque()
+			asyncio.get_running_loop().call_later(delay, self.release, channelId)
+		self.stats["throttled"] += 1
+		parked.append(message)
+		return True
+
+	def release(self, channelId: int):
+		"""Put a channel's parked messages back on the queue, as many as it has tokens for."""
+		parked = self.parked[channelId]
+		bucket = self.channelBuckets[channelId]
+		while parked and (delay := bucket.take()) <= 0:
+			priority, sequence, content = parked.popleft()
+			# Re-queued before the parked entry is finished, so queue.join() never sees it gone
+			self.queue.put_nowait((priority, sequence, channelId, content, True))
+			self.queue.task_done()
+		if parked:
+			asyncio.get_running_loop().call_later(delay, self.release, channelId)
+		else:
+			del self.parked[channelId]
+
+	async def worker(self):
+		while True:
+			priority, sequence, channelId, content, hasToken = await self.queue.get()
+			if not hasToken and self.hold(channelId, (priority, sequence, content)):
+				continue
+			# Taken in queue order and released after the send, so a channel's messages stay ordered
+			lock = self.channelLocks.setdefault(channelId, asyncio.Lock())
+			try:
+				async with lock:
+					await self.throttle(self.globalBucket)
+					channel = await self.resolve(channelId)
+					await channel.send(content)
+				self.stats["sent"] += 1
+			except Exception as e:
+				self.stats["failed"] += 1
+				self.channels.pop(channelId, None)
+				log(f"Failed to send message to channel {channelId}: {e}")
+			finally:
+				self.queue.task_done()
+
+	async def close(self):
+		"""Stop accepting messages and give the queued ones a bounded time to go out."""
+		self.closed = True
+		if self.queue is None:
+			return
+		try:
+			await asyncio.wait_for(self.queue.join(), CLOSE_TIMEOUT)
+		except asyncio.TimeoutError:
+			parked = sum(len(messages) for messages in self.parked.values())
+			log(f"Dispatcher closing with {self.queue.qsize() + parked} messages unsent")
+		for task in self.workers:
+			task.cancel()
+		await asyncio.gather(*self.workers, return_exceptions=True)
+		log(f"Dispatcher: {self.stats}")
@@ -4,7 +4,7 @@ from pathlib import Path
 from discord import app_commands, Locale
 from discord.app_commands import locale_str
 
-from utils.utils import connectDb
+from database.channels import channels
 
 LOCALES_PATH = Path("locales")
 DEFAULT_LOCALE = "en"
@@ -25,12 +25,10 @@ class I18n:
 		return locale.split("-")[0]
 	
 	def getChannelLocale(self, chanId, interaction=None):
-		conn, cursor = connectDb()
-		cursor.execute("SELECT lang FROM channels WHERE discord_channel_id = ?", (str(chanId),))
-		row = cursor.fetchone()
-		conn.close()
-		if row and row[0] in self.translations:
-			return row[0]
+		# Accept a channel object as well as its id
+		config = channels.get(getattr(chanId, "id", chanId))
+		if config and config.lang in self.translations:
+			return config.lang
 		if interaction:
 			return self.getLocale(interaction)
 		return DEFAULT_LOCALE
@@ -0,0 +1,118 @@
+import asyncio
+import heapq
+import itertools
+from datetime import datetime, time as dtTime, timedelta, timezone
+
+from utils.utils import log
+
+MAX_SLEEP = 3600.0	# re-check at least hourly, in case the wall clock jumps
+
+
+def localFireTime(tz, at: dtTime, day) -> datetime:
+	return datetime.combine(day, at, tzinfo=tz).astimezone(timezone.utc)
+
+
+class DailyScheduler:
+	"""
+	Runs coroutine jobs once a day at a local time in their own timezone.
+	Next fire instants sit in a heap, so the loop sleeps until the earliest one.
+	The last local day each job ran for is stored in scheduled_runs, so a job never runs twice
+	for a day, and a job that ran before but missed today's run while the bot was down fires
+	as soon as it is scheduled. A brand new job waits for its first regular fire time.
+	"""
+
+	def __init__(self, database):
+		self.db = database
+		self.heap = []	# (fireAtUtc, seq, key, generation, localDay)
+		self.jobs = {}	# key -> (tz, at, fn, generation)
+		self.lastRuns = {}
+		self.sequence = itertools.count()
+		self.wakeup = None
+		self.task = None
+
+	@property
+	def started(self) -> bool:
+		return self.task is not None
+
+	async def start(self):
+		rows = await self.db.fetchall("SELECT job, last_day FROM scheduled_runs")
+		self.lastRuns = dict(rows)
+		self.wakeup = asyncio.Event()
+		self.task = asyncio.create_task(self.loop())
+
+	# --- Registration ---
+	def schedule(self, key: str, tz, at: dtTime, fn):
+		"""(Re)schedule fn(localDay) for every day at `at` in tz. Replaces any job with the same key."""
+		generation = next(self.sequence)
+		self.jobs[key] = (tz, at, fn, generation)
+
+		now = datetime.now(timezone.utc)
+		today = now.astimezone(tz).date()
+		fireAt = localFireTime(tz, at, today)
+		if fireAt <= now and key in self.lastRuns and self.lastRuns[key] != today.isoformat():
+			fireAt = now	# ran before but missed today's run: catch up
+		elif fireAt <= now:
+			today += timedelta(days=1)
+			fireAt = localFireTime(tz, at, today)
+		self.push(key, generation, fireAt, today.isoformat())
+
+	def unschedule(self, key: str):
+		self.jobs.pop(key, None)
+		if self.wakeup:
+			self.wakeup.set()
+
+	def push(self, key, generation, fireAt, localDay):
+		heapq.heappush(self.heap, (fireAt, next(self.sequence), key, generation, localDay))
+		if self.wakeup:
+			self.wakeup.set()
+
+	def isCurrent(self, entry) -> bool:
+		job = self.jobs.get(entry[2])
+		return job is not None and job[3] == entry[3]
+
+	# --- Loop ---
+	async def loop(self):
+		while True:
+			while self.heap and not self.isCurrent(self.heap[0]):
+				heapq.heappop(self.heap)
+
+			now = datetime.now(timezone.utc)
+			if self.heap and self.heap[0][0] <= now:
+				_, _, key, _, localDay = heapq.heappop(self.heap)
+				await self.run(key, localDay)
+				continue
+
+			delay = MAX_SLEEP
+			if self.heap:
+				delay = min(delay, (self.heap[0][0] - now).total_seconds())
+			self.wakeup.clear()
+			try:
+				await asyncio.wait_for(self.wakeup.wait(), delay)
+			except asyncio.TimeoutError:
+				pass
+
+	async def run(self, key: str, localDay: str):
+		tz, at, fn, generation = self.jobs[key]
+		if self.lastRuns.get(key) != localDay:
+			try:
+				await fn(localDay)
+			except Exception as e:
+				log(f"Scheduled job {key} failed for {localDay}: {e}")
+			self.lastRuns[key] = localDay
+			try:
+				await self.db.write("""
+					INSERT INTO scheduled_runs (job, last_day) VALUES (?, ?)
+					ON CONFLICT(job) DO UPDATE SET last_day = excluded.last_day
+				""", (key, localDay))
+			except Exception as e:
+				log(f"Failed to record run of {key}: {e}")
+
+		nextDay = datetime.fromisoformat(localDay).date() + timedelta(days=1)
+		if self.jobs.get(key, (None,) * 4)[3] == generation:
+			self.push(key, generation, localFireTime(tz, at, nextDay), nextDay.isoformat())
+
+	async def close(self):
+		if self.task:
+			self.task.cancel()
+			await asyncio.gather(self.task, return_exceptions=True)
+			self.task = None
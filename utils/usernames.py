@@ -0,0 +1,108 @@
+import asyncio
+import time
+
+from database.asyncDb import db
+from utils.i18n import i18n
+from utils.utils import log
+
+PROFILE_TTL_MS = 7 * 24 * 3600 * 1000
+FETCH_CONCURRENCY = 5
+SQL_CHUNK = 500	# ids per IN (...) query, under SQLite's parameter limit
+
+
+def nowMs() -> int:
+	return int(time.time() * 1000)
+
+
+def profileName(user) -> str:
+	"""
+	The account-wide name cached in user_profiles. Nicknames are per guild, so they are never
+	stored: they only come from the live member lookup of the guild being shown.
+	"""
+	return user.global_name or user.name
+
+
+def readProfiles(cursor, discordIds: list[int], freshSince: int) -> dict[int, str]:
+	names = {}
+	for i in range(0, len(discordIds), SQL_CHUNK):
+		chunk = discordIds[i:i + SQL_CHUNK]
+		cursor.execute(f"""
+			SELECT discord_user_id, name FROM user_profiles
+			WHERE updated_at >= ? AND discord_user_id IN ({",".join("?" * len(chunk))})
+		""", (freshSince, *chunk))
+		names.update(cursor.fetchall())
+	return names
+
+
+def writeProfiles(cursor, names: dict[int, str]):
+	updatedAt = nowMs()
+	cursor.executemany("""
+		INSERT INTO user_profiles (discord_user_id, name, updated_at) VALUES (?, ?, ?)
+		ON CONFLICT(discord_user_id) DO UPDATE SET name = excluded.name, updated_at = excluded.updated_at
+	""", [(discordId, name, updatedAt) for discordId, name in names.items()])
+
+
+def refreshProfile(cursor, discordId: int, name: str):
+	"""Update the name of an already cached profile; users never shown on a board are not added."""
+	cursor.execute(
+		"UPDATE user_profiles SET name = ?, updated_at = ? WHERE discord_user_id = ?",
+		(name, nowMs(), discordId)
+	)
+
+
+async def storeProfiles(names: dict[int, str]):
+	if not names:
+		return
+	try:
+		await db.transaction(writeProfiles, names)
+	except Exception as e:
+		log(f"Failed to store {len(names)} user profiles: {e}")
+
+
+async def resolveUsernames(discordIds, interaction) -> dict[int, str]:
+	"""
+	Return {discordId: name} for every id, cheapest source first:
+	members of the interaction's guild, fresh user_profiles rows, the client's user cache,
+	and finally fetch_user, run concurrently with at most FETCH_CONCURRENCY requests in flight.
+	Names found outside the table are written back to it.
+	"""
+	client = interaction.client
+	guild = interaction.guild
+	pending = list(dict.fromkeys(int(i) for i in discordIds))
+	names: dict[int, str] = {}
+	learned: dict[int, str] = {}
+
+	if guild:
+		for discordId in pending:
+			member = guild.get_member(discordId)
+			if member:
+				names[discordId] = member.display_name
+		pending = [i for i in pending if i not in names]
+
+	if pending:
+		names.update(await db.read(readProfiles, pending, nowMs() - PROFILE_TTL_MS))
+		pending = [i for i in pending if i not in names]
+
+	for discordId in pending:
+		user = client.get_user(discordId)
+		if user:
+			learned[discordId] = profileName(user)
+	pending = [i for i in pending if i not in learned]
+
+	semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+	async def fetch(discordId: int):
+		async with semaphore:
+			try:
+				user = await client.fetch_user(discordId)
+			except Exception:
+				return
+			learned[discordId] = profileName(user)
+	await asyncio.gather(*(fetch(discordId) for discordId in pending))
+
+	names.update(learned)
+	await storeProfiles(learned)
+
+	unknown = i18n.t(i18n.getLocale(interaction), 'commands.lb.embed.unknown')
+	for discordId in discordIds:
+		names.setdefault(int(discordId), f"{unknown} ({discordId})")
+	return names
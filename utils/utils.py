@@ -12,13 +12,6 @@ def log(message):
 	timestamp = datetime.datetime.now().strftime("[%Y-%m-%d %H:%M:%S]")
 	print(f"{timestamp} {message}")
 
-def connectDb():
-	import sqlite3
-	conn = sqlite3.connect("patherine.db")
-	cursor = conn.cursor()
-	cursor.execute("PRAGMA foreign_keys = ON;")
-	return conn, cursor
-
 def loadCommandModules():
 	commandsDir = Path(__file__).resolve().parent.parent / "commands"
 	for filename in os.listdir(commandsDir):
@@ -0,0 +1,76 @@
+import asyncio
+
+from utils.utils import log
+
+QUEUE_SIZE = 1000
+WORKERS = 4
+
+
+class WorkQueue:
+	"""
+	Bounded asyncio queue of side-effect jobs run by a small pool of workers.
+	- submit(fn, *args, key=...): a job whose key is already waiting is dropped, so repeated
+	  requests for the same thing (e.g. role grants for one member) run once
+	- depth / maxDepth: current and highest number of queued jobs
+	"""
+
+	def __init__(self, name: str, size: int = QUEUE_SIZE, workers: int = WORKERS):
+		self.name = name
+		self.size = size
+		self.workerCount = workers
+		self.queue = None
+		self.workers = []
+		self.pendingKeys = set()
+		self.maxDepth = 0
+		self.processed = 0
+		self.coalesced = 0
+		self.closed = False
+
+	@property
+	def depth(self) -> int:
+		return self.queue.qsize() if self.queue else 0
+
+	def start(self):
+		# Created lazily: the queue and workers need the running loop
+		self.queue = asyncio.Queue(maxsize=self.size)
+		self.workers = [asyncio.create_task(self.worker()) for _ in range(self.workerCount)]
+
+	async def submit(self, fn, *args, key=None):
+		"""Queue the coroutine function fn(*args). Waits only when the queue is full."""
+		if self.closed:
+			return
+		if self.queue is None:
+			self.start()
+		if key is not None:
+			if key in self.pendingKeys:
+				self.coalesced += 1
+				return
+			self.pendingKeys.add(key)
+
+		await self.queue.put((fn, args, key))
+		self.maxDepth = max(self.maxDepth, self.queue.qsize())
+
+	async def worker(self):
+		while True:
+			fn, args, key = await self.queue.get()
+			if key is not None:
+				# Released before running, so a request made meanwhile is queued again
+				self.pendingKeys.discard(key)
+			try:
+				await fn(*args)
+			except Exception as e:
+				log(f"{self.name} job {getattr(fn, '__name__', fn)} failed: {e}")
+			finally:
+				self.processed += 1
+				self.queue.task_done()
+
+	async def close(self):
+		"""Stop accepting jobs, let the queued ones finish, then stop the workers."""
+		self.closed = True
+		if self.queue is None:
+			return
+		await self.queue.join()
+		for task in self.workers:
+			task.cancel()
+		await asyncio.gather(*self.workers, return_exceptions=True)
+		log(f"{self.name}: {self.processed} jobs run, {self.coalesced} coalesced, max depth {self.maxDepth}")